@@ -0,0 +1,22 @@
+from django_cas_ng import backends as cas_backends
+
+from django.contrib.auth import backends
+
+from .models import User
+
+
+class CachedUserMixin:
+    """Loads the user of a session from the cache, see User.get_cached(),
+    instead of querying it with every request."""
+
+    def get_user(self, user_id):
+        user = User.get_cached(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+class ModelBackend(CachedUserMixin, backends.ModelBackend):
+    pass
+
+
+class CASBackend(CachedUserMixin, cas_backends.CASBackend):
+    pass
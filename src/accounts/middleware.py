@@ -0,0 +1,67 @@
+import logging
+import time
+
+from django.contrib import auth
+from django.contrib.auth import middleware
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger(__name__)
+
+
+def add_timing(request, name, start):
+    """Adds the milliseconds since start to the timings of the request,
+    which are reported by ServerTimingMiddleware."""
+
+    if not hasattr(request, 'server_timing'):
+        request.server_timing = {}
+    request.server_timing[name] = (time.perf_counter() - start) * 1000
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        start = time.perf_counter()
+        # the session is loaded lazily, with the first access
+        request.session.get(auth.SESSION_KEY)
+        add_timing(request, 'session', start)
+
+        start = time.perf_counter()
+        request._cached_user = auth.get_user(request)
+        add_timing(request, 'auth', start)
+    return request._cached_user
+
+
+class AuthenticationMiddleware(middleware.AuthenticationMiddleware):
+    """AuthenticationMiddleware, which measures the time of loading the
+    session and the user of the request."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+class ServerTimingMiddleware:
+    """Adds a Server-Timing header with the total time of the request and
+    the timings collected during the request, e.g. of authentication.
+
+    The timings are also logged with level DEBUG.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        add_timing(request, 'total', start)
+
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration:.1f}'
+            for name, duration in request.server_timing.items()
+        )
+        logger.debug(
+            '%s %s: %s',
+            request.method,
+            request.path,
+            response['Server-Timing'],
+        )
+        return response
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
 
 
@@ -33,8 +34,61 @@ class User(AbstractUser):
 
     @property
     def is_editor(self):
-        return (
-            self.is_superuser or self.groups.filter(name=settings.EDITOR_GROUP).exists()
+        """Whether the user is a superuser or in the editor group.
+
+        The group membership is memoized on the instance, i.e. once per
+        request for request.user, and cached across requests until the
+        groups of the user change.
+        """
+
+        if self.is_superuser:
+            return True
+
+        if '_is_editor' not in self.__dict__:
+            key = self.editor_cache_key(self.pk)
+            is_editor = cache.get(key)
+            if is_editor is None:
+                is_editor = self.groups.filter(name=settings.EDITOR_GROUP).exists()
+                cache.set(key, is_editor, settings.EDITOR_CACHE_TIMEOUT)
+            self._is_editor = is_editor
+        return self._is_editor
+
+    @staticmethod
+    def editor_cache_key(user_id):
+        return f'is_editor:{user_id}'
+
+    @staticmethod
+    def user_cache_key(user_id):
+        return f'user:{user_id}'
+
+    @classmethod
+    def get_cached(cls, user_id):
+        """Returns the user with user_id, or None if it does not exist.
+
+        The user is cached together with its editor role, so that the user
+        of a request, including preferences and role, is loaded with one
+        cache hit, until the user or their groups change.
+        """
+
+        key = cls.user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = cls._default_manager.filter(pk=user_id).first()
+            if user is None:
+                return None
+            # memoizes the editor role on the instance, which is cached with it
+            user.is_editor  # noqa: B018
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+
+    @classmethod
+    def invalidate_cache(cls, user_ids):
+        """Deletes the cached users and editor roles of users."""
+
+        user_ids = list(user_ids)
+        cache.delete_many(
+            [cls.editor_cache_key(user_id) for user_id in user_ids]
+            + [cls.user_cache_key(user_id) for user_id in user_ids],
         )
 
     def __str__(self):
@@ -2,8 +2,11 @@ from django_cas_ng.signals import cas_user_authenticated
 
 from django.conf import settings
 from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
+from .models import User
+
 
 @receiver(cas_user_authenticated, dispatch_uid='process_user_attributes')
 def process_user_attributes(
@@ -80,4 +83,35 @@ def process_user_attributes(
     else:
         user.groups.clear()
 
+    # saving the user also refreshes the cached user and editor role with
+    # every login, see invalidate_user()
     user.save()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_is_editor(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        # the groups of a user changed
+        User.invalidate_cache([instance.pk])
+        instance.__dict__.pop('_is_editor', None)
+    elif action == 'pre_clear':
+        # all users were removed from a group
+        User.invalidate_cache(instance.user_set.values_list('pk', flat=True))
+    else:
+        User.invalidate_cache(pk_set)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_is_editor_group(sender, instance, **kwargs):
+    User.invalidate_cache(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    # this also prevents that a new user gets the data cached for a former
+    # user with the same id, e.g. in a recreated database
+    User.invalidate_cache([instance.pk])
@@ -0,0 +1,90 @@
+"""Conditional GET requests.
+
+Read endpoints compute an ETag from cheap validators, like the version
+of an album, the change date of an artwork or the cache versions in
+artworks.cache, before doing the actual work. If the client already
+has the current representation, the request is answered with 304 Not
+Modified, without querying and serializing the data.
+"""
+
+import functools
+import hashlib
+import json
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from django.utils.http import parse_etags
+from django.utils.translation import get_language
+
+
+def make_etag(*parts):
+    """Returns an ETag identifying the combination of parts."""
+
+    digest = hashlib.blake2s(
+        '|'.join(str(part) for part in parts).encode(),
+        digest_size=16,
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(etag, header):
+    """Returns whether an ETag matches an If-None-Match header, using the
+    weak comparison."""
+
+    if not header:
+        return False
+    etags = [e.removeprefix('W/') for e in parse_etags(header)]
+    return '*' in etags or etag in etags
+
+
+def conditional(etag_func):
+    """Decorator for viewset methods answering conditional GET requests.
+
+    etag_func is called with the request and the arguments of the method
+    and returns the ETag of the current representation, or None if it
+    cannot be determined, e.g. because the object does not exist. If the
+    ETag matches the If-None-Match header of the request, a 304 response
+    is returned without calling the method. Otherwise the ETag is added
+    to the response.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            etag = etag_func(request, *args, **kwargs)
+
+            if etag is not None and etag_matches(
+                etag,
+                request.headers.get('If-None-Match'),
+            ):
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED,
+                    headers={'ETag': etag},
+                )
+
+            response = method(self, request, *args, **kwargs)
+            if etag is not None and response.status_code == status.HTTP_200_OK:
+                response['ETag'] = etag
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+@functools.lru_cache
+def static_etag(func, language):
+    # the language is only part of the cache key, the lazy translations of
+    # the data are resolved with the active language
+    return make_etag(json.dumps(func(), sort_keys=True, default=str))
+
+
+def static_validator(func):
+    """Returns an etag_func for data which only depends on the code and the
+    language, e.g. labels. The data is returned by func."""
+
+    def etag_func(request, *args, **kwargs):
+        return static_etag(func, get_language())
+
+    return etag_func
@@ -0,0 +1,330 @@
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from artworks.models import Album, Artwork
+
+
+def endpoint(name, url_name, method='get', data=None, **kwargs):
+    return {
+        'name': name,
+        'method': method,
+        'path': reverse(
+            url_name,
+            kwargs={'version': settings.REST_FRAMEWORK['DEFAULT_VERSION'], **kwargs},
+        ),
+        'data': data or {},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the response times of the main API endpoints, optionally for '
+        'synthetic collections of several sizes, and output the results as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-s',
+            '--sizes',
+            nargs='+',
+            type=int,
+            help=(
+                'Numbers of artworks of the synthetic collections to generate and '
+                'benchmark in turn (defaults to benchmarking the existing data). '
+                'Replaces the synthetic collection with the same prefix.'
+            ),
+        )
+        parser.add_argument(
+            '-u',
+            '--user',
+            help='Username of the user sending the requests (defaults to the owner of the largest synthetic album).',
+        )
+        parser.add_argument(
+            '-e',
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help='Name of an endpoint to benchmark (can be used multiple times, defaults to all endpoints).',
+        )
+        parser.add_argument(
+            '-r',
+            '--repeat',
+            type=int,
+            default=5,
+            help='Number of timed runs per endpoint.',
+        )
+        parser.add_argument(
+            '-w',
+            '--warmup',
+            type=int,
+            default=1,
+            help='Number of untimed runs per endpoint before the timed runs, the first of which counts the queries.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the synthetic collections.',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='synthetic',
+            help='Prefix of the synthetic collections.',
+        )
+        parser.add_argument(
+            '-o',
+            '--output',
+            help='Path of the output file (defaults to stdout).',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('At least one timed run is required.')
+
+        results = []
+        for size in options['sizes'] or [None]:
+            if size is not None:
+                # progress messages go to stderr, to not mix them with the
+                # results written to stdout
+                call_command(
+                    'generate_synthetic_collection',
+                    artworks=size,
+                    seed=options['seed'],
+                    prefix=options['prefix'],
+                    clear=True,
+                    stdout=self.stderr,
+                )
+            results.append(self.benchmark(size, options))
+
+        output = json.dumps(
+            {
+                'repeat': options['repeat'],
+                'warmup': options['warmup'],
+                'seed': options['seed'] if options['sizes'] else None,
+                'results': results,
+            },
+            indent=2,
+        )
+
+        if options['output']:
+            Path(options['output']).write_text(output)
+            self.stdout.write(self.style.SUCCESS('DONE'))
+        else:
+            sys.stdout.write(f'{output}\n')
+
+    def get_user(self, options):
+        if not options['user']:
+            # the owner of the largest synthetic album
+            album = (
+                Album.objects.filter(
+                    user__username__startswith=f'{options["prefix"]}-',
+                )
+                .select_related('user')
+                .order_by('-number_of_artworks', 'id')
+                .first()
+            )
+            if album:
+                return album.user
+
+        username = options['user'] or f'{options["prefix"]}-0000'
+        try:
+            return get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist as dne:
+            raise CommandError(f'User {username} does not exist') from dne
+
+    def get_endpoints(self, user):
+        """Returns the requests to benchmark, with samples from the data
+        the user has access to."""
+
+        # the largest album of the user and one of its artworks
+        album = (
+            Album.objects.filter(user=user)
+            .order_by('-number_of_artworks', 'id')
+            .first()
+        )
+        artwork = (
+            Artwork.objects.filter(
+                pk__in=album.featured_artwork_ids if album else [],
+            )
+            .order_by('id')
+            .first()
+            or Artwork.objects.filter(published=True).order_by('id').first()
+        )
+
+        endpoints = [
+            endpoint('artworks-list', 'artwork-list', data={'limit': 30}),
+            endpoint(
+                'search',
+                'search-list',
+                method='post',
+                data={'limit': 30, 'offset': 0, 'filters': [], 'exclude': []},
+            ),
+            endpoint('albums-list', 'album-list', data={'limit': 30}),
+            endpoint('albums-shared', 'album-shared'),
+            endpoint('folder-root', 'folder-detail', pk='root'),
+            endpoint('folder-tree', 'folder-tree', pk='root'),
+        ]
+
+        if artwork:
+            # the longest word of the title is a selective search term
+            term = max(artwork.title.split(), key=len)
+            endpoints += [
+                endpoint('artwork-retrieve', 'artwork-detail', pk=artwork.pk),
+                endpoint(
+                    'search-text',
+                    'search-list',
+                    method='post',
+                    data={'q': term, 'limit': 30, 'offset': 0},
+                ),
+                endpoint(
+                    'autocomplete',
+                    'autocomplete',
+                    data={
+                        'q': term[:3],
+                        'type': 'titles,artists,keywords,locations',
+                    },
+                ),
+            ]
+            if artist := artwork.artists.order_by('pk').first():
+                endpoints.append(
+                    endpoint(
+                        'search-artist',
+                        'search-list',
+                        method='post',
+                        data={
+                            'filters': [
+                                {'id': 'artists', 'filter_values': [{'id': artist.pk}]},
+                            ],
+                            'limit': 30,
+                            'offset': 0,
+                        },
+                    ),
+                )
+            if keyword := artwork.keywords.order_by('pk').first():
+                # filtering by a root keyword includes all its descendants
+                root = keyword.get_root()
+                endpoints.append(
+                    endpoint(
+                        'search-keyword',
+                        'search-list',
+                        method='post',
+                        data={
+                            'filters': [
+                                {'id': 'keywords', 'filter_values': [{'id': root.pk}]},
+                            ],
+                            'limit': 30,
+                            'offset': 0,
+                        },
+                    ),
+                )
+
+        if album:
+            endpoints += [
+                endpoint(
+                    'album-retrieve',
+                    'album-detail',
+                    pk=album.pk,
+                    data={'details': 'true'},
+                ),
+                endpoint(
+                    'album-slides',
+                    'album-slides',
+                    pk=album.pk,
+                    data={'details': 'true'},
+                ),
+                endpoint(
+                    'album-metadata',
+                    'album-metadata',
+                    pk=album.pk,
+                    data={'export_format': 'csv'},
+                ),
+            ]
+
+        return endpoints
+
+    def request(self, client, ep):
+        if ep['method'] == 'post':
+            response = client.post(
+                ep['path'],
+                json.dumps(ep['data']),
+                content_type='application/json',
+                secure=True,
+            )
+        else:
+            response = client.get(ep['path'], ep['data'], secure=True)
+
+        # streaming responses, e.g. exports, are only rendered when they are
+        # consumed
+        content = (
+            b''.join(response.streaming_content)
+            if response.streaming
+            else response.content
+        )
+        return response.status_code, len(content)
+
+    def benchmark(self, size, options):
+        user = self.get_user(options)
+        endpoints = self.get_endpoints(user)
+        if options['endpoints']:
+            endpoints = [ep for ep in endpoints if ep['name'] in options['endpoints']]
+
+        client = Client()
+        client.force_login(user)
+
+        results = []
+        # the test client uses the testserver host
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for ep in endpoints:
+                # the queries are only counted in the first run, as capturing
+                # them slows down the requests
+                with CaptureQueriesContext(connection) as queries:
+                    status, length = self.request(client, ep)
+                for _run in range(options['warmup'] - 1):
+                    self.request(client, ep)
+
+                durations = []
+                for _run in range(options['repeat']):
+                    start = time.perf_counter()
+                    self.request(client, ep)
+                    durations.append(time.perf_counter() - start)
+
+                results.append(
+                    {
+                        'name': ep['name'],
+                        'method': ep['method'].upper(),
+                        'path': ep['path'],
+                        'status': status,
+                        'bytes': length,
+                        'queries': len(queries),
+                        'min': min(durations),
+                        'median': statistics.median(durations),
+                        'mean': statistics.mean(durations),
+                        'max': max(durations),
+                    },
+                )
+                self.stderr.write(
+                    f'{ep["name"]}: {results[-1]["median"]:.3f}s median, '
+                    f'{len(queries)} queries',
+                )
+
+        return {
+            'size': size,
+            'counts': {
+                'artworks': Artwork.objects.count(),
+                'albums': Album.objects.count(),
+                'users': get_user_model().objects.count(),
+            },
+            'endpoints': results,
+        }
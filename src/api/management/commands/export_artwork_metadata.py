@@ -0,0 +1,114 @@
+import json
+import sys
+from pathlib import Path
+
+from rest_framework.exceptions import ParseError
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.translation import override
+
+from api.serializers.search import SearchQuerySerializer
+from api.views.search import search_results_queryset
+from artworks.exports import (
+    album_artworks,
+    get_metadata_formats,
+    get_metadata_writer,
+    metadata_rows,
+)
+from artworks.models import Album
+
+
+class Command(BaseCommand):
+    help = 'Export the metadata of artworks as CSV or JSON Lines.'
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument(
+            '-a',
+            '--album',
+            help='Export the artworks of the album with this id.',
+        )
+        source.add_argument(
+            '-s',
+            '--search',
+            help='Export the artworks matching the search request in this JSON file.',
+        )
+        parser.add_argument(
+            '-f',
+            '--format',
+            default='csv',
+            choices=get_metadata_formats(),
+        )
+        parser.add_argument(
+            '-l',
+            '--language',
+            default=settings.LANGUAGE_CODE,
+            choices=['de', 'en'],
+        )
+        parser.add_argument(
+            '-o',
+            '--output',
+            help='Path of the output file (defaults to stdout).',
+        )
+        parser.add_argument(
+            '-c',
+            '--chunk-size',
+            type=int,
+            default=settings.METADATA_EXPORT_CHUNK_SIZE,
+            help='Number of artworks fetched at once.',
+        )
+
+    def get_queryset(self, options):
+        if options['album']:
+            try:
+                album = Album.objects.get(pk=options['album'])
+            except Album.DoesNotExist as dne:
+                raise CommandError('Album does not exist') from dne
+            return album_artworks(album)
+
+        if options['search']:
+            try:
+                with Path(options['search']).open() as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as err:
+                raise CommandError(f'Could not read search request: {err}') from err
+
+            serializer = SearchQuerySerializer(data=data)
+            if not serializer.is_valid():
+                raise CommandError(f'Invalid search request: {serializer.errors}')
+
+            try:
+                return search_results_queryset(
+                    serializer.validated_data.get('q'),
+                    serializer.validated_data.get('filters', []),
+                    serializer.validated_data.get('exclude', []),
+                )
+            except ParseError as pe:
+                raise CommandError(f'Invalid search request: {pe.detail}') from pe
+
+        # all published artworks, in the order of a search without a query
+        return search_results_queryset()
+
+    def handle(self, *args, **options):
+        queryset = self.get_queryset(options)
+        writer = get_metadata_writer(options['format'])()
+
+        output = (
+            Path(options['output']).open('wb')  # noqa: SIM115
+            if options['output']
+            else sys.stdout.buffer
+        )
+
+        try:
+            with override(options['language']):
+                for chunk in writer.stream(
+                    metadata_rows(queryset, chunk_size=options['chunk_size']),
+                ):
+                    output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS('DONE'))
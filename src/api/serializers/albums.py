@@ -1,10 +1,14 @@
 from drf_spectacular.utils import OpenApiExample, extend_schema_serializer
 from rest_framework import serializers
 
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from artworks.exports import get_export_formats, get_metadata_formats
 from artworks.models import Album
 
 from .artworks import ArtworksAlbumsRequestSerializer
-from .permissions import PermissionsResponseSerializer
+from .permissions import PermissionsRequestSerializer, PermissionsResponseSerializer
 from .user import UserSerializer
 
 
@@ -22,6 +26,35 @@ class AppendArtworkRequestSerializer(serializers.Serializer):
     id = serializers.CharField()
 
 
+class CopyAlbumRequestSerializer(serializers.Serializer):
+    # the title of the copy, which defaults to the title of the album
+    title = serializers.CharField(required=False, max_length=255)
+
+
+class BulkAlbumsRequestSerializer(serializers.Serializer):
+    OPERATIONS = ('copy', 'merge', 'move', 'share')
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    # the ids of the albums to apply the operation to
+    albums = serializers.ListField(child=serializers.CharField(), allow_empty=False)
+    # the title of the new album for merge operations
+    title = serializers.CharField(required=False, max_length=255)
+    # the id of the target folder for move operations, or root
+    folder = serializers.CharField(required=False)
+    # the permissions of the users for share operations
+    permissions = PermissionsRequestSerializer(many=True, required=False)
+
+    def validate(self, data):
+        required = {'merge': 'title', 'move': 'folder', 'share': 'permissions'}
+        field = required.get(data['op'])
+        if field and field not in data:
+            raise serializers.ValidationError(
+                _('%(op)s operations require %(field)s')
+                % {'op': data['op'], 'field': field},
+            )
+        return data
+
+
 class AlbumsListRequestSerializer(ArtworksAlbumsRequestSerializer):
     limit = serializers.IntegerField(
         required=False,
@@ -37,6 +70,30 @@ class AlbumsListRequestSerializer(ArtworksAlbumsRequestSerializer):
     )
 
 
+class SharedAlbumsRequestSerializer(serializers.Serializer):
+    permissions = serializers.CharField(
+        required=False,
+        default=','.join(settings.PERMISSIONS),
+        help_text='Comma separated permissions of the user for the albums.',
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        default=10,
+        allow_null=False,
+        help_text='Limit the number of results.',
+    )
+    cursor = serializers.CharField(
+        required=False,
+        help_text='The cursor of the page, as returned by the previous page.',
+    )
+
+    def validate_permissions(self, value):
+        for p in value.split(','):
+            if p not in settings.PERMISSIONS:
+                raise serializers.ValidationError(f'{p} is not a valid permission')
+        return value.split(',')
+
+
 class AlbumsRequestSerializer(serializers.Serializer):
     details = serializers.BooleanField()
 
@@ -50,7 +107,7 @@ class AlbumsDownloadRequestSerializer(serializers.Serializer):
     language = serializers.CharField(default='de', allow_null=False, allow_blank=False)
 
     def validate_download_format(self, value):
-        if value not in ['pptx', 'pdf']:
+        if value not in get_export_formats():
             raise serializers.ValidationError(f'{value} is not a valid format')
         return value
 
@@ -60,6 +117,21 @@ class AlbumsDownloadRequestSerializer(serializers.Serializer):
         return value
 
 
+class AlbumsMetadataRequestSerializer(serializers.Serializer):
+    export_format = serializers.ChoiceField(
+        choices=get_metadata_formats(),
+        default='csv',
+        help_text='Format of the exported metadata.',
+    )
+
+
+class AlbumChangesRequestSerializer(serializers.Serializer):
+    since = serializers.IntegerField(
+        min_value=0,
+        help_text='The album version known to the client.',
+    )
+
+
 @extend_schema_serializer(
     examples=[
         OpenApiExample(
@@ -68,6 +140,7 @@ class AlbumsDownloadRequestSerializer(serializers.Serializer):
                 'id': 2,
                 'title': 'Example Album',
                 'number_of_artworks': 3,
+                'version': 5,
                 'slides': [[{'id': 123}], [{'id': 234}, {'id': 345}]],
                 'owner': {
                     'id': '0123456789ABCDEF0123456789ABCDEF',
@@ -97,6 +170,7 @@ class AlbumResponseSerializer(serializers.ModelSerializer):
             'id',
             'title',
             'number_of_artworks',
+            'version',
             'slides',
             'owner',
             'permissions',
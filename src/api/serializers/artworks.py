@@ -61,3 +61,44 @@ class CreateSlidesRequestSerializer(serializers.ListSerializer):
                     _('No more than two artworks per slide allowed'),
                 )
         return data
+
+
+class SlideOperationSerializer(serializers.Serializer):
+    OPERATIONS = ('insert', 'move', 'remove', 'pair', 'unpair')
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    # the id of the slide to change. for insert operations, this is the
+    # optional id of the new slide, which will be autogenerated, if missing
+    slide = serializers.CharField(required=False)
+    # the target position for insert and move operations. new slides are
+    # appended, if it is missing
+    index = serializers.IntegerField(required=False, min_value=0)
+    # the contents of new slides for insert operations
+    items = SlideItemSerializer(many=True, required=False)
+
+    def validate(self, data):
+        if data['op'] == 'insert':
+            if not data.get('items'):
+                raise serializers.ValidationError(
+                    _('Insert operations require items'),
+                )
+            if len(data['items']) > 2:
+                raise serializers.ValidationError(
+                    _('No more than two artworks per slide allowed'),
+                )
+        elif 'slide' not in data:
+            raise serializers.ValidationError(
+                _('%(op)s operations require a slide') % {'op': data['op']},
+            )
+        if data['op'] == 'move' and 'index' not in data:
+            raise serializers.ValidationError(_('Move operations require an index'))
+        return data
+
+
+class UpdateSlidesRequestSerializer(serializers.Serializer):
+    operations = SlideOperationSerializer(many=True, allow_empty=False)
+
+
+class UpdateSlidesResponseSerializer(serializers.Serializer):
+    version = serializers.IntegerField()
+    created_slides = serializers.ListField(child=serializers.CharField())
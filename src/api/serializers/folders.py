@@ -1,5 +1,19 @@
+from rest_framework import serializers
+
 from .albums import AlbumsListRequestSerializer
 
 
 class FoldersRequestSerializer(AlbumsListRequestSerializer):
     pass
+
+
+class CreateFolderRequestSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=255)
+    # the id of the parent folder, or root
+    parent = serializers.CharField(required=False, default='root')
+
+
+class UpdateFolderRequestSerializer(serializers.Serializer):
+    title = serializers.CharField(required=False, max_length=255)
+    # the id of the new parent folder, or root
+    parent = serializers.CharField(required=False)
@@ -2,6 +2,8 @@ from rest_framework import serializers
 
 from django.conf import settings
 
+from artworks.exports import get_metadata_formats
+
 
 class SearchRolesSerializer(serializers.Serializer):
     id = serializers.IntegerField()
@@ -30,7 +32,7 @@ class SearchItemSerializer(serializers.Serializer):
     score = serializers.FloatField()
 
 
-class SearchRequestSerializer(serializers.Serializer):
+class SearchQuerySerializer(serializers.Serializer):
     filters = serializers.ListField(
         child=SearchFilterSerializer(),
         required=False,
@@ -45,6 +47,9 @@ class SearchRequestSerializer(serializers.Serializer):
         required=False,
         help_text='Query string for full text search.',
     )
+
+
+class SearchRequestSerializer(SearchQuerySerializer):
     limit = serializers.IntegerField(
         required=False,
         default=settings.SEARCH_LIMIT,
@@ -59,6 +64,14 @@ class SearchRequestSerializer(serializers.Serializer):
     )
 
 
+class SearchExportRequestSerializer(SearchQuerySerializer):
+    export_format = serializers.ChoiceField(
+        choices=get_metadata_formats(),
+        default='csv',
+        help_text='Format of the exported metadata.',
+    )
+
+
 class SearchResultSerializer(serializers.Serializer):
     label = serializers.CharField()
     total = serializers.IntegerField()
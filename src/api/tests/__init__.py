@@ -1,5 +1,6 @@
 import json
 import shutil
+from contextlib import contextmanager
 
 import shortuuid
 from rest_framework import status
@@ -9,10 +10,13 @@ from wand.image import Image
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from artworks.models import Album, Artwork, Keyword, Location, Material, Person
+from image.queries import repeated_queries
 
 
 def temporary_image():
@@ -38,6 +42,7 @@ def media_url_to_file_path(instance, url: str):
 @override_settings(
     MEDIA_ROOT=settings.MEDIA_ROOT_TESTS,
     MEDIA_ROOT_PATH=settings.MEDIA_ROOT_TESTS,
+    EXPORT_ROOT=settings.MEDIA_ROOT_TESTS / 'exports',
 )
 class APITestCase(RestFrameworkAPITestCase):
     def setUp(self):
@@ -373,6 +378,59 @@ class APITestCase(RestFrameworkAPITestCase):
         else:
             self.assertEqual(len(content), 1)
 
+    @contextmanager
+    def assertQueryBudget(self, budget):  # noqa: N802
+        """Asserts that the block executes at most budget queries."""
+
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        queries = [q['sql'] for q in context.captured_queries]
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            '{} queries executed, the budget is {}:\n{}'.format(
+                len(queries),
+                budget,
+                '\n'.join(queries),
+            ),
+        )
+
+    def assertConstantQueries(self, request, sizes=(2, 10)):  # noqa: N802
+        """Asserts that request(size) executes the same number of queries
+        for all sizes, e.g. page sizes or numbers of slides.
+
+        request is called with every size and returns the response, which
+        has to be successful. Every request is made once before the queries
+        are counted, so that data cached by the first request, e.g. the
+        user of the session, does not change the numbers. If the numbers of
+        queries differ, the query shapes repeated with the largest size are
+        reported, as they usually point to the N+1 problem.
+        """
+
+        for size in sizes:
+            request(size)
+
+        captured = {}
+        for size in sizes:
+            with CaptureQueriesContext(connection) as context:
+                response = request(size)
+            self.assertLess(response.status_code, status.HTTP_400_BAD_REQUEST)
+            captured[size] = [q['sql'] for q in context.captured_queries]
+
+        counts = {size: len(queries) for size, queries in captured.items()}
+        self.assertEqual(
+            len(set(counts.values())),
+            1,
+            'numbers of queries by size: {}, repeated queries:\n{}'.format(
+                counts,
+                '\n'.join(
+                    f'{n}x {shape}'
+                    for shape, n in repeated_queries(captured[max(sizes)])
+                ),
+            ),
+        )
+
     def check_for_nonexistent_object(
         self,
         view_name,
@@ -1,15 +1,24 @@
 import json
+from io import StringIO
 
 import shortuuid
 from rest_framework import status
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from artworks.models import (
     Album,
     Artwork,
+    Folder,
+    FolderAlbumRelation,
     PermissionsRelation,
+    Person,
 )
 
 from .. import APITestCase, temporary_image
@@ -43,6 +52,157 @@ class AlbumsTests(APITestCase):
         ]
         self.offset_test(url, combinations, num_results)
 
+    def test_albums_list_queries(self):
+        """Test that the number of queries of the album list does not depend
+        on the number of albums."""
+
+        lecturer = User.objects.get(username='p0001234')
+        student = User.objects.get(username='s1234567')
+
+        for i in range(6):
+            artwork = Artwork.objects.create(title=f'Test Artwork {i}', published=True)
+            album = Album.objects.create(
+                title=f'Test Album {i}',
+                user=self.user if i % 2 else lecturer,
+                slides=[{'id': shortuuid.uuid(), 'items': [{'id': artwork.id}]}],
+            )
+            for user in (self.user, lecturer, student):
+                if user != album.user:
+                    PermissionsRelation.objects.create(album=album, user=user)
+
+        url = reverse('album-list', kwargs={'version': VERSION})
+
+        def request(limit):
+            response = self.client.get(url, {'limit': limit}, format='json')
+            self.assertEqual(len(json.loads(response.content)['results']), limit)
+            return response
+
+        self.assertConstantQueries(request)
+
+    def test_albums_preview(self):
+        """Test the preview images (contact sheets) of albums."""
+
+        artworks = [
+            Artwork.objects.create(
+                title=f'Test Artwork {i}',
+                image_original=temporary_image(),
+                published=True,
+            )
+            for i in range(5)
+        ]
+        # the previews are rendered in background jobs, once the changes are
+        # committed
+        with self.captureOnCommitCallbacks(execute=True):
+            album = Album.objects.create(
+                title='Test Album',
+                user=self.user,
+                slides=[
+                    {
+                        'id': shortuuid.uuid(),
+                        'items': [
+                            {'id': artwork.id} for artwork in artworks[i : i + 2]
+                        ],
+                    }
+                    for i in range(0, 5, 2)
+                ],
+            )
+        album.refresh_from_db()
+
+        self.assertTrue(album.preview)
+        self.assertEqual(album.preview.width, settings.ALBUM_PREVIEW_SIZE)
+        self.assertEqual(album.preview.height, settings.ALBUM_PREVIEW_SIZE)
+        preview_key = album.preview_key
+
+        # no update is enqueued, if the artworks of the slides did not change
+        with self.captureOnCommitCallbacks() as callbacks:
+            album.title = 'Changed Album'
+            album.save()
+            album.slides[0]['id'] = shortuuid.uuid()
+            album.save()
+        self.assertEqual(callbacks, [])
+
+        # the preview is only regenerated, if the first artworks change
+        self.assertFalse(album.update_preview())
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            album.slides[-1]['items'] = []
+            album.save()
+        self.assertEqual(len(callbacks), 1)
+        album.refresh_from_db()
+        self.assertEqual(album.preview_key, preview_key)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            artworks[0].published = False
+            artworks[0].save()
+        album.refresh_from_db()
+        self.assertNotEqual(album.preview_key, preview_key)
+
+        url = reverse('album-list', kwargs={'version': VERSION})
+        response = self.client.get(url, format='json')
+        content = json.loads(response.content)
+        result = next(r for r in content['results'] if r['id'] == album.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(result['preview'].endswith(album.preview.url))
+
+        # albums without artworks have no preview
+        with self.captureOnCommitCallbacks(execute=True):
+            album.slides = []
+            album.save()
+        album.refresh_from_db()
+        self.assertFalse(album.preview)
+        self.assertEqual(album.preview_key, '')
+
+    def test_albums_featured_artworks(self):
+        """Test the number of artworks and featured artworks of albums."""
+
+        artworks = [
+            Artwork.objects.create(title=f'Test Artwork {i}', published=i != 1)
+            for i in range(6)
+        ]
+        album = Album.objects.create(
+            title='Test Album',
+            user=self.user,
+            slides=[
+                {'id': shortuuid.uuid(), 'items': [{'id': artwork.id}]}
+                for artwork in artworks + artworks[:1]
+            ],
+        )
+        album.refresh_from_db()
+
+        self.assertEqual(album.number_of_artworks, 7)
+        self.assertEqual(
+            album.featured_artwork_ids,
+            [artworks[i].id for i in (0, 2, 3, 4)],
+        )
+
+        url = reverse('album-list', kwargs={'version': VERSION})
+        response = self.client.get(url, format='json')
+        content = json.loads(response.content)
+        result = next(r for r in content['results'] if r['id'] == album.id)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(result['number_of_artworks'], 7)
+        self.assertEqual(
+            [a['id'] for a in result['featured_artworks']],
+            album.featured_artwork_ids,
+        )
+
+        # publishing and deleting artworks updates the featured artworks
+        artworks[1].published = True
+        artworks[1].save()
+        artworks[0].delete()
+        album.refresh_from_db()
+        self.assertEqual(
+            album.featured_artwork_ids,
+            [artworks[i].id for i in (1, 2, 3, 4)],
+        )
+
+        album.slides = album.slides[:2]
+        album.save()
+        album.refresh_from_db()
+        self.assertEqual(album.number_of_artworks, 2)
+        self.assertEqual(album.featured_artwork_ids, [artworks[1].id])
+
     def test_albums_create(self):
         """Test the creation of a new album."""
 
@@ -123,6 +283,275 @@ class AlbumsTests(APITestCase):
             object_type='Album',
         )
 
+    def test_albums_copy(self):
+        """Test the copying of an album."""
+
+        artwork1 = Artwork.objects.create(title='Test Artwork 1', published=True)
+        artwork2 = Artwork.objects.create(title='Test Artwork 2', published=True)
+        lecturer = User.objects.get(username='p0001234')
+        album = Album.objects.create(
+            title='Foreign Album',
+            user=lecturer,
+            slides=[
+                {'id': shortuuid.uuid(), 'items': [{'id': artwork1.pk}]},
+                {'id': shortuuid.uuid(), 'items': [{'id': artwork2.pk}]},
+            ],
+        )
+        PermissionsRelation.objects.create(album=album, user=self.user)
+
+        url = reverse('album-copy', kwargs={'pk': album.pk, 'version': VERSION})
+        response = self.client.post(url, {}, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(content['id'], album.pk)
+        self.assertEqual(content['title'], album.title)
+        self.assertEqual(content['owner']['id'], self.user.username)
+        self.assertEqual(content['number_of_artworks'], 2)
+        self.assertEqual(content['version'], 1)
+        self.assertEqual(content['permissions'], [])
+        self.assertEqual(
+            [slide['items'] for slide in content['slides']],
+            [slide['items'] for slide in album.slides],
+        )
+
+        copy = Album.objects.get(pk=content['id'])
+        self.assertEqual(copy.featured_artwork_ids, [artwork1.pk, artwork2.pk])
+        self.assertEqual(
+            list(
+                copy.slide_items.values_list(
+                    'slide_position',
+                    'item_position',
+                    'artwork_id',
+                ),
+            ),
+            [(0, 0, artwork1.pk), (1, 0, artwork2.pk)],
+        )
+        self.assertTrue(
+            FolderAlbumRelation.objects.filter(
+                album=copy,
+                user=self.user,
+                folder=Folder.root_folder_for_user(self.user),
+            ).exists(),
+        )
+
+        response = self.client.post(url, {'title': 'My Copy'}, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(content['title'], 'My Copy')
+
+        # test copying non-existing album
+        self.check_for_nonexistent_object(
+            view_name='album-copy',
+            http_method='post',
+            object_type='Album',
+            data={},
+        )
+
+    def test_albums_bulk(self):
+        """Test bulk operations on several albums."""
+
+        artworks = [
+            Artwork.objects.create(title=f'Test Artwork {i}', published=True)
+            for i in range(3)
+        ]
+        album1 = Album.objects.create(
+            title='Test Album 1',
+            user=self.user,
+            slides=[
+                {
+                    'id': shortuuid.uuid(),
+                    'items': [{'id': artworks[0].pk}, {'id': artworks[1].pk}],
+                },
+            ],
+        )
+        album2 = Album.objects.create(
+            title='Test Album 2',
+            user=self.user,
+            slides=[
+                {'id': shortuuid.uuid(), 'items': [{'id': artworks[2].pk}]},
+                {'id': shortuuid.uuid(), 'items': [{'id': artworks[0].pk}]},
+            ],
+        )
+
+        url = reverse('album-bulk', kwargs={'version': VERSION})
+
+        # copy
+        data = {'op': 'copy', 'albums': [album1.pk, album2.pk]}
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([a['title'] for a in content], [album1.title, album2.title])
+        self.assertEqual([a['number_of_artworks'] for a in content], [2, 2])
+
+        # the number of queries does not depend on the number of albums
+        query_counts = []
+        for num_albums in (1, 2):
+            data = {'op': 'copy', 'albums': [album1.pk, album2.pk][:num_albums]}
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            query_counts.append(len(context.captured_queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+        # merge
+        data = {'op': 'merge', 'albums': [album2.pk, album1.pk], 'title': 'Merged'}
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(content), 1)
+        self.assertEqual(content[0]['title'], 'Merged')
+        self.assertEqual(content[0]['number_of_artworks'], 4)
+        self.assertEqual(
+            [slide['items'] for slide in content[0]['slides']],
+            [slide['items'] for slide in album2.slides + album1.slides],
+        )
+        # slides get new ids
+        self.assertEqual(len({slide['id'] for slide in content[0]['slides']}), 3)
+        merged = Album.objects.get(pk=content[0]['id'])
+        self.assertEqual(
+            list(
+                merged.slide_items.values_list(
+                    'slide_position',
+                    'item_position',
+                    'artwork_id',
+                ),
+            ),
+            [
+                (0, 0, artworks[2].pk),
+                (1, 0, artworks[0].pk),
+                (2, 0, artworks[0].pk),
+                (2, 1, artworks[1].pk),
+            ],
+        )
+        self.assertEqual(
+            merged.featured_artwork_ids,
+            [artworks[2].pk, artworks[0].pk, artworks[1].pk],
+        )
+
+        data = {'op': 'merge', 'albums': [album1.pk]}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # move
+        folder = Folder.objects.create(
+            title='Test Folder',
+            owner=self.user,
+            parent=Folder.root_folder_for_user(self.user),
+        )
+        data = {'op': 'move', 'albums': [album1.pk, album2.pk], 'folder': folder.pk}
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(
+                FolderAlbumRelation.objects.filter(
+                    album__in=[album1, album2],
+                    user=self.user,
+                ).values_list('folder_id', flat=True),
+            ),
+            {folder.pk},
+        )
+
+        data = {'op': 'move', 'albums': [album1.pk], 'folder': 'does-not-exist'}
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(content['detail'], 'Folder does not exist')
+
+        # share
+        lecturer = User.objects.get(username='p0001234')
+        student = User.objects.get(username='s1234567')
+        data = {
+            'op': 'share',
+            'albums': [album1.pk, album2.pk],
+            'permissions': [
+                {'user': lecturer.username, 'permissions': [{'id': 'EDIT'}]},
+                {'user': student.username, 'permissions': [{'id': 'VIEW'}]},
+            ],
+        }
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(content[0]['permissions']), 2)
+        self.assertEqual(
+            PermissionsRelation.objects.filter(album__in=[album1, album2]).count(),
+            4,
+        )
+        self.assertEqual(
+            FolderAlbumRelation.objects.filter(
+                album__in=[album1, album2],
+                user__in=[lecturer, student],
+            ).count(),
+            4,
+        )
+
+        # permissions of other users are kept, empty permissions remove users
+        data['permissions'] = [{'user': student.username, 'permissions': []}]
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(
+                PermissionsRelation.objects.filter(
+                    album__in=[album1, album2],
+                ).values_list('user__username', 'permissions'),
+            ),
+            [(lecturer.username, 'EDIT'), (lecturer.username, 'EDIT')],
+        )
+        self.assertFalse(
+            FolderAlbumRelation.objects.filter(
+                album__in=[album1, album2],
+                user=student,
+            ).exists(),
+        )
+
+        data['permissions'] = [{'user': 'does-not-exist', 'permissions': []}]
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(content['detail'], 'User does not exist')
+
+        # albums of other users cannot be shared
+        foreign_album = Album.objects.create(title='Foreign Album', user=lecturer)
+        PermissionsRelation.objects.create(
+            album=foreign_album,
+            user=self.user,
+            permissions='EDIT',
+        )
+        data = {
+            'op': 'share',
+            'albums': [album1.pk, foreign_album.pk],
+            'permissions': [
+                {'user': student.username, 'permissions': [{'id': 'VIEW'}]},
+            ],
+        }
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(content['invalid_ids'], [foreign_album.pk])
+        self.assertFalse(
+            PermissionsRelation.objects.filter(album=album1, user=student).exists(),
+        )
+
+        # operations on non-existing albums are not applied at all
+        data = {'op': 'copy', 'albums': [album1.pk, 'does-not-exist']}
+        num_albums = Album.objects.count()
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(content['detail'], 'Album does not exist')
+        self.assertEqual(content['invalid_ids'], ['does-not-exist'])
+        self.assertEqual(Album.objects.count(), num_albums)
+
     def test_albums_append_artwork(self):
         """Test the appending of artworks to album slides."""
 
@@ -296,6 +725,45 @@ class AlbumsTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(content['detail'], 'Artwork does not exist')
 
+        # all invalid artworks are returned at once
+        data = [
+            {'items': [{'id': artwork4.pk}, {'id': '98765'}]},
+            {'items': [{'id': artwork1.pk}, {'id': artwork4.pk}]},
+        ]
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(content['invalid_ids'], [artwork4.pk, '98765'])
+
+        # the number of queries does not depend on the number of artworks
+        artworks = [
+            Artwork.objects.create(title=f'Test Artwork {i}', published=True)
+            for i in range(10)
+        ]
+        num_queries = []
+        for num_artworks in (2, 10):
+            new_album = Album.objects.create(title='Test Album', user=self.user)
+            new_url = reverse(
+                'album-slides',
+                kwargs={'pk': new_album.pk, 'version': VERSION},
+            )
+            data = [{'items': [{'id': a.pk}]} for a in artworks[:num_artworks]]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(
+                    f'{new_url}?details=true',
+                    data,
+                    format='json',
+                )
+            content = json.loads(response.content)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(content), num_artworks)
+            self.assertEqual(content[0]['items'][0]['title'], artworks[0].title)
+            num_queries.append(len(context.captured_queries))
+
+        self.assertEqual(num_queries[0], num_queries[1])
+
         # test creating slides with non-existent album
         self.check_for_nonexistent_object(
             view_name='album-slides',
@@ -318,6 +786,323 @@ class AlbumsTests(APITestCase):
         self.assertEqual(content[0]['items'][0]['date'], '1976')
         self.assertEqual(content[0]['items'][0]['artists'][0]['value'], 'VALIE EXPORT')
 
+    def test_albums_update_slides(self):
+        """Test the incremental update of album slides."""
+
+        artworks = [
+            Artwork.objects.create(title=f'Test Artwork {i}', published=True)
+            for i in range(4)
+        ]
+        unpublished = Artwork.objects.create(title='Test Artwork', published=False)
+        album = Album.objects.create(
+            title='Test Album',
+            user=self.user,
+            slides=[
+                {'id': f'slide{i}', 'items': [{'id': artwork.id}]}
+                for i, artwork in enumerate(artworks[:3])
+            ],
+        )
+        version = album.version
+        row_ids = dict(album.slide_items.values_list('artwork_id', 'pk'))
+
+        url = reverse('album-slides', kwargs={'pk': album.pk, 'version': VERSION})
+        data = {
+            'operations': [
+                {'op': 'insert', 'index': 0, 'items': [{'id': artworks[3].id}]},
+                {'op': 'move', 'slide': 'slide2', 'index': 1},
+                {'op': 'pair', 'slide': 'slide0'},
+                {'op': 'remove', 'slide': 'slide2'},
+            ],
+        }
+        response = self.client.patch(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content['version'], version + 1)
+        self.assertEqual(len(content['created_slides']), 1)
+
+        new_slide = content['created_slides'][0]
+        album.refresh_from_db()
+        self.assertEqual(
+            album.slides,
+            [
+                {'id': new_slide, 'items': [{'id': artworks[3].id}]},
+                {
+                    'id': 'slide0',
+                    'items': [{'id': artworks[0].id}, {'id': artworks[1].id}],
+                },
+            ],
+        )
+        self.assertEqual(album.number_of_artworks, 3)
+        self.assertEqual(
+            list(
+                album.slide_items.values_list(
+                    'slide_position',
+                    'item_position',
+                    'artwork_id',
+                ),
+            ),
+            [(0, 0, artworks[3].id), (1, 0, artworks[0].id), (1, 1, artworks[1].id)],
+        )
+        # the rows of kept slides are shifted, not recreated
+        self.assertEqual(
+            album.slide_items.get(artwork=artworks[0]).pk,
+            row_ids[artworks[0].id],
+        )
+
+        data = {'operations': [{'op': 'unpair', 'slide': 'slide0'}]}
+        response = self.client.patch(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content['version'], version + 2)
+        album.refresh_from_db()
+        self.assertEqual(
+            [slide['id'] for slide in album.slides],
+            [new_slide, 'slide0', content['created_slides'][0]],
+        )
+
+        # invalid operations are not applied at all
+        for operations, detail in [
+            (
+                [
+                    {'op': 'remove', 'slide': 'slide0'},
+                    {'op': 'insert', 'items': [{'id': unpublished.id}]},
+                ],
+                'Artwork does not exist',
+            ),
+            (
+                [
+                    {'op': 'remove', 'slide': 'slide0'},
+                    {'op': 'move', 'slide': 'slide0', 'index': 0},
+                ],
+                'Slide does not exist',
+            ),
+            ([{'op': 'unpair', 'slide': 'slide0'}], None),
+            ([{'op': 'pair', 'slide': content['created_slides'][0]}], None),
+            ([{'op': 'move', 'slide': 'slide0'}], None),
+            ([{'op': 'insert', 'items': []}], None),
+        ]:
+            response = self.client.patch(
+                url,
+                {'operations': operations},
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            if detail:
+                self.assertEqual(json.loads(response.content)['detail'], detail)
+
+        album.refresh_from_db()
+        self.assertEqual(album.version, version + 2)
+
+        # users with VIEW permissions cannot change the slides
+        album = Album.objects.create(
+            title='Test Album',
+            user=User.objects.get(username='p0001234'),
+        )
+        PermissionsRelation.objects.create(
+            album=album,
+            user=self.user,
+            permissions='VIEW',
+        )
+        url = reverse('album-slides', kwargs={'pk': album.pk, 'version': VERSION})
+        data = {'operations': [{'op': 'insert', 'items': [{'id': artworks[0].id}]}]}
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        # test updating the slides of a non-existent album
+        self.check_for_nonexistent_object(
+            view_name='album-slides',
+            http_method='patch',
+            object_type='Album',
+            data=data,
+        )
+
+    def test_albums_concurrent_changes(self):
+        """Test conditional changes of albums and fetching their changes."""
+
+        artwork = Artwork.objects.create(title='Test Artwork', published=True)
+        album = Album.objects.create(title='Test Album', user=self.user)
+
+        url = reverse('album-detail', kwargs={'pk': album.pk, 'version': VERSION})
+        url_slides = reverse(
+            'album-slides',
+            kwargs={'pk': album.pk, 'version': VERSION},
+        )
+        url_changes = reverse(
+            'album-changes',
+            kwargs={'pk': album.pk, 'version': VERSION},
+        )
+
+        response = self.client.get(url, format='json')
+        etag = response.headers['ETag']
+        version = json.loads(response.content)['version']
+
+        response = self.client.put(
+            url,
+            {'title': 'Changed Album'},
+            format='json',
+            headers={'If-Match': etag},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        new_etag = response.headers['ETag']
+
+        # changes based on an outdated version fail
+        response = self.client.put(
+            url,
+            {'title': 'Test Album'},
+            format='json',
+            headers={'If-Match': etag},
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        data = {'operations': [{'op': 'insert', 'items': [{'id': artwork.id}]}]}
+        response = self.client.patch(
+            url_slides,
+            data,
+            format='json',
+            headers={'If-Match': etag},
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        response = self.client.post(
+            url_slides,
+            [{'items': [{'id': artwork.id}]}],
+            format='json',
+            headers={'If-Match': etag},
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        album.refresh_from_db()
+        self.assertEqual(album.title, 'Changed Album')
+        self.assertEqual(album.slides, [])
+
+        response = self.client.patch(
+            url_slides,
+            data,
+            format='json',
+            headers={'If-Match': new_etag},
+        )
+        content = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # fetch the changes since the first version
+        response = self.client.get(url_changes, {'since': version}, format='json')
+        changes = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(changes['version'], content['version'])
+        self.assertTrue(changes['complete'])
+        self.assertEqual(
+            [c['operations'] for c in changes['changes']],
+            [
+                [{'op': 'title', 'title': 'Changed Album'}],
+                [
+                    {
+                        'op': 'insert',
+                        'slide': content['created_slides'][0],
+                        'index': 0,
+                        'items': [{'id': artwork.id}],
+                    },
+                ],
+            ],
+        )
+        self.assertEqual(changes['changes'][0]['user']['id'], self.user.username)
+
+        response = self.client.get(
+            url_changes,
+            {'since': changes['version']},
+            format='json',
+        )
+        self.assertEqual(json.loads(response.content)['changes'], [])
+
+        # changes which were not recorded make the list incomplete
+        response = self.client.get(url_changes, {'since': 0}, format='json')
+        self.assertFalse(json.loads(response.content)['complete'])
+
+        response = self.client.get(url_changes, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_albums_retrieve_conditional(self):
+        """Test conditional requests for albums and folders."""
+
+        artwork = Artwork.objects.create(title='Test Artwork', published=True)
+        album = Album.objects.create(
+            title='Test Album',
+            user=self.user,
+            slides=[{'id': shortuuid.uuid(), 'items': [{'id': artwork.id}]}],
+        )
+
+        for url in [
+            reverse('album-detail', kwargs={'pk': album.pk, 'version': VERSION}),
+            reverse('album-slides', kwargs={'pk': album.pk, 'version': VERSION}),
+        ]:
+            response = self.client.get(url, {'details': True}, format='json')
+            etag = response.headers['ETag']
+
+            response = self.client.get(
+                url,
+                {'details': True},
+                format='json',
+                headers={'If-None-Match': etag},
+            )
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            # the details of the artworks are part of the response
+            artwork.title = f'{artwork.title} changed'
+            artwork.save()
+
+            response = self.client.get(
+                url,
+                {'details': True},
+                format='json',
+                headers={'If-None-Match': etag},
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        FolderAlbumRelation.objects.get_or_create(
+            folder=Folder.root_folder_for_user(self.user),
+            album=album,
+            user=self.user,
+        )
+
+        url = reverse('folder-detail', kwargs={'pk': 'root', 'version': VERSION})
+        response = self.client.get(url, format='json')
+        etag = response.headers['ETag']
+
+        response = self.client.get(url, format='json', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # the ETags of folders only depend on the folders of the user and the
+        # albums in them
+        other_user = User.objects.create(username='abc1def2')
+        other_album = Album.objects.create(title='Other Album', user=other_user)
+        FolderAlbumRelation.objects.create(
+            folder=Folder.root_folder_for_user(other_user),
+            album=other_album,
+            user=other_user,
+        )
+        other_album.title = 'Changed Other Album'
+        other_album.save()
+
+        response = self.client.get(url, format='json', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        album.title = 'Changed Album'
+        album.save()
+
+        response = self.client.get(url, format='json', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers['ETag']
+
+        # the featured artworks of the albums are part of the response
+        artwork.title = 'Changed Artwork'
+        artwork.save()
+
+        response = self.client.get(url, format='json', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_albums_permissions(self):
         """Test the retrieval of album permissions."""
 
@@ -394,6 +1179,66 @@ class AlbumsTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(content['detail'], 'User does not exist')
 
+        # all users which do not exist are reported, and nothing is changed
+        data = [
+            {'user': 'does-not-exist-1', 'permissions': [{'id': 'VIEW'}]},
+            {'user': new_user.username, 'permissions': [{'id': 'EDIT'}]},
+            {'user': 'does-not-exist-2', 'permissions': [{'id': 'VIEW'}]},
+        ]
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            content['invalid_ids'],
+            ['does-not-exist-1', 'does-not-exist-2'],
+        )
+        self.assertEqual(
+            PermissionsRelation.objects.get(album=album, user=new_user).permissions,
+            'VIEW',
+        )
+
+        # the permissions of users who are not listed are removed
+        users = [User.objects.create(username=f'user{i:04}') for i in range(10)]
+        data = [{'user': users[0].username, 'permissions': [{'id': 'VIEW'}]}]
+        response = self.client.post(url, data, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['user']['id'] for p in content], [users[0].username])
+        self.assertFalse(
+            FolderAlbumRelation.objects.filter(album=album, user=new_user).exists(),
+        )
+
+        # the number of queries does not depend on the number of users
+        for user in users:
+            Folder.root_folder_for_user(user)
+        query_counts = []
+        for num_users in (2, 10):
+            PermissionsRelation.objects.filter(album=album).delete()
+            FolderAlbumRelation.objects.filter(album=album).exclude(
+                user=self.user,
+            ).delete()
+            data = [
+                {'user': user.username, 'permissions': [{'id': 'VIEW'}]}
+                for user in users[:num_users]
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(url, data, format='json')
+            content = json.loads(response.content)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(content), num_users)
+            self.assertEqual(
+                FolderAlbumRelation.objects.filter(
+                    album=album,
+                    user__in=users[:num_users],
+                ).count(),
+                num_users,
+            )
+            query_counts.append(len(context.captured_queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
     def test_albums_destroy_permissions(self):
         """Test the deletion of album permissions."""
 
@@ -452,6 +1297,65 @@ class AlbumsTests(APITestCase):
             Album.objects.filter(pk=album.pk).exists(),
         )
 
+    def test_albums_permission_cache(self):
+        """Test that the album and the permission of the user are fetched
+        once per request, and that cached permissions are invalidated."""
+
+        album = Album.objects.create(title='Test Album', user=self.user)
+        student = User.objects.get(username='s1234567')
+        student.tos_accepted = True
+        student.save()
+        PermissionsRelation.objects.create(
+            album=album,
+            user=student,
+            permissions='VIEW',
+        )
+
+        url = reverse('album-detail', kwargs={'pk': album.pk, 'version': VERSION})
+        permissions_url = reverse(
+            'album-permissions',
+            kwargs={'pk': album.pk, 'version': VERSION},
+        )
+
+        # the ETag function and the view share the album
+        self.client.force_login(student)
+        for _i in range(2):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                len(
+                    [
+                        q
+                        for q in context.captured_queries
+                        if q['sql'].startswith('SELECT')
+                        and 'FROM "artworks_album"' in q['sql']
+                    ],
+                ),
+                1,
+            )
+
+        response = self.client.put(url, {'title': 'Changed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        # changed permissions take effect immediately
+        self.client.force_login(self.user)
+        data = [{'user': student.username, 'permissions': [{'id': 'EDIT'}]}]
+        response = self.client.post(permissions_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_login(student)
+        response = self.client.put(url, {'title': 'Changed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_login(self.user)
+        response = self.client.delete(permissions_url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.client.force_login(student)
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_albums_download(self):
         """Test the download of an album."""
 
@@ -494,7 +1398,7 @@ class AlbumsTests(APITestCase):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(type(response.content), bytes)
+        self.assertEqual(type(b''.join(response.streaming_content)), bytes)
 
         # test album pdf download
         url = reverse('album-download', kwargs={'pk': album.pk, 'version': VERSION})
@@ -507,9 +1411,231 @@ class AlbumsTests(APITestCase):
             'application/pdf',
         )
 
+        # test album downloads in the other export formats
+        for download_format, content_type in (
+            ('html', 'text/html; charset=utf-8'),
+            ('zip', 'application/zip'),
+        ):
+            response = self.client.get(
+                f'{url}?download_format={download_format}',
+                format='json',
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.headers['Content-Type'], content_type)
+
+        response = self.client.get(f'{url}?download_format=iiif', format='json')
+        content = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content['type'], 'Manifest')
+        self.assertEqual(len(content['items']), 3)
+        self.assertEqual(len(content['structures']), 2)
+        self.assertTrue(content['id'].endswith('?download_format=iiif'))
+        for canvas in content['items']:
+            self.assertNotIn('?', canvas['id'])
+            self.assertIn('/canvas/', canvas['id'])
+
+        # test downloading an invalid format
+        response = self.client.get(f'{url}?download_format=docx', format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # test that large albums are exported in a background job
+        with override_settings(EXPORT_SYNC_MAX_ARTWORKS=2):
+            response = self.client.get(f'{url}?download_format=zip', format='json')
+            content = json.loads(response.content)
+
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertIn(content['id'], content['url'])
+
+            # jobs are run synchronously in tests
+            response = self.client.get(content['url'], format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.headers['Content-Type'], 'application/zip')
+            self.assertEqual(
+                response.headers['Content-Disposition'],
+                'attachment; filename="test-album.zip"',
+            )
+            response.close()
+
+            # old exports are deleted
+            with override_settings(EXPORT_FILE_TTL=-1):
+                call_command('delete_old_exports', stdout=StringIO())
+            response = self.client.get(content['url'], format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # test retrieving a non-existing download job
+        response = self.client.get(
+            reverse(
+                'album-download-job',
+                kwargs={'pk': album.pk, 'job_id': 'missing', 'version': VERSION},
+            ),
+            format='json',
+        )
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(content['detail'], 'Download does not exist')
+
         # test downloading non-existing album
         self.check_for_nonexistent_object(
             view_name='album-download',
             http_method='get',
             object_type='Album',
         )
+
+    def test_albums_metadata(self):
+        """Test the metadata export of an album."""
+
+        artwork1 = Artwork.objects.create(
+            title='Test Artwork 1',
+            image_original=temporary_image(),
+            published=True,
+        )
+        artwork2 = Artwork.objects.create(
+            title='Test Artwork 2',
+            image_original=temporary_image(),
+            published=True,
+        )
+        album = Album.objects.create(
+            title='Test Album',
+            user=self.user,
+            slides=[
+                {'id': shortuuid.uuid(), 'items': [{'id': artwork2.id}]},
+                {
+                    'id': shortuuid.uuid(),
+                    'items': [{'id': artwork1.id}, {'id': artwork2.id}],
+                },
+            ],
+        )
+
+        url = reverse('album-metadata', kwargs={'pk': album.pk, 'version': VERSION})
+        response = self.client.get(f'{url}?export_format=jsonl', format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.headers['Content-Disposition'],
+            'attachment; filename=test-album.jsonl',
+        )
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).decode().splitlines()
+        ]
+        # artworks are exported once, in the order of the slides
+        self.assertEqual([row['id'] for row in rows], [artwork2.pk, artwork1.pk])
+        self.assertEqual(rows[1]['title'], artwork1.title)
+
+        response = self.client.get(url, format='json')
+        content = b''.join(response.streaming_content).decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.headers['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(len(content.splitlines()), 3)
+
+        # test exporting non-existing album
+        self.check_for_nonexistent_object(
+            view_name='album-metadata',
+            http_method='get',
+            object_type='Album',
+        )
+
+    def test_albums_shared(self):
+        """Test the cursor pagination of albums shared with the user."""
+
+        owner = User.objects.create(username='abc1def2')
+        albums = [
+            Album.objects.create(title=f'Shared Album {i}', user=owner)
+            for i in range(3)
+        ]
+        for album in albums:
+            PermissionsRelation.objects.create(album=album, user=self.user)
+        # albums of the user and albums not shared with them are not listed
+        Album.objects.create(title='Own Album', user=self.user)
+        Album.objects.create(title='Other Album', user=owner)
+
+        url = reverse('album-shared', kwargs={'version': VERSION})
+        response = self.client.get(
+            url,
+            {'sort_by': 'title', 'limit': 2},
+            format='json',
+        )
+        content = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [album['id'] for album in content['results']],
+            [albums[0].id, albums[1].id],
+        )
+        self.assertIsNotNone(content['next'])
+
+        response = self.client.get(
+            url,
+            {'sort_by': 'title', 'limit': 2, 'cursor': content['next']},
+            format='json',
+        )
+        content = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([album['id'] for album in content['results']], [albums[2].id])
+        self.assertIsNone(content['next'])
+
+        # test the default sorting by the newest change
+        response = self.client.get(url, format='json')
+        content = json.loads(response.content)
+        self.assertEqual(
+            [album['id'] for album in content['results']],
+            [album.id for album in reversed(albums)],
+        )
+
+        response = self.client.get(url, {'cursor': 'invalid'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_albums_retrieve_queries(self):
+        """Test that the number of queries of an album with the details of
+        its slides does not depend on the number of slides."""
+
+        artist = Person.objects.create(name='TestArtist')
+        artworks = []
+        for i in range(10):
+            artwork = Artwork.objects.create(title=f'Test Artwork {i}', published=True)
+            artwork.artists.add(artist)
+            artworks.append(artwork)
+
+        albums = {
+            size: Album.objects.create(
+                title=f'Test Album {size}',
+                user=self.user,
+                slides=[
+                    {'id': shortuuid.uuid(), 'items': [{'id': artwork.id}]}
+                    for artwork in artworks[:size]
+                ],
+            )
+            for size in (2, 10)
+        }
+
+        for view_name in ('album-detail', 'album-slides'):
+            self.assertConstantQueries(
+                lambda size, view_name=view_name: self.client.get(
+                    reverse(
+                        view_name,
+                        kwargs={'pk': albums[size].pk, 'version': VERSION},
+                    ),
+                    {'details': 'true'},
+                    format='json',
+                ),
+            )
+
+    def test_albums_shared_queries(self):
+        """Test that the number of queries of the shared albums does not
+        depend on the page size."""
+
+        owner = User.objects.create(username='abc1def2')
+        for i in range(10):
+            album = Album.objects.create(title=f'Shared Album {i}', user=owner)
+            PermissionsRelation.objects.create(album=album, user=self.user)
+
+        url = reverse('album-shared', kwargs={'version': VERSION})
+        self.assertConstantQueries(
+            lambda size: self.client.get(url, {'limit': size}, format='json'),
+        )
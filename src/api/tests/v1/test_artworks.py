@@ -6,7 +6,11 @@ import shortuuid
 from rest_framework import status
 from wand.image import Image
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
@@ -49,6 +53,56 @@ class ArtworkTests(APITestCase):
         ]
         self.offset_test(url, combinations, num_results)
 
+    def test_artworks_list_editor(self):
+        """Test that the editor role is resolved once per request and
+        cached across requests until the groups of the user change."""
+
+        url = reverse('artwork-list', kwargs={'version': VERSION})
+        editor_group, _created = Group.objects.get_or_create(
+            name=settings.EDITOR_GROUP,
+        )
+        self.user.groups.add(editor_group)
+
+        query_counts = []
+        for _i in range(2):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, format='json')
+            content = json.loads(response.content)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(all('editing_link' in a for a in content['results']))
+            query_counts.append(
+                len(
+                    [q for q in context.captured_queries if '"auth_group"' in q['sql']],
+                ),
+            )
+        self.assertEqual(query_counts, [1, 0])
+
+        self.user.groups.remove(editor_group)
+        response = self.client.get(url, format='json')
+        content = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('editing_link' in a for a in content['results']))
+
+    def test_artworks_list_queries(self):
+        """Test that the number of queries of the artwork list does not
+        depend on the page size, also for editors."""
+
+        editor_group, _created = Group.objects.get_or_create(
+            name=settings.EDITOR_GROUP,
+        )
+        self.user.groups.add(editor_group)
+        artist = Person.objects.create(name='TestArtist')
+        for i in range(10):
+            artwork = Artwork.objects.create(title=f'Test Artwork {i}', published=True)
+            artwork.artists.add(artist)
+
+        url = reverse('artwork-list', kwargs={'version': VERSION})
+        self.assertConstantQueries(
+            lambda size: self.client.get(url, {'limit': size}, format='json'),
+        )
+
     def test_artworks_retrieve(self):
         """Test the retrieval of an artwork."""
 
@@ -77,6 +131,48 @@ class ArtworkTests(APITestCase):
         # test retrieving artwork, when artwork does not exist
         self.check_for_nonexistent_object('artwork-detail', 'get', 'Artwork')
 
+    def test_artworks_retrieve_conditional(self):
+        """Test conditional requests for artworks."""
+
+        artwork = Artwork.objects.create(title='Test Artwork', published=True)
+
+        url = reverse('artwork-detail', kwargs={'pk': artwork.pk, 'version': VERSION})
+        response = self.client.get(url, format='json')
+        etag = response.headers['ETag']
+
+        response = self.client.get(url, format='json', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        # changes of the artwork and its related metadata change the ETag
+        artist = Person.objects.create(name='Test Artist')
+        artwork.artists.add(artist)
+        artwork.title = 'Changed Artwork'
+        artwork.save()
+
+        response = self.client.get(url, format='json', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['title'], 'Changed Artwork')
+        etag = response.headers['ETag']
+
+        artist.name = 'Changed Artist'
+        artist.save()
+
+        response = self.client.get(url, format='json', headers={'If-None-Match': etag})
+        content = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content['artists'][0]['value'], 'Changed Artist')
+
+        # static responses are conditional, too
+        url = reverse('artwork-labels', kwargs={'version': VERSION})
+        response = self.client.get(url, format='json')
+        response = self.client.get(
+            url,
+            format='json',
+            headers={'If-None-Match': response.headers['ETag']},
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
     def test_artworks_image(self):
         """Test crop/resize and default image generation."""
 
@@ -296,6 +392,23 @@ class ArtworkTests(APITestCase):
         response = self.client.post(url_post_lecturer, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+        # test that the slide items are kept in sync with the slides
+        self.assertEqual(
+            list(
+                lecturer_album.slide_items.values_list(
+                    'slide_position',
+                    'item_position',
+                    'artwork_id',
+                ),
+            ),
+            [(0, 0, aw1.pk), (1, 0, aw1.pk)],
+        )
+
+        # test that the slide items are deleted with the artwork
+        aw1.delete()
+        self.assertFalse(lecturer_album.slide_items.exists())
+        self.assertFalse(user_album.slide_items.exists())
+
         # test retrieving artwork, when artwork does not exist
         self.check_for_nonexistent_object('artwork-detail', 'get', 'Artwork')
 
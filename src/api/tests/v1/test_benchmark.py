@@ -0,0 +1,68 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from rest_framework import status
+
+from django.core.management import call_command
+
+from artworks.models import Album, AlbumSlideItem, Artwork, Folder
+
+from .. import APITestCase
+
+
+class BenchmarkTests(APITestCase):
+    def test_generate_synthetic_collection(self):
+        """Test that the synthetic collection is deterministic and
+        consistent."""
+
+        options = {'artworks': 40, 'users': 3, 'albums': 6, 'stdout': StringIO()}
+        artworks = Artwork.objects.filter(title__startswith='synthetic ')
+
+        call_command('generate_synthetic_collection', **options)
+        artwork_ids = set(artworks.values_list('id', flat=True))
+        album_ids = set(Album.objects.values_list('id', flat=True))
+        self.assertEqual(len(artwork_ids), 40)
+
+        call_command('generate_synthetic_collection', clear=True, **options)
+        self.assertEqual(set(artworks.values_list('id', flat=True)), artwork_ids)
+        self.assertEqual(set(Album.objects.values_list('id', flat=True)), album_ids)
+
+        self.assertFalse(artworks.filter(search_vector=None).exists())
+        for album in Album.objects.all():
+            self.assertEqual(
+                album.slide_items.count(),
+                album.number_of_artworks,
+            )
+            self.assertTrue(
+                Folder.objects.get(owner=album.user, parent=None)
+                .albums.filter(pk=album.pk)
+                .exists(),
+            )
+        self.assertEqual(
+            AlbumSlideItem.objects.count(),
+            sum(Album.objects.values_list('number_of_artworks', flat=True)),
+        )
+
+    def test_benchmark_api(self):
+        """Test that the benchmark requests all endpoints successfully."""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = Path(tmp_dir) / 'benchmark.json'
+            call_command(
+                'benchmark_api',
+                sizes=[20],
+                repeat=1,
+                output=str(output),
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+            results = json.loads(output.read_text())
+
+        self.assertEqual(len(results['results']), 1)
+        self.assertEqual(results['results'][0]['size'], 20)
+        endpoints = results['results'][0]['endpoints']
+        self.assertIn('album-retrieve', [ep['name'] for ep in endpoints])
+        for ep in endpoints:
+            self.assertEqual(ep['status'], status.HTTP_200_OK, ep['name'])
@@ -4,6 +4,7 @@ from rest_framework import status
 
 from django.urls import reverse
 
+from artworks.discriminatory_terms import split_discriminatory_terms
 from artworks.models import Artwork, DiscriminatoryTerm
 
 from .. import APITestCase, temporary_image
@@ -37,3 +38,39 @@ class DiscriminatoryTermsTests(APITestCase):
         self.assertEqual(type(terms), list)
         self.assertEqual(len(terms), 3)
         self.assertEqual(terms[2], 'Disabled')
+
+    def test_split_discriminatory_terms(self):
+        """Test the matching of discriminatory terms in texts."""
+
+        DiscriminatoryTerm.objects.create(term='Colored')
+        DiscriminatoryTerm.objects.create(term='Colored people')
+        DiscriminatoryTerm.objects.create(term='People')
+
+        self.assertEqual(
+            split_discriminatory_terms(
+                'Portrait of colored People, colored',
+                ['Colored', 'Colored people', 'People'],
+            ),
+            [
+                ('Portrait of ', False),
+                ('colored People', True),
+                (', ', False),
+                ('colored', True),
+            ],
+        )
+        # only the given terms are matched
+        self.assertEqual(
+            split_discriminatory_terms('colored people', ['People']),
+            [('colored ', False), ('people', True)],
+        )
+        self.assertEqual(
+            split_discriminatory_terms('colored people', []),
+            [('colored people', False)],
+        )
+
+        # the matcher is rebuilt when the terms change
+        DiscriminatoryTerm.objects.create(term='Savage')
+        self.assertEqual(
+            split_discriminatory_terms('Savage', ['Savage']),
+            [('Savage', True)],
+        )
@@ -1,10 +1,14 @@
 import json
 
+from django_cas_ng.signals import cas_user_authenticated
 from rest_framework import status
 
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from artworks.models import Folder
+from artworks.models import Album, Folder, FolderAlbumRelation, FolderClosure
 
 from .. import APITestCase
 from . import VERSION
@@ -14,10 +18,15 @@ class FoldersTests(APITestCase):
     def test_folders_list(self):
         """Test the retrieval of all albums for a user."""
 
+        # users have only one root folder
         folder1 = Folder.objects.create(title='Test Folder', owner=self.user)
-        folder2 = Folder.objects.create(title='Test Folder2', owner=self.user)
-        Folder.objects.create(title='Test Folder3', owner=self.user)
-        Folder.objects.create(title='Test Folder4', owner=self.user)
+        folder2 = Folder.objects.create(
+            title='Test Folder2',
+            owner=self.user,
+            parent=folder1,
+        )
+        Folder.objects.create(title='Test Folder3', owner=self.user, parent=folder1)
+        Folder.objects.create(title='Test Folder4', owner=self.user, parent=folder1)
 
         url = reverse('folder-list', kwargs={'version': VERSION})
         response = self.client.get(url, format='json')
@@ -76,3 +85,195 @@ class FoldersTests(APITestCase):
 
         # test retrieval of non-existent folder
         self.check_for_nonexistent_object('folder-detail', 'get', 'Folder')
+
+    def test_folders_nested(self):
+        """Test the creation, retrieval, moving and deletion of subfolders."""
+
+        root_folder = Folder.root_folder_for_user(self.user)
+
+        # test creation of folders
+        url = reverse('folder-list', kwargs={'version': VERSION})
+        response = self.client.post(url, {'title': 'Parent'}, format='json')
+        content = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(content['parent'], root_folder.id)
+        parent = Folder.objects.get(pk=content['id'])
+
+        response = self.client.post(
+            url,
+            {'title': 'Child', 'parent': parent.id},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        child = Folder.objects.get(pk=json.loads(response.content)['id'])
+
+        album1 = Album.objects.create(title='Test Album1', user=self.user)
+        album2 = Album.objects.create(title='Test Album2', user=self.user)
+        FolderAlbumRelation.objects.create(album=album1, user=self.user, folder=parent)
+        FolderAlbumRelation.objects.create(album=album2, user=self.user, folder=child)
+
+        # test retrieval of the content, subfolders are listed before albums
+        url = reverse('folder-detail', kwargs={'pk': parent.pk, 'version': VERSION})
+        response = self.client.get(url, format='json')
+        content = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            content['breadcrumbs'],
+            [{'id': root_folder.id, 'title': root_folder.title}],
+        )
+        self.assertEqual(content['content']['total'], 2)
+        self.assertEqual(
+            [(item['id'], item['type']) for item in content['content']['data']],
+            [(child.id, 'Folder'), (album1.id, 'Album')],
+        )
+        self.assertEqual(content['content']['data'][0]['number_of_albums'], 1)
+
+        # test that the total is counted with the same filters as the page
+        response = self.client.get(url, {'owner': 'false'}, format='json')
+        content = json.loads(response.content)
+        self.assertEqual(content['content']['total'], 1)
+        self.assertEqual(content['content']['data'][0]['id'], child.id)
+
+        # test the total, if the offset exceeds it
+        response = self.client.get(url, {'offset': 5}, format='json')
+        content = json.loads(response.content)
+        self.assertEqual(content['content']['total'], 2)
+        self.assertEqual(content['content']['data'], [])
+
+        # test tree of the root folder
+        url = reverse('folder-tree', kwargs={'pk': 'root', 'version': VERSION})
+        response = self.client.get(url, format='json')
+        content = json.loads(response.content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(f['id'], f['depth'], f['number_of_albums']) for f in content],
+            [(parent.id, 1, 2), (child.id, 2, 1)],
+        )
+
+        # test that folders cannot be moved into their subfolders
+        url = reverse('folder-detail', kwargs={'pk': parent.pk, 'version': VERSION})
+        response = self.client.patch(url, {'parent': child.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # test moving a folder to the root folder
+        url = reverse('folder-detail', kwargs={'pk': child.pk, 'version': VERSION})
+        response = self.client.patch(url, {'parent': 'root'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['parent'], root_folder.id)
+        self.assertEqual(
+            set(
+                FolderClosure.objects.filter(descendant=child).values_list(
+                    'ancestor',
+                    'depth',
+                ),
+            ),
+            {(child.id, 0), (root_folder.id, 1)},
+        )
+
+        # test deletion, the albums are moved to the parent folder
+        response = self.client.delete(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Folder.objects.filter(pk=child.pk).exists())
+        self.assertTrue(
+            FolderAlbumRelation.objects.filter(
+                album=album2,
+                folder=root_folder,
+            ).exists(),
+        )
+
+        # test that albums in several deleted subfolders are moved only once
+        other = Folder.objects.create(
+            title='Other',
+            owner=self.user,
+            parent=root_folder,
+        )
+        for title in ['Sub1', 'Sub2']:
+            subfolder = Folder.objects.create(
+                title=title,
+                owner=self.user,
+                parent=other,
+            )
+            FolderAlbumRelation.objects.create(
+                album=album1,
+                user=self.user,
+                folder=subfolder,
+            )
+        url = reverse('folder-detail', kwargs={'pk': other.pk, 'version': VERSION})
+        response = self.client.delete(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            FolderAlbumRelation.objects.filter(
+                album=album1,
+                folder=root_folder,
+            ).count(),
+            1,
+        )
+
+        # test that the root folder cannot be deleted
+        url = reverse('folder-detail', kwargs={'pk': 'root', 'version': VERSION})
+        response = self.client.delete(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_folders_root_provisioning(self):
+        """Test the creation of root folders at login and by the command."""
+
+        album = Album.objects.create(title='Test Album', user=self.user)
+
+        cas_user_authenticated.send(
+            sender=None,
+            user=self.user,
+            created=False,
+            attributes={},
+            ticket='',
+            service='',
+            request=None,
+        )
+        root_folder = Folder.objects.get(owner=self.user, parent=None)
+        self.assertTrue(
+            FolderAlbumRelation.objects.filter(
+                album=album,
+                folder=root_folder,
+            ).exists(),
+        )
+
+        # the id of the root folder is cached
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(Folder.root_folder_id_for_user(self.user), root_folder.id)
+        self.assertEqual(len(queries), 0)
+
+        root_folder.delete()
+        call_command('create_root_folders', verbosity=0)
+        self.assertEqual(Folder.objects.filter(owner=self.user, parent=None).count(), 1)
+        self.assertEqual(
+            Folder.root_folder_id_for_user(self.user),
+            Folder.objects.get(owner=self.user, parent=None).id,
+        )
+
+        # users cannot have more than one root folder
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Folder.objects.create(title='Test Folder', owner=self.user)
+
+    def test_folder_retrieve_queries(self):
+        """Test that the number of queries of the folder content does not
+        depend on the page size."""
+
+        root_folder = Folder.root_folder_for_user(self.user)
+        for i in range(5):
+            Folder.objects.create(
+                title=f'Folder {i}',
+                owner=self.user,
+                parent=root_folder,
+            )
+            album = Album.objects.create(title=f'Test Album {i}', user=self.user)
+            FolderAlbumRelation.objects.create(
+                album=album,
+                user=self.user,
+                folder=root_folder,
+            )
+
+        url = reverse('folder-detail', kwargs={'pk': 'root', 'version': VERSION})
+        # the pages contain folders and albums
+        self.assertConstantQueries(
+            lambda size: self.client.get(url, {'limit': size}, format='json'),
+            sizes=(6, 10),
+        )
@@ -0,0 +1,26 @@
+from rest_framework import status
+
+from django.test import override_settings
+from django.urls import reverse
+
+from .. import APITestCase
+
+
+class MetricsTests(APITestCase):
+    def test_metrics(self):
+        """Test that the metrics are only exported with the token."""
+
+        url = reverse('metrics')
+
+        with override_settings(METRICS_TOKEN=None):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        with override_settings(METRICS_TOKEN='secret'):  # noqa: S106
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+            response = self.client.get(url, headers={'Authorization': 'Bearer secret'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn(b'image_thumbnail_requests_total', response.content)
+            self.assertIn(b'rq_jobs', response.content)
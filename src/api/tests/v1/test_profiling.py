@@ -0,0 +1,53 @@
+from rest_framework import status
+
+from django.test import modify_settings, override_settings
+from django.urls import reverse
+
+from image.profiling import get_profile
+
+from .. import APITestCase
+from . import VERSION
+
+
+# the middleware is only added with PROFILING_ENABLED
+@modify_settings(MIDDLEWARE={'append': 'image.profiling.ProfilingMiddleware'})
+class ProfilingTests(APITestCase):
+    def test_profiling(self):
+        """Test that requests are profiled with the header for staff users
+        or when they are sampled, and that the profiles are shown in the
+        admin."""
+
+        url = reverse('artwork-list', kwargs={'version': VERSION})
+
+        response = self.client.get(url, headers={'X-Profile': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', response.headers)
+
+        with override_settings(PROFILING_SAMPLE_RATE=1):
+            response = self.client.get(url)
+        self.assertEqual(get_profile(response['X-Profile-Id'])['trigger'], 'sample')
+
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(url, {'limit': 1}, headers={'X-Profile': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile = get_profile(response['X-Profile-Id'])
+        self.assertEqual(profile['trigger'], 'header')
+        self.assertEqual(profile['path'], url)
+        self.assertEqual(profile['status'], status.HTTP_200_OK)
+        self.assertEqual(profile['user'], self.user.username)
+        self.assertTrue(profile['queries'])
+        self.assertEqual(profile['counts']['sql'], len(profile['queries']))
+        self.assertIn('render', profile['timings'])
+
+        response = self.client.get(reverse('profiles'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, profile['id'])
+
+        response = self.client.get(reverse('profile', args=[profile['id']]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, 'SELECT')
+
+        response = self.client.get(reverse('profile', args=['nonexistent']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,3 +1,5 @@
+import csv
+import io
 import json
 
 from rest_framework import status
@@ -16,6 +18,24 @@ from . import VERSION
 
 
 class SearchTests(APITestCase):
+    def test_search_queries(self):
+        """Test that the number of queries of the search does not depend on
+        the number of results."""
+
+        artist = Person.objects.create(name='TestArtist')
+        for i in range(10):
+            artwork = Artwork.objects.create(title=f'Test Artwork {i}', published=True)
+            artwork.artists.add(artist)
+
+        url = reverse('search-list', kwargs={'version': VERSION})
+        self.assertConstantQueries(
+            lambda size: self.client.post(
+                url,
+                {'limit': size, 'offset': 0, 'exclude': [], 'q': 'test', 'filters': []},
+                format='json',
+            ),
+        )
+
     def test_search(self):
         """Test the search."""
         # TODO extend with further use cases
@@ -301,6 +321,82 @@ class SearchTests(APITestCase):
             'date_from needs to be less than or equal to date_to.',
         )
 
+    def test_search_export(self):
+        """Test the metadata export of search results."""
+
+        artist = Person.objects.create(name='TestArtist')
+        artwork1 = Artwork.objects.create(
+            title='Test Artwork 1',
+            image_original=temporary_image(),
+            published=True,
+        )
+        artwork2 = Artwork.objects.create(
+            title='Test Artwork 2',
+            image_original=temporary_image(),
+            published=True,
+        )
+        artwork1.artists.add(artist)
+        artwork2.artists.add(artist)
+
+        url = reverse('search-export', kwargs={'version': VERSION})
+        data = {
+            'filters': [
+                {
+                    'id': 'artists',
+                    'filter_values': [{'id': artist.id}],
+                },
+                {
+                    'id': 'title',
+                    'filter_values': ['Artwork 1'],
+                },
+            ],
+        }
+
+        # test csv (default format)
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(
+            csv.DictReader(
+                io.StringIO(b''.join(response.streaming_content).decode()),
+            ),
+        )
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], str(artwork1.pk))
+        self.assertEqual(rows[0]['artists'], artist.name)
+
+        # test json lines
+        data['export_format'] = 'jsonl'
+        data['filters'] = data['filters'][:1]
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(rows[1]['artists'], [artist.name])
+
+        # the rows are in the order of the search results
+        response = self.client.post(
+            reverse('search-list', kwargs={'version': VERSION}),
+            {'filters': data['filters']},
+            format='json',
+        )
+        results = json.loads(response.content)
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [artwork['id'] for artwork in results['results']],
+        )
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [artwork1.pk, artwork2.pk],
+        )
+
+        # test invalid format
+        data['export_format'] = 'xlsx'
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_search_filters(self):
         url = reverse('search-filters', kwargs={'version': VERSION})
         response = self.client.get(url, format='json')
@@ -2,6 +2,10 @@ import json
 
 from rest_framework import status
 
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from .. import APITestCase
@@ -20,6 +24,32 @@ class UserDataTests(APITestCase):
         self.assertEqual(content['id'], 'temporary')
         self.assertEqual(content['email'], 'temporary@uni-ak.ac.at')
 
+    @override_settings(
+        MIDDLEWARE=['accounts.middleware.ServerTimingMiddleware', *settings.MIDDLEWARE],
+    )
+    def test_user_cache(self):
+        """Test that the user of a request is loaded from the cache, and
+        that the time of authentication is reported."""
+
+        url = reverse('user-list', kwargs={'version': VERSION})
+        self.client.get(url, format='json')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            any('"accounts_user"' in q['sql'] for q in context.captured_queries),
+        )
+        self.assertIn('auth;dur=', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+        # the cached user is invalidated when it changes
+        self.user.first_name = 'Changed'
+        self.user.save()
+        response = self.client.get(url, format='json')
+        content = json.loads(response.content)
+        self.assertEqual(content['name'], 'Changed')
+
     def test_user_preferences(self):
         """Test retrieving and setting user preferences."""
 
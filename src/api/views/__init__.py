@@ -1,10 +1,21 @@
-from rest_framework.exceptions import ParseError
+import json
+
+import shortuuid
+from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
 from rest_framework.request import Request
 
-from django.db.models import Q
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import OuterRef, Q, Subquery
+from django.utils.http import parse_etags, urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.translation import gettext_lazy as _
 
-from artworks.models import Album, Artwork, PermissionsRelation
+from artworks.cache import album_permission_key
+from artworks.models import Album, Artwork, Folder, PermissionsRelation
+
+from ..conditional import make_etag
+from ..exceptions import PreconditionFailed
 
 
 def check_limit(limit):
@@ -40,23 +51,103 @@ def check_sorting(sorting, ordering_fields):
     return sorting
 
 
-def slides_with_details(album, request):
+def encode_cursor(obj, sorting):
+    """Returns the cursor of the page after obj, see paginate_keyset()."""
+
+    value = getattr(obj, sorting.removeprefix('-'))
+    # str() keeps the microseconds of dates, which DjangoJSONEncoder drops
+    return urlsafe_base64_encode(json.dumps([value, obj.pk], default=str).encode())
+
+
+def paginate_keyset(queryset, sorting, cursor, limit):
+    """Returns a page of a queryset, which is sorted by sorting and the
+    primary key, and the cursor of the next page, or None on the last page.
+
+    Only the rows after the cursor are fetched, instead of skipping an
+    offset, so that later pages are as cheap as the first one.
+    """
+
+    field = sorting.removeprefix('-')
+    descending = sorting.startswith('-')
+    lookup = 'lt' if descending else 'gt'
+    queryset = queryset.order_by(sorting, '-pk' if descending else 'pk')
+
+    if cursor:
+        try:
+            value, pk = json.loads(urlsafe_base64_decode(cursor))
+            queryset = queryset.filter(
+                Q(**{f'{field}__{lookup}': value})
+                | Q(**{field: value, f'pk__{lookup}': pk}),
+            )
+        except (TypeError, ValueError, ValidationError) as e:
+            raise ParseError(_('Invalid cursor')) from e
+
+    # one more row is fetched to know whether there is a next page
+    page = list(queryset[: limit + 1])
+    if len(page) > limit:
+        return page[:limit], encode_cursor(page[limit - 1], sorting)
+    return page, None
+
+
+def slide_artworks(artwork_ids, details=False):
+    """Returns the published artworks with the given ids as a dict by id.
+
+    :param details: whether to prefetch the relations needed by
+        slides_with_details()
+    """
+
+    qs = Artwork.objects.filter(published=True)
+    if details:
+        qs = qs.prefetch_related(
+            'artists',
+            'photographers',
+            'authors',
+            'graphic_designers',
+            'discriminatory_terms',
+        )
+    return qs.in_bulk(set(artwork_ids))
+
+
+def validate_slide_artworks(artwork_ids, details=False):
+    """Checks that all artworks exist and are published, with a single
+    query.
+
+    :raises ParseError: listing all invalid ids
+    :returns: the artworks as returned by slide_artworks()
+    """
+
+    artworks = slide_artworks(artwork_ids, details=details)
+    # dict.fromkeys() removes duplicates, but preserves the order
+    invalid_ids = [pk for pk in dict.fromkeys(artwork_ids) if pk not in artworks]
+    if invalid_ids:
+        raise ParseError(
+            {
+                'detail': _('Artwork does not exist'),
+                'invalid_ids': invalid_ids,
+            },
+        )
+    return artworks
+
+
+def slides_with_details(album, request, artworks=None):
+    """Returns the slides of an album with the details of their artworks.
+
+    :param artworks: the artworks of the slides, if they were already
+        loaded with slide_artworks(details=True)
+    """
     ret = []
 
-    slide_ids = [
-        artwork.get('id') for slide in album.slides for artwork in slide['items']
-    ]
-    qs = Artwork.objects.filter(id__in=slide_ids, published=True).prefetch_related(
-        'artists',
-        'photographers',
-        'authors',
-        'graphic_designers',
-        'discriminatory_terms',
-    )
+    if artworks is None:
+        artworks = slide_artworks(
+            [item.get('id') for slide in album.slides for item in slide['items']],
+            details=True,
+        )
 
-    artworks = {}
-    for artwork in qs:
-        artworks[artwork.pk] = {
+    is_editor = request.user.is_editor
+
+    details = {}
+    for artwork in artworks.values():
+        details[artwork.pk] = {
             'id': artwork.pk,
             'image_original': request.build_absolute_uri(
                 artwork.image_original.url,
@@ -86,13 +177,13 @@ def slides_with_details(album, request):
                 for artist in artwork.artists.all()
             ],
         }
-        if request.user.is_editor:
-            artworks[artwork.pk]['editing_link'] = artwork.editing_link
+        if is_editor:
+            details[artwork.pk]['editing_link'] = artwork.editing_link
 
     for slide in album.slides:
         slide_info = {'id': slide['id'], 'items': []}
         for item in slide['items']:
-            if artwork_info := artworks.get(item.get('id')):
+            if artwork_info := details.get(item.get('id')):
                 slide_info['items'].append(artwork_info)
             else:
                 # TODO: for now we just drop artworks which do not exist any more from the slides
@@ -107,13 +198,218 @@ def slides_with_details(album, request):
     return ret
 
 
-def featured_artworks(album, request, num_artworks=4):
-    artwork_ids = []
-    for slide in album.slides:
-        for artwork in slide['items']:
-            artwork_id = artwork.get('id')
-            if artwork_id not in artwork_ids:
-                artwork_ids.append(artwork_id)
+def apply_slide_operations(slides, operations):
+    """Applies a list of slide operations to a copy of the slides.
+
+    Operations are applied in order and refer to slides by their ids.
+    Only the artworks of inserted slides are checked, with a single
+    query.
+
+    :param slides: the current slides of an album
+    :param operations: the validated data of SlideOperationSerializers
+    :returns: a tuple of the changed slides and the applied operations,
+        which include the ids and positions of created slides
+    """
+    slides = [{**slide, 'items': list(slide['items'])} for slide in slides]
+    applied = []
+
+    artwork_ids = [
+        item['id']
+        for operation in operations
+        if operation['op'] == 'insert'
+        for item in operation['items']
+    ]
+    if artwork_ids:
+        validate_slide_artworks(artwork_ids)
+
+    def position(slide_id):
+        for index, slide in enumerate(slides):
+            if slide['id'] == slide_id:
+                return index
+        raise ParseError(_('Slide does not exist'))
+
+    for operation in operations:
+        op = operation['op']
+        applied_operation = dict(operation)
+
+        if op == 'insert':
+            slide_id = operation.get('slide') or shortuuid.uuid()
+            if any(slide['id'] == slide_id for slide in slides):
+                raise ParseError(_('Slide already exists'))
+            slide = {
+                'id': slide_id,
+                'items': [{'id': item['id']} for item in operation['items']],
+            }
+            index = min(operation.get('index', len(slides)), len(slides))
+            slides.insert(index, slide)
+            applied_operation.update(slide=slide_id, index=index, items=slide['items'])
+
+        elif op == 'move':
+            slide = slides.pop(position(operation['slide']))
+            slides.insert(operation['index'], slide)
+
+        elif op == 'remove':
+            del slides[position(operation['slide'])]
+
+        elif op == 'pair':
+            # the slide is merged with the following slide
+            index = position(operation['slide'])
+            if index + 1 >= len(slides):
+                raise ParseError(_('The last slide cannot be paired'))
+            if len(slides[index]['items']) + len(slides[index + 1]['items']) > 2:
+                raise ParseError(_('No more than two artworks per slide allowed'))
+            slides[index]['items'].extend(slides.pop(index + 1)['items'])
+
+        elif op == 'unpair':
+            # the second artwork is moved to a new slide after the slide
+            index = position(operation['slide'])
+            if len(slides[index]['items']) < 2:
+                raise ParseError(_('Only slides with two artworks can be unpaired'))
+            slide_id = shortuuid.uuid()
+            slides.insert(
+                index + 1,
+                {'id': slide_id, 'items': [slides[index]['items'].pop()]},
+            )
+            applied_operation['new_slide'] = slide_id
+
+        applied.append(applied_operation)
+
+    return slides, applied
+
+
+def created_slides(operations):
+    """Returns the ids of the slides created by applied slide operations."""
+
+    return [
+        operation['new_slide'] if operation['op'] == 'unpair' else operation['slide']
+        for operation in operations
+        if operation['op'] in ('insert', 'unpair')
+    ]
+
+
+def find_album(request, pk, for_update=False):
+    """Returns an album, if the user has access to it, otherwise None.
+
+    The album is fetched together with the permission of the user in one
+    query, and set as album.user_permission, which is empty for the
+    owner. The permission is cached for ALBUM_PERMISSION_CACHE_TIMEOUT
+    seconds, the album itself is memoized for the current request, e.g.
+    for the ETag and the response of conditional requests.
+
+    :param for_update: whether to lock the album until the end of the
+        current transaction. the album is fetched again in this case
+    """
+
+    # the albums are memoized on the HttpRequest, which is shared by the
+    # DRF Request of the view and the one passed to ETag functions
+    albums = getattr(request, '_request', request).__dict__.setdefault('_albums', {})
+    if not for_update and pk in albums:
+        return albums[pk]
+
+    key = album_permission_key(pk, request.user.pk)
+    permission = cache.get(key)
+
+    qs = Album.objects.filter(pk=pk).select_related('user', 'last_changed_by')
+    if permission is None:
+        qs = qs.annotate(
+            user_permission=Subquery(
+                PermissionsRelation.objects.filter(
+                    album=OuterRef('pk'),
+                    user=request.user,
+                ).values('permissions')[:1],
+            ),
+        )
+    if for_update:
+        # the users are on the nullable side of outer joins, which cannot
+        # be locked
+        qs = qs.select_for_update(of=('self',))
+    album = qs.first()
+
+    if album is None:
+        return None
+    if permission is None:
+        permission = album.user_permission or ''
+        cache.set(key, permission, settings.ALBUM_PERMISSION_CACHE_TIMEOUT)
+    album.user_permission = permission
+
+    if album.user_id != request.user.pk and not permission:
+        return None
+    albums[pk] = album
+    return album
+
+
+def can_edit(request, album):
+    """Returns whether the user may edit an album returned by
+    find_album()."""
+
+    return album.user_id == request.user.pk or album.user_permission == 'EDIT'
+
+
+def get_album(request, pk, edit=False, for_update=False):
+    """Returns an album the user has access to, see find_album().
+
+    :param edit: whether the user needs to be able to edit the album
+    :raises NotFound: if the album does not exist or is not accessible
+    :raises PermissionDenied: if edit is set and the user may only view
+        the album
+    """
+
+    album = find_album(request, pk, for_update=for_update)
+    if album is None:
+        raise NotFound(_('Album does not exist'))
+    if edit and not can_edit(request, album):
+        raise PermissionDenied
+    return album
+
+
+def get_folder(request, folder_id):
+    """Returns a folder of the user, or their root folder for 'root'."""
+
+    if folder_id == 'root':
+        folder_id = Folder.root_folder_id_for_user(request.user)
+    try:
+        return Folder.objects.get(owner=request.user, id=folder_id)
+    except Folder.DoesNotExist as dne:
+        raise NotFound(_('Folder does not exist')) from dne
+
+
+def album_etag(album, *parts):
+    """Returns an ETag of an album.
+
+    The ETag starts with the id and version of the album, which If-Match
+    headers are checked against. Further parts identify a representation
+    of this version, e.g. with the details of the artworks.
+    """
+
+    etag = f'{album.pk}:{album.version}'
+    if parts:
+        etag += '-' + make_etag(*parts).strip('"')
+    return f'"{etag}"'
+
+
+def check_if_match(request, album):
+    """Raises PreconditionFailed, if the request has an If-Match header
+    which does not match the current version of the album."""
+
+    if_match = request.headers.get('If-Match')
+    if if_match is None:
+        return
+
+    version_etag = album_etag(album)
+    for etag in parse_etags(if_match):
+        if etag in ('*', version_etag) or etag.startswith(f'{version_etag[:-1]}-'):
+            return
+    raise PreconditionFailed(_('Album has been changed in the meantime'))
+
+
+def featured_artworks_for_albums(albums, request):
+    """Returns the featured artworks of several albums, loaded with a
+    single query.
+
+    :returns: a dict mapping album ids to lists of featured artworks
+    """
+
+    artwork_ids = {pk for album in albums for pk in album.featured_artwork_ids}
 
     qs = Artwork.objects.filter(id__in=artwork_ids, published=True).prefetch_related(
         'discriminatory_terms',
@@ -143,12 +439,14 @@ def featured_artworks(album, request, num_artworks=4):
             ],
         }
 
-        if len(artworks) >= num_artworks:
-            break
-
-    return [
-        artworks[artwork_id] for artwork_id in artwork_ids if artworks.get(artwork_id)
-    ]
+    return {
+        album.pk: [
+            artworks[artwork_id]
+            for artwork_id in album.featured_artwork_ids
+            if artworks.get(artwork_id)
+        ]
+        for album in albums
+    }
 
 
 def album_object(
@@ -176,59 +474,115 @@ def album_object(
         (default is True)
     :param include_type: whether to include the type information, e.g.
         when listed in folders (default is False)
-    :param include_featured: whether to include the featured artworks
-        (default is False)
+    :param include_featured: whether to include the featured artworks and
+        the preview image (default is False)
     :returns: a dict representing the album with all requested features
     """
-    permissions_qs = PermissionsRelation.objects.filter(album=album).select_related(
-        'user',
-    )
+    return album_objects(
+        [album],
+        request=request,
+        details=details,
+        include_slides=include_slides,
+        include_type=include_type,
+        include_featured=include_featured,
+    )[0]
+
+
+def album_objects(
+    albums,
+    request: Request = None,
+    details=False,
+    include_slides=True,
+    include_type=False,
+    include_featured=False,
+) -> list:
+    """Returns the dict representations of several album objects.
 
-    # only album owners see all permissions. users who an album is shared with see
-    # either only their own permission, or - if they have EDIT permissions themselves -
-    # all other users with EDIT permissions
-    if request is not None and album.user != request.user:
-        if permissions_qs.filter(user=request.user, permissions='EDIT').exists():
-            permissions_qs = permissions_qs.filter(permissions='EDIT')
-        else:
-            permissions_qs = permissions_qs.filter(user=request.user)
-
-    ret = {
-        'id': album.id,
-        'title': album.title,
-        'number_of_artworks': album.size(),
-        'owner': {
-            'id': album.user.username,
-            'name': album.user.get_full_name(),
-        },
-        'permissions': [
-            {
-                'user': {
-                    'id': p.user.username,
-                    'name': p.user.get_full_name(),
-                },
-                'permissions': [{'id': p.permissions}],
-            }
-            for p in permissions_qs
-        ],
-        'date_created': album.date_created,
-        'date_changed': album.date_changed,
-    }
+    The result is the same as calling album_object() for every album,
+    but the permissions and featured artworks of all albums are loaded
+    with a fixed number of queries, independent of the number of albums.
+    The user and last_changed_by of the albums should be loaded with
+    select_related().
 
-    if album.last_changed_by:
-        ret['last_changed_by'] = {
-            'id': album.last_changed_by.username,
-            'name': album.last_changed_by.get_full_name(),
+    :param albums: the albums to 'serialize'
+    :returns: a list of dicts in the order of albums
+    """
+    albums = list(albums)
+
+    permissions = {album.pk: [] for album in albums}
+    for p in (
+        PermissionsRelation.objects.filter(album__in=albums)
+        .select_related('user')
+        .order_by('pk')
+    ):
+        permissions[p.album_id].append(p)
+
+    featured = featured_artworks_for_albums(albums, request) if include_featured else {}
+
+    ret = []
+    for album in albums:
+        album_permissions = permissions[album.pk]
+
+        # only album owners see all permissions. users who an album is shared with see
+        # either only their own permission, or - if they have EDIT permissions themselves -
+        # all other users with EDIT permissions
+        if request is not None and album.user_id != request.user.pk:
+            if any(
+                p.user_id == request.user.pk and p.permissions == 'EDIT'
+                for p in album_permissions
+            ):
+                album_permissions = [
+                    p for p in album_permissions if p.permissions == 'EDIT'
+                ]
+            else:
+                album_permissions = [
+                    p for p in album_permissions if p.user_id == request.user.pk
+                ]
+
+        obj = {
+            'id': album.id,
+            'title': album.title,
+            'number_of_artworks': album.number_of_artworks,
+            'version': album.version,
+            'owner': {
+                'id': album.user.username,
+                'name': album.user.get_full_name(),
+            },
+            'permissions': [
+                {
+                    'user': {
+                        'id': p.user.username,
+                        'name': p.user.get_full_name(),
+                    },
+                    'permissions': [{'id': p.permissions}],
+                }
+                for p in album_permissions
+            ],
+            'date_created': album.date_created,
+            'date_changed': album.date_changed,
         }
-    else:
-        ret['last_changed_by'] = ret['owner']
-
-    if include_slides:
-        ret['slides'] = slides_with_details(album, request) if details else album.slides
-    if include_type:
-        ret['type'] = album._meta.object_name
-    if include_featured:
-        ret['featured_artworks'] = featured_artworks(album, request)
+
+        if album.last_changed_by:
+            obj['last_changed_by'] = {
+                'id': album.last_changed_by.username,
+                'name': album.last_changed_by.get_full_name(),
+            }
+        else:
+            obj['last_changed_by'] = obj['owner']
+
+        if include_slides:
+            obj['slides'] = (
+                slides_with_details(album, request) if details else album.slides
+            )
+        if include_type:
+            obj['type'] = album._meta.object_name
+        if include_featured:
+            obj['featured_artworks'] = featured[album.pk]
+            obj['preview'] = (
+                request.build_absolute_uri(album.preview.url) if album.preview else None
+            )
+        ret.append(obj)
+
     return ret
 
 
@@ -242,9 +596,10 @@ def filter_albums_for_user(user, owner=True, permissions='EDIT'):
     if owner:
         q_objects |= Q(user=user)
 
-    permissions = permissions.split(',')
+    permissions = [p for p in permissions.split(',') if p]
 
     if permissions:
+        # uses the index on (user, permissions, album) of PermissionsRelation
         q_objects |= Q(
             pk__in=PermissionsRelation.objects.filter(
                 user=user,
@@ -252,3 +607,17 @@ def filter_albums_for_user(user, owner=True, permissions='EDIT'):
             ).values_list('album__pk', flat=True),
         )
     return q_objects
+
+
+def shared_albums(user, permissions):
+    """Returns the albums shared with a user, with one of permissions.
+
+    The albums are joined with the permissions of the user, so the query
+    scales with the number of albums shared with the user, not with all
+    permissions.
+    """
+
+    return Album.objects.filter(
+        album__user=user,
+        album__permissions__in=permissions,
+    )
@@ -1,6 +1,7 @@
+import functools
 import logging
 
-import requests
+import django_rq
 import shortuuid
 from base_common_drf.openapi.responses import ERROR_RESPONSES
 from drf_spectacular.utils import (
@@ -13,52 +14,330 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rq.job import JobStatus
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models import Q
-from django.http import HttpResponse
-from django.utils.text import slugify
-from django.utils.translation import gettext_lazy as _
+from django.db.models import Count, Max, Q
+from django.http import FileResponse, StreamingHttpResponse
+from django.template.defaultfilters import slugify
+from django.utils.translation import get_language, gettext_lazy as _
 
 from api.serializers.albums import (
+    AlbumChangesRequestSerializer,
     AlbumResponseSerializer,
     AlbumsDownloadRequestSerializer,
     AlbumsListRequestSerializer,
+    AlbumsMetadataRequestSerializer,
     AlbumsRequestSerializer,
     AppendArtworkRequestSerializer,
+    BulkAlbumsRequestSerializer,
+    CopyAlbumRequestSerializer,
     CreateAlbumRequestSerializer,
     PermissionsResponseSerializer,
+    SharedAlbumsRequestSerializer,
     UpdateAlbumRequestSerializer,
 )
 from api.serializers.artworks import (
     CreateSlidesRequestSerializer,
     SlidesRequestSerializer,
+    UpdateSlidesRequestSerializer,
+    UpdateSlidesResponseSerializer,
 )
 from api.serializers.permissions import PermissionsRequestSerializer
 from api.views import (
+    album_etag,
     album_object,
+    album_objects,
+    apply_slide_operations,
+    check_if_match,
     check_limit,
     check_offset,
     check_sorting,
+    created_slides,
+    find_album,
+    get_album,
+    get_folder,
+    paginate_keyset,
+    shared_albums,
     slides_with_details,
+    validate_slide_artworks,
 )
-from artworks.exports import ExportError, album_download_as_pptx
+from artworks.cache import (
+    METADATA_VERSION,
+    album_version,
+    get_cache_version,
+    invalidate_album_permissions,
+    invalidate_albums,
+)
+from artworks.exports import (
+    AlbumExport,
+    ExportError,
+    album_artworks,
+    get_export_formats,
+    get_exporter,
+    get_metadata_writer,
+    metadata_rows,
+)
+from artworks.exports.jobs import export_album, export_storage
 from artworks.models import (
     Album,
-    Artwork,
+    AlbumChange,
+    AlbumSlideItem,
     Folder,
     FolderAlbumRelation,
     PermissionsRelation,
 )
 
+from ..conditional import conditional
 from . import filter_albums_for_user
 
 logger = logging.getLogger(__name__)
 
 
-@extend_schema(tags=['albums'])
+def slides_validators(album, request):
+    """Returns the validators of the artwork details in the slides."""
+
+    artworks = AlbumSlideItem.objects.filter(album=album).aggregate(
+        count=Count('id'),
+        date_changed=Max('artwork__date_changed'),
+    )
+    return (
+        artworks['count'],
+        artworks['date_changed'],
+        get_cache_version(METADATA_VERSION),
+        request.user.is_editor,
+    )
+
+
+def album_retrieve_etag(request, pk=None, **kwargs):
+    serializer = AlbumsRequestSerializer(data=request.query_params)
+    album = find_album(request, pk)
+    if album is None or not serializer.is_valid():
+        return None
+
+    details = serializer.validated_data['details']
+    parts = [
+        request.user.pk,
+        get_language(),
+        details,
+        get_cache_version(album_version(album.pk)),
+    ]
+    if details:
+        parts.extend(slides_validators(album, request))
+    return album_etag(album, *parts)
+
+
+def album_slides_etag(request, pk=None, **kwargs):
+    serializer = SlidesRequestSerializer(data=request.query_params)
+    album = find_album(request, pk)
+    if album is None or not serializer.is_valid():
+        return None
+
+    details = serializer.validated_data['details']
+    parts = [get_language(), details]
+    if details:
+        parts.extend(slides_validators(album, request))
+    return album_etag(album, *parts)
+
+
+IF_MATCH_PARAMETER = OpenApiParameter(
+    name='If-Match',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description=(
+        'ETag of the album version the change is based on. If the album has been '
+        'changed in the meantime, the request fails with 412.'
+    ),
+)
+PRECONDITION_FAILED_RESPONSE = OpenApiResponse(description='Precondition Failed')
+
+# fields written by incremental changes of the slides
+SLIDES_UPDATE_FIELDS = ['slides', 'version', 'last_changed_by', 'date_changed']
+
+
+def get_albums(request, album_ids, owner=False):
+    """Returns the albums with the given ids in the given order, if the
+    user has access to all of them.
+
+    :param owner: whether the user has to be the owner of the albums
+    :raises NotFound: listing the ids of all albums which do not exist
+    """
+
+    q_filters = Q(user=request.user)
+    if not owner:
+        q_filters |= Q(
+            pk__in=PermissionsRelation.objects.filter(
+                user=request.user,
+            ).values('album_id'),
+        )
+    albums = (
+        Album.objects.filter(q_filters)
+        .select_related('user', 'last_changed_by')
+        .in_bulk(album_ids)
+    )
+    invalid_ids = [pk for pk in album_ids if pk not in albums]
+    if invalid_ids:
+        raise NotFound(
+            {
+                'detail': _('Album does not exist'),
+                'invalid_ids': invalid_ids,
+            },
+        )
+    return [albums[pk] for pk in album_ids]
+
+
+def enqueue_previews(albums):
+    for album in albums:
+        django_rq.enqueue(album.update_preview, result_ttl=settings.RQ_RESULT_TTL)
+
+
+def create_copies(request, copies):
+    """Creates albums of the user from other albums, see
+    Album.create_from_albums(), and adds them to the root folder of the
+    user."""
+
+    albums = Album.create_from_albums(request.user, copies)
+    folder_id = Folder.root_folder_id_for_user(request.user)
+    FolderAlbumRelation.objects.bulk_create(
+        [
+            FolderAlbumRelation(album=album, user=request.user, folder_id=folder_id)
+            for album in albums
+        ],
+    )
+    # bulk_create() does not send signals
+    invalidate_albums(user_ids=[request.user.pk])
+    # the previews are rendered in background jobs, once the albums exist
+    transaction.on_commit(functools.partial(enqueue_previews, albums))
+    return albums
+
+
+def move_albums(request, albums, folder):
+    """Moves albums to a folder of the user."""
+
+    relations = FolderAlbumRelation.objects.filter(user=request.user, album__in=albums)
+    existing_ids = set(relations.values_list('album_id', flat=True))
+    relations.update(folder=folder)
+    FolderAlbumRelation.objects.bulk_create(
+        [
+            FolderAlbumRelation(album=album, user=request.user, folder=folder)
+            for album in albums
+            if album.pk not in existing_ids
+        ],
+    )
+    # update() and bulk_create() do not send signals
+    invalidate_albums(user_ids=[request.user.pk])
+
+
+def set_album_permissions(request, albums, permissions, replace=False):
+    """Sets the permissions of users for albums of the user, with a fixed
+    number of queries, independent of the number of users and albums.
+
+    Users with empty permissions are removed from the albums, albums
+    shared with users are added to their root folders. Should be called
+    within a transaction.
+
+    :param permissions: validated data of PermissionsRequestSerializer
+    :param replace: whether to also remove all other users from the
+        albums, otherwise their permissions are kept
+    :raises ParseError: listing all users which do not exist
+    """
+
+    User = get_user_model()  # noqa: N806
+
+    # dict.fromkeys() removes duplicates, but preserves the order
+    usernames = list(dict.fromkeys(item['user'] for item in permissions))
+    users = User.objects.in_bulk(usernames, field_name='username')
+    invalid_ids = [username for username in usernames if username not in users]
+    if invalid_ids:
+        raise ParseError(
+            {
+                'detail': _('User does not exist'),
+                'invalid_ids': invalid_ids,
+            },
+        )
+
+    shared = {}
+    removed = []
+    for item in permissions:
+        user = users[item['user']]
+        if item['permissions']:
+            # Only allow permission assignment if the user is not already the owner
+            if user.pk == request.user.pk:
+                raise ParseError(_('User is already the owner of album.'))
+            shared[user] = item['permissions'][-1]['id']
+        elif user.pk != request.user.pk:
+            shared.pop(user, None)
+            removed.append(user)
+
+    PermissionsRelation.objects.bulk_create(
+        [
+            PermissionsRelation(album=album, user=user, permissions=perm)
+            for album in albums
+            for user, perm in shared.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['album', 'user'],
+        update_fields=['permissions'],
+    )
+
+    # albums shared with users are added to their root folders. there is
+    # no unique constraint to upsert FolderAlbumRelation against, so the
+    # existing relations are fetched instead
+    root_folders = Folder.root_folder_ids_for_users(shared)
+    existing = set(
+        FolderAlbumRelation.objects.filter(
+            album__in=albums,
+            user__in=shared,
+        ).values_list('album_id', 'user_id'),
+    )
+    FolderAlbumRelation.objects.bulk_create(
+        [
+            FolderAlbumRelation(
+                album=album,
+                user=user,
+                folder_id=root_folders[user.pk],
+            )
+            for album in albums
+            for user in shared
+            if (album.pk, user.pk) not in existing
+        ],
+    )
+
+    # remove deleted permissions, and the albums from the folders of those
+    # users
+    if replace:
+        PermissionsRelation.objects.filter(album__in=albums).exclude(
+            user__in=shared,
+        ).delete()
+        FolderAlbumRelation.objects.filter(album__in=albums).exclude(
+            user=request.user,
+        ).exclude(user__in=shared).delete()
+    elif removed:
+        PermissionsRelation.objects.filter(album__in=albums, user__in=removed).delete()
+        FolderAlbumRelation.objects.filter(album__in=albums, user__in=removed).delete()
+
+    # bulk_create() does not send signals
+    for album in albums:
+        invalidate_album_permissions(album.pk, [user.pk for user in shared])
+    Album.invalidate_versions([album.pk for album in albums])
+
+
+def download_job_object(album, job, request):
+    return {
+        'id': job.id,
+        'status': job.get_status(),
+        'url': reverse(
+            'album-download-job',
+            kwargs={'pk': album.pk, 'job_id': job.id},
+            request=request,
+        ),
+    }
+
+
 class AlbumsViewSet(viewsets.GenericViewSet):
     queryset = Album.objects.all()
     ordering_fields = ['title', 'date_created', 'date_changed']
@@ -124,6 +403,7 @@ class AlbumsViewSet(viewsets.GenericViewSet):
                 'user',
                 'last_changed_by',
             )
+            .defer('slides')
         )
 
         total = albums.count()
@@ -133,17 +413,77 @@ class AlbumsViewSet(viewsets.GenericViewSet):
         return Response(
             {
                 'total': total,
-                'results': [
-                    album_object(
-                        album,
-                        request=request,
-                        details=False,
-                        include_slides=False,
-                        include_type=False,
-                        include_featured=True,
-                    )
-                    for album in albums
-                ],
+                'results': album_objects(
+                    albums,
+                    request=request,
+                    details=False,
+                    include_slides=False,
+                    include_type=False,
+                    include_featured=True,
+                ),
+            },
+        )
+
+    @extend_schema(
+        parameters=[
+            SharedAlbumsRequestSerializer,
+            OpenApiParameter(
+                name='sort_by',
+                type=OpenApiTypes.STR,
+                required=False,
+                enum=ordering_fields + [f'-{i}' for i in ordering_fields],
+                default='-date_changed',
+            ),
+        ],
+        responses={
+            200: OpenApiResponse(description='OK'),
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+        },
+    )
+    @action(detail=False, methods=['get'])
+    def shared(self, request, *args, **kwargs):
+        """List of Albums shared with the user, newest first by default.
+
+        The list is paginated with cursors: the response contains the
+        cursor of the next page, or null on the last page.
+        """
+
+        serializer = SharedAlbumsRequestSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        limit = check_limit(serializer.validated_data['limit'])
+        sorting = check_sorting(
+            request.query_params.get('sort_by', '-date_changed'),
+            self.ordering_fields,
+        )
+
+        albums, cursor = paginate_keyset(
+            shared_albums(
+                request.user,
+                serializer.validated_data['permissions'],
+            )
+            .select_related(
+                'user',
+                'last_changed_by',
+            )
+            .defer('slides'),
+            sorting,
+            serializer.validated_data.get('cursor'),
+            limit,
+        )
+
+        return Response(
+            {
+                'results': album_objects(
+                    albums,
+                    request=request,
+                    details=False,
+                    include_slides=False,
+                    include_type=False,
+                    include_featured=True,
+                ),
+                'next': cursor,
             },
         )
 
@@ -165,11 +505,10 @@ class AlbumsViewSet(viewsets.GenericViewSet):
         album = Album.objects.create(title=title, user=request.user)
 
         # Add album to root folder, creating a relationship
-        folder = Folder.root_folder_for_user(request.user)
-        FolderAlbumRelation.objects.get_or_create(
+        FolderAlbumRelation.objects.create(
             album=album,
             user=request.user,
-            folder=folder,
+            folder_id=Folder.root_folder_id_for_user(request.user),
         )
 
         return Response(
@@ -194,21 +533,14 @@ class AlbumsViewSet(viewsets.GenericViewSet):
             404: ERROR_RESPONSES[404],
         },
     )
+    @conditional(album_retrieve_etag)
     def retrieve(self, request, *args, pk=None, **kwargs):
         """Retrieve information for a specific Album."""
 
         serializer = AlbumsRequestSerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
 
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
-            )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
+        album = get_album(request, pk)
 
         details = serializer.validated_data['details']
 
@@ -216,42 +548,38 @@ class AlbumsViewSet(viewsets.GenericViewSet):
 
     @extend_schema(
         request=UpdateAlbumRequestSerializer,
+        parameters=[IF_MATCH_PARAMETER],
         responses={
             200: AlbumResponseSerializer,
             403: ERROR_RESPONSES[403],
             404: ERROR_RESPONSES[404],
+            412: PRECONDITION_FAILED_RESPONSE,
         },
     )
     def update(self, request, *args, pk=None, **kwargs):
-        """Update Album."""
+        """Update Album.
+
+        If the request has an If-Match header with an outdated ETag of
+        the album, the album is not changed.
+        """
 
         serializer = UpdateAlbumRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
-            )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
-
-        if (
-            album.user == request.user
-            or PermissionsRelation.objects.filter(
-                album=album,
-                user=request.user,
-                permissions='EDIT',
-            ).exists()
-        ):
+        with transaction.atomic():
+            album = get_album(request, pk, edit=True, for_update=True)
+            check_if_match(request, album)
             album.title = serializer.validated_data['title']
             album.last_changed_by = request.user
-            album.save()
-            return Response(album_object(album, request=request))
+            album.save(
+                update_fields=['title', 'version', 'last_changed_by', 'date_changed'],
+            )
+            album.record_change(request.user, [{'op': 'title', 'title': album.title}])
 
-        raise PermissionDenied
+        return Response(
+            album_object(album, request=request),
+            headers={'ETag': album_etag(album)},
+        )
 
     @extend_schema(
         responses={
@@ -263,17 +591,9 @@ class AlbumsViewSet(viewsets.GenericViewSet):
     def destroy(self, request, *args, pk=None, **kwargs):
         """Delete Album."""
 
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
-            )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
+        album = get_album(request, pk)
 
-        if album.user == request.user:
+        if album.user_id == request.user.pk:
             album.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -281,6 +601,110 @@ class AlbumsViewSet(viewsets.GenericViewSet):
 
     # additional actions
 
+    @extend_schema(
+        request=CopyAlbumRequestSerializer,
+        responses={
+            201: AlbumResponseSerializer,
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+        },
+    )
+    @action(detail=True, methods=['post'])
+    def copy(self, request, *args, pk=None, **kwargs):
+        """Create a copy of an Album.
+
+        The copy is owned by the user and added to their root folder.
+        Permissions of the Album are not copied.
+        """
+
+        serializer = CopyAlbumRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        (album,) = get_albums(request, [pk])
+
+        with transaction.atomic():
+            (copy,) = create_copies(
+                request,
+                [(serializer.validated_data.get('title', album.title), [album])],
+            )
+
+        return Response(
+            album_object(copy, request=request),
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        request=BulkAlbumsRequestSerializer,
+        responses={
+            200: AlbumResponseSerializer(many=True),
+            201: AlbumResponseSerializer(many=True),
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+        },
+    )
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, *args, **kwargs):
+        """Apply an operation to several Albums.
+
+        - copy: creates a copy of every album
+        - merge: creates one album with the slides of all albums, in the
+          given order. The albums themselves are not changed
+        - move: moves the albums to another folder of the user
+        - share: sets the permissions of users for albums owned by the
+          user. Permissions of other users are kept, users with empty
+          permissions are removed
+
+        The operation is applied either to all albums or, if one of them
+        does not exist, to none. The response contains the new or changed
+        albums.
+        """
+
+        serializer = BulkAlbumsRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        op = serializer.validated_data['op']
+        # dict.fromkeys() removes duplicates, but preserves the order
+        album_ids = list(dict.fromkeys(serializer.validated_data['albums']))
+
+        with transaction.atomic():
+            if op == 'copy':
+                albums = create_copies(
+                    request,
+                    [
+                        (album.title, [album])
+                        for album in get_albums(request, album_ids)
+                    ],
+                )
+            elif op == 'merge':
+                albums = create_copies(
+                    request,
+                    [
+                        (
+                            serializer.validated_data['title'],
+                            get_albums(request, album_ids),
+                        ),
+                    ],
+                )
+            elif op == 'move':
+                folder = get_folder(request, serializer.validated_data['folder'])
+                albums = get_albums(request, album_ids)
+                move_albums(request, albums, folder)
+            else:
+                albums = get_albums(request, album_ids, owner=True)
+                set_album_permissions(
+                    request,
+                    albums,
+                    serializer.validated_data['permissions'],
+                )
+
+        if op in ('copy', 'merge'):
+            return Response(
+                album_objects(albums, request=request),
+                status=status.HTTP_201_CREATED,
+            )
+        return Response(album_objects(albums, request=request))
+
     @extend_schema(
         request=AppendArtworkRequestSerializer,
         responses={
@@ -297,40 +721,20 @@ class AlbumsViewSet(viewsets.GenericViewSet):
         serializer = AppendArtworkRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
+        with transaction.atomic():
+            album = get_album(request, pk, edit=True, for_update=True)
+            album.slides, operations = apply_slide_operations(
+                album.slides,
+                [{'op': 'insert', 'items': [serializer.validated_data]}],
             )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
-
-        # check if artwork exists
-        try:
-            Artwork.objects.get(pk=serializer.validated_data['id'], published=True)
-        except Artwork.DoesNotExist as dne:
-            raise ParseError(_('Artwork does not exist')) from dne
-
-        if (
-            album.user == request.user
-            or PermissionsRelation.objects.filter(
-                album=album,
-                user=request.user,
-                permissions='EDIT',
-            ).exists()
-        ):
-            slide = {
-                'id': shortuuid.uuid(),
-                'items': [serializer.validated_data],
-            }
-            album.slides.append(slide)
             album.last_changed_by = request.user
-            album.save()
-            return Response(status=status.HTTP_204_NO_CONTENT)
+            album.save(update_fields=SLIDES_UPDATE_FIELDS)
+            album.record_change(request.user, operations)
 
-        raise PermissionDenied
+        return Response(
+            status=status.HTTP_204_NO_CONTENT,
+            headers={'ETag': album_etag(album)},
+        )
 
     @extend_schema(
         parameters=[
@@ -351,21 +755,14 @@ class AlbumsViewSet(viewsets.GenericViewSet):
         },
     )
     @action(detail=True, methods=['get'])
+    @conditional(album_slides_etag)
     def slides(self, request, *args, pk=None, **kwargs):
         """Returns slides of a specific Album."""
 
         serializer = SlidesRequestSerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
 
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
-            )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
+        album = get_album(request, pk)
 
         if serializer.validated_data['details']:
             return Response(slides_with_details(album, request))
@@ -383,6 +780,7 @@ class AlbumsViewSet(viewsets.GenericViewSet):
                 description='Boolean indicating if the response should contain details of the artworks',
                 default=False,
             ),
+            IF_MATCH_PARAMETER,
         ],
         responses={
             # TODO better response definition
@@ -390,11 +788,16 @@ class AlbumsViewSet(viewsets.GenericViewSet):
             400: ERROR_RESPONSES[400],
             403: ERROR_RESPONSES[403],
             404: ERROR_RESPONSES[404],
+            412: PRECONDITION_FAILED_RESPONSE,
         },
     )
     @slides.mapping.post
     def create_slides(self, request, *args, pk=None, **kwargs):
-        """Update slides for an Album."""
+        """Update slides for an Album.
+
+        If the request has an If-Match header with an outdated ETag of
+        the album, the slides are not changed.
+        """
 
         serializer = CreateSlidesRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -402,48 +805,150 @@ class AlbumsViewSet(viewsets.GenericViewSet):
         query_params_serializer = SlidesRequestSerializer(data=request.query_params)
         query_params_serializer.is_valid(raise_exception=True)
 
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
+        with transaction.atomic():
+            album = get_album(request, pk, edit=True, for_update=True)
+            check_if_match(request, album)
+
+            details = query_params_serializer.validated_data['details']
+            artworks = validate_slide_artworks(
+                [
+                    item['id']
+                    for slide in serializer.validated_data
+                    for item in slide['items']
+                ],
+                details=details,
             )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
 
-        if (
-            album.user == request.user
-            or PermissionsRelation.objects.filter(
-                album=album,
-                user=request.user,
-                permissions='EDIT',
-            ).exists()
-        ):
-            slides_list = []
-            for slide in serializer.validated_data:
-                current_slide = {
+            slides_list = [
+                {
                     'id': slide['id'] if 'id' in slide else shortuuid.uuid(),
-                    'items': [],
+                    'items': [{'id': item['id']} for item in slide['items']],
                 }
-                for artwork in slide['items']:
-                    # check if artwork exists
-                    try:
-                        Artwork.objects.get(id=artwork.get('id'), published=True)
-                    except Artwork.DoesNotExist as dne:
-                        raise ParseError(_('Artwork does not exist')) from dne
-                    current_slide['items'].append({'id': artwork['id']})
-                slides_list.append(current_slide)
+                for slide in serializer.validated_data
+            ]
             album.slides = slides_list
             album.last_changed_by = request.user
-            album.save()
+            album.save(update_fields=SLIDES_UPDATE_FIELDS)
+            album.record_change(
+                request.user,
+                [{'op': 'replace', 'slides': album.slides}],
+            )
 
-            if query_params_serializer.validated_data['details']:
-                return Response(slides_with_details(album, request))
-            else:
-                return Response(album.slides)
+        headers = {'ETag': album_etag(album)}
+        if details:
+            return Response(
+                slides_with_details(album, request, artworks=artworks),
+                headers=headers,
+            )
+        else:
+            return Response(album.slides, headers=headers)
 
-        raise PermissionDenied
+    @extend_schema(
+        request=UpdateSlidesRequestSerializer,
+        parameters=[IF_MATCH_PARAMETER],
+        responses={
+            200: UpdateSlidesResponseSerializer,
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+            412: PRECONDITION_FAILED_RESPONSE,
+        },
+    )
+    @slides.mapping.patch
+    def update_slides(self, request, *args, pk=None, **kwargs):
+        """Change slides of an Album with a list of operations.
+
+        Instead of replacing all slides, slides can be inserted, moved,
+        removed, paired with the following slide and unpaired. Slides
+        are referred to by their ids. Either all operations are applied
+        or none. If the request has an If-Match header with an outdated
+        ETag of the album, no operations are applied.
+        """
+
+        serializer = UpdateSlidesRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            album = get_album(request, pk, edit=True, for_update=True)
+            check_if_match(request, album)
+            album.slides, operations = apply_slide_operations(
+                album.slides,
+                serializer.validated_data['operations'],
+            )
+            album.last_changed_by = request.user
+            album.save(update_fields=SLIDES_UPDATE_FIELDS)
+            album.record_change(request.user, operations)
+
+        return Response(
+            {
+                'version': album.version,
+                'created_slides': created_slides(operations),
+            },
+            headers={'ETag': album_etag(album)},
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name='since',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='The album version known to the client',
+            ),
+        ],
+        responses={
+            # TODO better response definition
+            200: OpenApiResponse(description='OK'),
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+        },
+    )
+    @action(detail=True, methods=['get'])
+    def changes(self, request, *args, pk=None, **kwargs):
+        """Returns the changes of an Album since a specific version.
+
+        Only the latest changes of an album are stored. If not all
+        changes since the version are available, complete is false and
+        the client has to retrieve the whole album again.
+        """
+
+        serializer = AlbumChangesRequestSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        since = serializer.validated_data['since']
+
+        album = get_album(request, pk)
+
+        changes = list(
+            AlbumChange.objects.filter(album=album, version__gt=since).select_related(
+                'user',
+            ),
+        )
+
+        return Response(
+            {
+                'version': album.version,
+                'complete': [c.version for c in changes]
+                == list(range(since + 1, album.version + 1)),
+                'changes': [
+                    {
+                        'version': c.version,
+                        'user': {
+                            'id': c.user.username,
+                            'name': c.user.get_full_name(),
+                        }
+                        if c.user
+                        else None,
+                        'date': c.date,
+                        'operations': c.operations,
+                    }
+                    for c in changes
+                ],
+            },
+            headers={'ETag': album_etag(album)},
+        )
 
     @extend_schema(
         parameters=[
@@ -469,20 +974,12 @@ class AlbumsViewSet(viewsets.GenericViewSet):
             request.query_params.get('sort_by', 'last_name'),
             ['last_name', '-last_name'],
         )
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
-            )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
+        album = get_album(request, pk)
 
         qs = PermissionsRelation.objects.filter(album=album)
 
         # if the user is not the owner of the album, ony return the permissions of this user
-        if album.user != request.user:
+        if album.user_id != request.user.pk:
             qs = qs.filter(user=request.user)
 
         sorting = (
@@ -514,64 +1011,29 @@ class AlbumsViewSet(viewsets.GenericViewSet):
     )
     @permissions.mapping.post
     def create_permissions(self, request, *args, pk=None, **kwargs):
-        """Update permissions."""
+        """Update permissions.
+
+        The permissions of all users are replaced in one transaction.
+        Users who are not listed or have empty permissions are removed
+        from the album. If any of the users does not exist, nothing is
+        changed.
+        """
         serializer = PermissionsRequestSerializer(data=request.data, many=True)
         serializer.is_valid(raise_exception=True)
 
-        try:
-            album = Album.objects.filter(pk=pk, user=request.user).get()
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
-
-        users = []
-
-        # update permissions
-        for item in serializer.validated_data:
-            user = item['user']
+        with transaction.atomic():
+            album = get_album(request, pk, for_update=True)
+            if album.user_id != request.user.pk:
+                raise NotFound(_('Album does not exist'))
 
-            User = get_user_model()  # noqa: N806
-
-            try:
-                user = User.objects.get(username=user)
-            except User.DoesNotExist as dne:
-                raise ParseError('User does not exist') from dne
-
-            permissions = item['permissions']
-
-            if permissions:
-                users.append(user.username)
-
-            for perm in permissions:
-                with transaction.atomic():
-                    # Only allow permission assignment if the user is not already the owner
-                    if album.user == user:
-                        raise ParseError('User is already the owner of album.')
-                    pr, created = PermissionsRelation.objects.get_or_create(
-                        album=album,
-                        user=user,
-                    )
-                    pr.permissions = perm['id']
-                    pr.save()
-
-                    # When permission is created, add album to user's root folder
-                    # Add album to root folder, creating a relationship
-                    root_folder = Folder.root_folder_for_user(user)
-                    FolderAlbumRelation.objects.get_or_create(
-                        album=album,
-                        user=user,
-                        folder=root_folder,
-                    )
-
-        # remove deleted permissions
-        PermissionsRelation.objects.filter(album=album).exclude(
-            user__username__in=users,
-        ).delete()
-        # also remove albums with deleted permissions from those users' root folder
-        FolderAlbumRelation.objects.filter(album=album).exclude(
-            user=request.user,
-        ).exclude(user__username__in=users).delete()
+            set_album_permissions(
+                request,
+                [album],
+                serializer.validated_data,
+                replace=True,
+            )
 
-        qs = PermissionsRelation.objects.filter(album=album)
+        qs = PermissionsRelation.objects.filter(album=album).select_related('user')
 
         return Response(
             [
@@ -602,18 +1064,10 @@ class AlbumsViewSet(viewsets.GenericViewSet):
         shared with, only their own sharing permission will be deleted.
         """
 
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
-            )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
+        album = get_album(request, pk)
 
         # user is owner of the album
-        if album.user == request.user:
+        if album.user_id == request.user.pk:
             # remove permissions for all users
             PermissionsRelation.objects.filter(album=album).delete()
             # remove album from all folders except the owner's folder
@@ -640,7 +1094,7 @@ class AlbumsViewSet(viewsets.GenericViewSet):
             OpenApiParameter(
                 name='download_format',
                 type=OpenApiTypes.STR,
-                enum=['pptx', 'pdf'],
+                enum=get_export_formats(),
                 default='pptx',
             ),
             # for this specific endpoint we don't need this parameter from the GLOBAL_PARAMS
@@ -655,6 +1109,9 @@ class AlbumsViewSet(viewsets.GenericViewSet):
             # TODO better response definition
             #   https://drf-spectacular.readthedocs.io/en/latest/faq.html#how-to-serve-in-memory-generated-files-or-files-in-general-outside-filefield
             200: OpenApiResponse(description='OK'),
+            202: OpenApiResponse(
+                description='Accepted, the album is exported in a background job',
+            ),
             403: ERROR_RESPONSES[403],
             404: ERROR_RESPONSES[404],
             501: OpenApiResponse(description='Not implemented yet'),
@@ -662,30 +1119,42 @@ class AlbumsViewSet(viewsets.GenericViewSet):
     )
     @action(detail=True, methods=['get'])
     def download(self, request, *args, pk=None, **kwargs):
-        """Download Album as pptx or pdf."""
+        """Download Album in one of the available export formats."""
 
         serializer = AlbumsDownloadRequestSerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
 
-        try:
-            album = (
-                Album.objects.filter(pk=pk)
-                .filter(Q(user=request.user) | Q(permissions=request.user))
-                .distinct('id')
-                .get()
-            )
-        except Album.DoesNotExist as dne:
-            raise NotFound(_('Album does not exist')) from dne
+        album = get_album(request, pk)
 
         download_format = serializer.validated_data['download_format']
         language = serializer.validated_data['language']
 
         try:
-            pptx = album_download_as_pptx(
+            exporter_class = get_exporter(download_format)
+        except ExportError as ee:
+            raise ParseError(_('Invalid format')) from ee
+
+        # large albums are exported in a background job, to not block the worker
+        if album.size() > settings.EXPORT_SYNC_MAX_ARTWORKS:
+            job = django_rq.enqueue(
+                export_album,
                 album.pk,
-                language=language,
-                return_raw=download_format == 'pdf',
+                download_format,
+                language,
+                result_ttl=settings.EXPORT_FILE_TTL,
+            )
+            return Response(
+                download_job_object(album, job, request),
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        try:
+            exporter = exporter_class(
+                AlbumExport(album, language=language, request=request),
             )
+            # the export is spooled to a temporary file, which is closed by the
+            # FileResponse after streaming it
+            output = exporter.render()
         except ExportError as ee:
             error_info = (
                 _('Error during download of Album %(id)s: %(message)s')
@@ -694,27 +1163,93 @@ class AlbumsViewSet(viewsets.GenericViewSet):
             logger.exception(error_info)
             return Response(error_info, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        if download_format == 'pptx':
-            return pptx
-        elif download_format == 'pdf':
-            filename = f'{slugify(album.title)}.pdf'
-            mime_type = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
-
-            # convert pptx to pdf via Gotenberg
-            r = requests.post(
-                settings.GOTENBERG_API_URL,
-                timeout=settings.REQUESTS_TIMEOUT,
-                files={
-                    ('files', (filename, pptx, mime_type)),
-                },
-            )
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=exporter.filename,
+            content_type=exporter.content_type,
+        )
 
-            return HttpResponse(
-                r.content,
-                content_type='application/pdf',
-                headers={
-                    'Content-Disposition': f'attachment; filename={filename}',
-                },
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description='OK'),
+            202: OpenApiResponse(description='Accepted, the export is not ready yet'),
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+            500: OpenApiResponse(description='Internal Server Error'),
+        },
+    )
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path=r'download/(?P<job_id>[^/.]+)',
+        url_name='download-job',
+    )
+    def download_job(self, request, *args, pk=None, job_id=None, **kwargs):
+        """Retrieve the status of an Album export running in a background
+        job, or the exported file once it is finished."""
+
+        album = get_album(request, pk)
+
+        job = django_rq.get_queue('default').fetch_job(job_id)
+
+        # only export jobs of this album can be retrieved
+        if (
+            job is None
+            or job.func_name != f'{export_album.__module__}.{export_album.__name__}'
+            or job.args[0] != album.pk
+        ):
+            raise NotFound(_('Download does not exist'))
+
+        job_status = job.get_status()
+
+        if job_status == JobStatus.FINISHED:
+            result = job.return_value()
+            try:
+                output = export_storage().open(result['name'])
+            except FileNotFoundError as fnfe:
+                raise NotFound(_('Download does not exist')) from fnfe
+            return FileResponse(
+                output,
+                as_attachment=True,
+                filename=result['filename'],
+                content_type=result['content_type'],
             )
-        else:
-            raise ParseError(_('Invalid format'))
+
+        if job_status in (JobStatus.FAILED, JobStatus.STOPPED, JobStatus.CANCELED):
+            error_info = _('Error during download of Album %(id)s') % {'id': album.pk}
+            return Response(error_info, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response(
+            download_job_object(album, job, request),
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @extend_schema(
+        parameters=[AlbumsMetadataRequestSerializer],
+        responses={
+            200: OpenApiResponse(description='OK'),
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+        },
+    )
+    @action(detail=True, methods=['get'])
+    def metadata(self, request, *args, pk=None, **kwargs):
+        """Export the metadata of all Artworks in an Album as CSV or JSON
+        Lines, in the order of the slides."""
+
+        serializer = AlbumsMetadataRequestSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        album = get_album(request, pk)
+
+        writer = get_metadata_writer(serializer.validated_data['export_format'])()
+
+        return StreamingHttpResponse(
+            writer.stream(metadata_rows(album_artworks(album))),
+            content_type=writer.content_type,
+            headers={
+                'Content-Disposition': f'attachment; filename={slugify(album.title)}.{writer.extension}',
+            },
+        )
@@ -16,16 +16,18 @@ from rest_framework.response import Response
 from sorl.thumbnail import get_thumbnail
 
 from django.conf import settings
-from django.db.models import Q
 from django.http import FileResponse
 from django.shortcuts import redirect
 from django.utils.html import strip_tags
 from django.utils.text import slugify
 from django.utils.translation import get_language, gettext_lazy as _
 
-from artworks.models import Album, Artwork, PermissionsRelation
+from artworks.cache import METADATA_VERSION, get_cache_version
+from artworks.discriminatory_terms import strikethrough
+from artworks.models import Album, AlbumSlideItem, Artwork
 from texts.models import Text
 
+from ..conditional import conditional, make_etag, static_validator
 from ..serializers.artworks import (
     ArtworksAlbumsRequestSerializer,
     ArtworksImageRequestSerializer,
@@ -33,12 +35,65 @@ from ..serializers.artworks import (
 from ..views import (
     check_limit,
     check_offset,
+    filter_albums_for_user,
     get_person_list,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def artwork_etag(request, pk=None, **kwargs):
+    date_changed = (
+        Artwork.objects.filter(pk=pk, published=True)
+        .values_list('date_changed', flat=True)
+        .first()
+    )
+    if date_changed is None:
+        return None
+
+    return make_etag(
+        pk,
+        date_changed.isoformat(),
+        get_cache_version(METADATA_VERSION),
+        request.user.is_editor,
+        get_language(),
+    )
+
+
+def artwork_labels():
+    ret = {}
+
+    exclude = (
+        'id',
+        'archive_id',
+        'checked',
+        'published',
+        'date_created',
+        'date_changed',
+        'search_persons',
+        'search_locations',
+        'search_keywords',
+        'search_materials',
+        'search_vector',
+    )
+
+    # Artworks
+    fields = Artwork._meta.get_fields()
+    for field in fields:
+        if field.name not in exclude and hasattr(field, 'verbose_name'):
+            ret[field.name] = field.verbose_name
+
+    # the license property is not a field on the Artwork model but part of the serialisation
+    ret['license'] = Artwork.get_license_label()
+
+    # localized fields
+    ret['title_comment'] = Artwork.get_title_comment_label()
+    ret['material_description'] = Artwork.get_material_description_label()
+    ret['comments'] = Artwork.get_comments_label()
+
+    return dict(sorted(ret.items()))
+
+
 @extend_schema(tags=['artworks'])
 class ArtworksViewSet(viewsets.GenericViewSet):
     queryset = Artwork.objects.filter(published=True)
@@ -131,6 +186,7 @@ class ArtworksViewSet(viewsets.GenericViewSet):
             404: ERROR_RESPONSES[404],
         },
     )
+    @conditional(artwork_etag)
     def retrieve(self, request, *args, pk=None, **kwargs):
         """Retrieve information for a specific Artwork."""
 
@@ -264,40 +320,11 @@ class ArtworksViewSet(viewsets.GenericViewSet):
         },
     )
     @action(detail=False, methods=['get'])
+    @conditional(static_validator(artwork_labels))
     def labels(self, request, *args, **kwargs):
         """Get all labels for displaying Artwork metadata."""
 
-        ret = {}
-
-        exclude = (
-            'id',
-            'archive_id',
-            'checked',
-            'published',
-            'date_created',
-            'date_changed',
-            'search_persons',
-            'search_locations',
-            'search_keywords',
-            'search_materials',
-            'search_vector',
-        )
-
-        # Artworks
-        fields = Artwork._meta.get_fields()
-        for field in fields:
-            if field.name not in exclude and hasattr(field, 'verbose_name'):
-                ret[field.name] = field.verbose_name
-
-        # the license property is not a field on the Artwork model but part of the serialisation
-        ret['license'] = Artwork.get_license_label()
-
-        # localized fields
-        ret['title_comment'] = Artwork.get_title_comment_label()
-        ret['material_description'] = Artwork.get_material_description_label()
-        ret['comments'] = Artwork.get_comments_label()
-
-        return Response(dict(sorted(ret.items())))
+        return Response(artwork_labels())
 
     @extend_schema(
         parameters=[
@@ -339,25 +366,20 @@ class ArtworksViewSet(viewsets.GenericViewSet):
         except Artwork.DoesNotExist as dne:
             raise NotFound(_('Artwork does not exist')) from dne
 
-        q_filters = Q()
-
-        if serializer.validated_data['owner']:
-            q_filters |= Q(user=request.user)
-
-        permissions = serializer.validated_data['permissions'].split(',')
+        q_filters = filter_albums_for_user(
+            user=request.user,
+            owner=serializer.validated_data['owner'],
+            permissions=serializer.validated_data['permissions'],
+        )
 
-        if permissions:
-            q_filters |= Q(
-                pk__in=PermissionsRelation.objects.filter(
-                    user=request.user,
-                    permissions__in=permissions,
-                ).values_list('album__pk', flat=True),
+        albums = (
+            Album.objects.filter(
+                pk__in=AlbumSlideItem.objects.filter(artwork=artwork).values(
+                    'album_id',
+                ),
             )
-
-        albums = Album.objects.filter(
-            slides__contains=[{'items': [{'id': artwork.pk}]}],
-        ).filter(
-            q_filters,
+            .filter(q_filters)
+            .order_by('date_created')
         )
 
         return Response(
@@ -392,18 +414,10 @@ class ArtworksViewSet(viewsets.GenericViewSet):
         if artwork.image_original and not artwork.image_fullsize:
             artwork.create_image_fullsize()
 
-        discriminatory_terms = artwork.get_discriminatory_terms_list(
-            order_by_length=True,
-        )
+        discriminatory_terms = list(artwork.get_discriminatory_terms_list())
 
         def apply_strikethrough(text):
-            for term in discriminatory_terms:
-                if term in text:
-                    strikethrough_term = term[0] + ''.join(
-                        [char + '\u0336' for char in term[1:]],
-                    )
-                    text = text.replace(term, strikethrough_term)
-            return text
+            return strikethrough(text, discriminatory_terms)
 
         # create metadata file content
         metadata_persons = (
@@ -5,20 +5,143 @@ from drf_spectacular.utils import (
     OpenApiTypes,
     extend_schema,
 )
-from rest_framework import viewsets
-from rest_framework.exceptions import NotFound
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
 
 from django.conf import settings
-from django.utils.translation import gettext_lazy as _
+from django.db import connection, transaction
+from django.db.models import CharField, Count, Min, Value
+from django.utils.translation import get_language, gettext_lazy as _
 
-from artworks.models import Folder
+from artworks.cache import METADATA_VERSION, folders_version, get_cache_version
+from artworks.models import Album, Folder, FolderAlbumRelation, FolderClosure
 
-from ..serializers.folders import FoldersRequestSerializer
-from ..views import album_object, check_limit, check_offset, check_sorting
+from ..conditional import conditional, make_etag
+from ..serializers.folders import (
+    CreateFolderRequestSerializer,
+    FoldersRequestSerializer,
+    UpdateFolderRequestSerializer,
+)
+from ..views import (
+    album_objects,
+    check_limit,
+    check_offset,
+    check_sorting,
+    get_folder,
+)
 from . import filter_albums_for_user
 
 
+def folder_etag(request, pk=None, **kwargs):
+    serializer = FoldersRequestSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return None
+
+    if pk == 'root':
+        pk = Folder.root_folder_id_for_user(request.user)
+    folder = (
+        Folder.objects.filter(owner=request.user, id=pk)
+        .only('id', 'date_changed')
+        .first()
+    )
+    if folder is None:
+        return None
+
+    # the version of the folders of the user is changed with every change
+    # of their folders, and of the albums in them
+    return make_etag(
+        folder.pk,
+        folder.date_changed.isoformat(),
+        request.get_full_path(),
+        get_cache_version(folders_version(request.user.pk)),
+        get_cache_version(METADATA_VERSION),
+        get_language(),
+    )
+
+
+def folder_contents(folder, q_filters):
+    """Returns the subfolders and albums of a folder as one queryset of
+    dicts, which can be sorted and paginated together."""
+
+    fields = ('id', 'title', 'date_created', 'date_changed', 'type')
+    folders = (
+        Folder.objects.filter(parent=folder)
+        .annotate(type=Value(Folder._meta.object_name, output_field=CharField()))
+        .values(*fields)
+    )
+    albums = (
+        folder.albums.filter(q_filters)
+        .annotate(type=Value(Album._meta.object_name, output_field=CharField()))
+        .values(*fields)
+    )
+    return folders.union(albums)
+
+
+def folder_contents_page(contents, sorting, limit, offset):
+    """Returns the total number of items of the contents of a folder, see
+    folder_contents(), and the ids and types of the items on a page.
+
+    Subfolders are sorted before albums. The total is counted in the same
+    query as the page, with a window function.
+    """
+
+    field = sorting.removeprefix('-')
+    direction = 'DESC' if sorting.startswith('-') else 'ASC'
+    sql, params = contents.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            # the sorting is validated with check_sorting(), no unvalidated
+            # parameters are used in the raw query
+            'SELECT "id", "type", COUNT(*) OVER() AS "total_count" '  # noqa: S608, see comment above
+            f'FROM ({sql}) AS contents '
+            # the id makes the order, and therefore the pagination, stable
+            f'ORDER BY "type" DESC, "{field}" {direction}, "id" '
+            'LIMIT %s OFFSET %s',
+            (*params, limit, offset),
+        )
+        rows = cursor.fetchall()
+
+    page = [{'id': row[0], 'type': row[1]} for row in rows]
+    if rows:
+        return rows[0][2], page
+    # there are no rows to get the total from, if the offset exceeds it
+    return contents.count() if offset > 0 else 0, page
+
+
+def folder_objects(folders):
+    """Returns the dict representations of folders, with the number of
+    albums in each folder and all its subfolders.
+
+    The numbers of albums of all folders are counted with one query, using
+    the closure table of the folder hierarchy.
+    """
+
+    folders = list(folders)
+    number_of_albums = dict(
+        FolderClosure.objects.filter(ancestor__in=folders)
+        .values('ancestor')
+        .annotate(
+            number_of_albums=Count('descendant__rel_to_folder__album', distinct=True),
+        )
+        .values_list('ancestor', 'number_of_albums'),
+    )
+    return [
+        {
+            'id': folder.id,
+            'title': folder.title,
+            'type': folder._meta.object_name,
+            'parent': folder.parent_id,
+            'number_of_albums': number_of_albums.get(folder.pk, 0),
+            'date_created': folder.date_created,
+            'date_changed': folder.date_changed,
+        }
+        for folder in folders
+    ]
+
+
 @extend_schema(tags=['folders'])
 class FoldersViewSet(viewsets.GenericViewSet):
     queryset = Folder.objects.all()
@@ -54,10 +177,7 @@ class FoldersViewSet(viewsets.GenericViewSet):
         },
     )
     def list(self, request, *args, **kwargs):
-        """List of all Folders for a user.
-
-        At the moment users only have one root Folder.
-        """
+        """List of all Folders for a user, including their subfolders."""
 
         limit = check_limit(request.query_params.get('limit', 100))
         offset = check_offset(request.query_params.get('offset', 0))
@@ -78,6 +198,7 @@ class FoldersViewSet(viewsets.GenericViewSet):
                 {
                     'id': folder.id,
                     'title': folder.title,
+                    'parent': folder.parent_id,
                     'owner': folder.owner.get_full_name(),
                 }
                 for folder in results
@@ -130,11 +251,13 @@ class FoldersViewSet(viewsets.GenericViewSet):
             404: ERROR_RESPONSES[404],
         },
     )
+    @conditional(folder_etag)
     def retrieve(self, request, *args, pk=None, **kwargs):
         """Retrieve information for a specific Folder.
 
         If id == 'root' it returns the content of the root folder for
-        the current user.
+        the current user. The content contains the subfolders, followed
+        by the albums of the folder, each sorted by sort_by.
         """
 
         serializer = FoldersRequestSerializer(data=request.query_params)
@@ -147,16 +270,7 @@ class FoldersViewSet(viewsets.GenericViewSet):
             self.ordering_fields,
         )
 
-        # Retrieve folder by id
-        if pk == 'root':
-            folder = Folder.root_folder_for_user(request.user)
-        else:
-            # As we now only have root folder, this is not immediately useful
-            # But I am leaving it here in case someone was searching something other than root
-            try:
-                folder = Folder.objects.get(owner=request.user, id=pk)
-            except Folder.DoesNotExist as dne:
-                raise NotFound(_('Folder does not exist')) from dne
+        folder = get_folder(request, pk)
 
         q_filters = filter_albums_for_user(
             user=request.user,
@@ -164,36 +278,198 @@ class FoldersViewSet(viewsets.GenericViewSet):
             permissions=serializer.validated_data['permissions'],
         )
 
+        total, page = folder_contents_page(
+            folder_contents(folder, q_filters),
+            sorting,
+            limit,
+            offset,
+        )
+
         albums = (
-            folder.albums.filter(q_filters)
-            .order_by(sorting)
+            Album.objects.filter(
+                pk__in=[c['id'] for c in page if c['type'] == 'Album'],
+            )
             .select_related(
                 'user',
                 'last_changed_by',
-            )[offset : offset + limit]
+            )
+            .defer('slides')
         )
-
-        albums_data = [
-            album_object(
-                album,
+        albums_data = {
+            album['id']: album
+            for album in album_objects(
+                albums,
                 request=request,
                 details=False,
                 include_slides=False,
                 include_type=True,
                 include_featured=True,
             )
-            for album in albums
-        ]
+        }
+        folders_data = {
+            f['id']: f
+            for f in folder_objects(
+                Folder.objects.filter(
+                    pk__in=[c['id'] for c in page if c['type'] == 'Folder'],
+                ),
+            )
+        }
+
         return Response(
             {
                 'id': folder.id,
                 'title': folder.title,
+                'parent': folder.parent_id,
+                'breadcrumbs': [
+                    {'id': ancestor.id, 'title': ancestor.title}
+                    for ancestor in folder.ancestors().only('id', 'title')
+                ],
                 'content': {
-                    # Content shows all the albums belonging to the (root) folder per user.
-                    # As at the moment we only have root folders, folders within folders
-                    # will later be implemented to be shown in content
-                    'total': folder.albums.all().count(),  # currently: number of albums belonging to root folder
-                    'data': albums_data,
+                    'total': total,
+                    'data': [
+                        folders_data[c['id']]
+                        if c['type'] == 'Folder'
+                        else albums_data[c['id']]
+                        for c in page
+                    ],
                 },
             },
         )
+
+    @extend_schema(
+        request=CreateFolderRequestSerializer,
+        responses={
+            201: OpenApiResponse(description='Created'),
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+        },
+    )
+    def create(self, request, *args, **kwargs):
+        """Create a new Folder.
+
+        The folder is created in the parent folder, which defaults to
+        the root folder of the user.
+        """
+
+        serializer = CreateFolderRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        parent = get_folder(request, serializer.validated_data['parent'])
+        folder = Folder.objects.create(
+            title=serializer.validated_data['title'],
+            owner=request.user,
+            parent=parent,
+        )
+
+        return Response(folder_objects([folder])[0], status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        request=UpdateFolderRequestSerializer,
+        responses={
+            200: OpenApiResponse(description='OK'),
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+        },
+    )
+    def partial_update(self, request, *args, pk=None, **kwargs):
+        """Rename a Folder or move it, with all its subfolders and albums,
+        to another parent folder."""
+
+        serializer = UpdateFolderRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        folder = get_folder(request, pk)
+
+        if 'title' in serializer.validated_data:
+            folder.title = serializer.validated_data['title']
+
+        if 'parent' in serializer.validated_data:
+            parent = get_folder(request, serializer.validated_data['parent'])
+            if folder.is_root:
+                raise ParseError(_('The root folder cannot be moved'))
+            if folder.is_ancestor_of(parent):
+                raise ParseError(
+                    _('A folder cannot be moved into itself or one of its subfolders'),
+                )
+            folder.parent = parent
+
+        with transaction.atomic():
+            folder.save()
+
+        return Response(folder_objects([folder])[0])
+
+    @extend_schema(
+        responses={
+            204: OpenApiResponse(),
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+        },
+    )
+    def destroy(self, request, *args, pk=None, **kwargs):
+        """Delete a Folder and all its subfolders.
+
+        The albums of the deleted folders are moved to the parent
+        folder. The root folder cannot be deleted.
+        """
+
+        folder = get_folder(request, pk)
+        if folder.is_root:
+            raise ParseError(_('The root folder cannot be deleted'))
+
+        with transaction.atomic():
+            relations = FolderAlbumRelation.objects.filter(
+                user=request.user,
+                folder__in=folder.subtree(),
+            )
+            # albums which are already in the parent folder are not added twice
+            relations.filter(
+                album__in=FolderAlbumRelation.objects.filter(
+                    user=request.user,
+                    folder=folder.parent_id,
+                ).values('album'),
+            ).delete()
+            # albums in several of the deleted folders are only moved once
+            relations.exclude(
+                pk__in=relations.order_by()
+                .values('album')
+                .annotate(first=Min('pk'))
+                .values('first'),
+            ).delete()
+            relations.update(folder=folder.parent_id)
+            folder.delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description='OK'),
+            403: ERROR_RESPONSES[403],
+            404: ERROR_RESPONSES[404],
+        },
+    )
+    @action(detail=True, methods=['get'])
+    def tree(self, request, *args, pk=None, **kwargs):
+        """Returns all subfolders of a Folder, at any depth.
+
+        The subfolders are sorted by their depth and title, and contain
+        the id of their parent, so that the tree can be built from them.
+        """
+
+        folder = get_folder(request, pk)
+
+        links = (
+            FolderClosure.objects.filter(ancestor=folder, depth__gt=0)
+            .select_related('descendant')
+            .order_by('depth', 'descendant__title')
+        )
+        depths = {link.descendant_id: link.depth for link in links}
+
+        return Response(
+            [
+                {**f, 'depth': depths[f['id']]}
+                for f in folder_objects(link.descendant for link in links)
+            ],
+        )
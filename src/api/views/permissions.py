@@ -7,6 +7,21 @@ from django.conf import settings
 
 from artworks.models import PermissionsRelation
 
+from ..conditional import conditional, static_validator
+
+
+def permission_choices():
+    ret = []
+    for permission_type in PermissionsRelation.PERMISSION_CHOICES:
+        permission = {
+            'id': permission_type[0],
+            'label': permission_type[1],
+        }
+        if permission_type[0] in settings.DEFAULT_PERMISSIONS:
+            permission['default'] = True
+        ret.append(permission)
+    return ret
+
 
 @extend_schema(tags=['permissions'])
 class PermissionsViewSet(viewsets.GenericViewSet):
@@ -17,14 +32,6 @@ class PermissionsViewSet(viewsets.GenericViewSet):
             403: ERROR_RESPONSES[403],
         },
     )
+    @conditional(static_validator(permission_choices))
     def list(self, request, *args, **kwargs):
-        ret = []
-        for permission_type in PermissionsRelation.PERMISSION_CHOICES:
-            permission = {
-                'id': permission_type[0],
-                'label': permission_type[1],
-            }
-            if permission_type[0] in settings.DEFAULT_PERMISSIONS:
-                permission['default'] = True
-            ret.append(permission)
-        return Response(ret)
+        return Response(permission_choices())
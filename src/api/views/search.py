@@ -1,5 +1,10 @@
 from base_common_drf.openapi.responses import ERROR_RESPONSES
-from drf_spectacular.utils import OpenApiExample, extend_schema, inline_serializer
+from drf_spectacular.utils import (
+    OpenApiExample,
+    OpenApiResponse,
+    extend_schema,
+    inline_serializer,
+)
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ParseError
@@ -8,13 +13,20 @@ from rest_framework.serializers import JSONField
 
 from django.conf import settings
 from django.db.models import FloatField, Q, Value
+from django.http import StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _
 
+from artworks.exports import get_metadata_writer, metadata_rows
 from artworks.models import Artwork, Keyword, Location
 
+from ..conditional import conditional, static_validator
 from ..search.filters import FILTERS, FILTERS_KEYS
 from ..search.utils import websearch_transformation
-from ..serializers.search import SearchRequestSerializer, SearchResultSerializer
+from ..serializers.search import (
+    SearchExportRequestSerializer,
+    SearchRequestSerializer,
+    SearchResultSerializer,
+)
 from . import check_limit, check_offset
 
 
@@ -183,6 +195,87 @@ for filter_id in FILTERS_KEYS:
     FILTERS_MAP[filter_id] = globals()[f'filter_{filter_id}']
 
 
+def search_ordering(q_param=None, filters=None):
+    """Returns the ordering of search results, as arguments of
+    order_by()."""
+
+    if q_param:
+        ordering = [
+            '-rank',
+            '-similarity_title',
+            '-similarity_title_english',
+            '-similarity_persons',
+            '-date_changed',
+        ]
+    elif filters:
+        # if user is using search, sort by title
+        ordering = ['title', '-date_changed']
+    else:
+        # else show the newest changes first
+        ordering = ['-date_changed', 'title']
+    # the id makes the ordering stable
+    return [*ordering, 'id']
+
+
+def search_queryset(q_param=None, filters=None, exclude=None):
+    """Returns a queryset of all published artworks matching a search, and
+    the ordering of the search results as raw SQL.
+
+    The queryset is distinct on the artwork id, therefore it has no
+    ordering set itself.
+    """
+
+    if q_param:
+        subq = Artwork.objects.search(q_param)
+    else:
+        subq = Artwork.objects.annotate(rank=Value(1.0, FloatField()))
+
+    order_by = ', '.join(
+        f'"{field[1:]}" DESC' if field.startswith('-') else f'"{field}"'
+        for field in search_ordering(q_param, filters)
+    )
+
+    # only search for published artworks
+    subq = subq.filter(published=True)
+
+    if exclude:
+        subq = subq.exclude(id__in=exclude)
+
+    if filters:
+        for f in filters:
+            if f['id'] not in FILTERS_KEYS:
+                raise ParseError(f'Invalid filter id {repr(f["id"])}')
+            filters_list, exclude_list = FILTERS_MAP[f['id']](f['filter_values'])
+            for filter_item in filters_list:
+                subq = subq.filter(filter_item)
+            for exclude_item in exclude_list:
+                subq = subq.exclude(exclude_item)
+
+    # we need to remove the previously set ordering to be able to use
+    # distinct only on id field
+    subq = subq.order_by().distinct('id')
+
+    return subq, order_by
+
+
+def search_results_queryset(q_param=None, filters=None, exclude=None):
+    """Returns a queryset of all published artworks matching a search, in
+    the order of the search results.
+
+    In contrast to search_queryset(), the queryset is not distinct, so it
+    can be ordered, iterated in chunks and used with prefetch_related(),
+    e.g. for exports.
+    """
+
+    subq, _order_by = search_queryset(q_param, filters, exclude)
+    # the ranks and similarities only depend on the artwork itself, so they
+    # are the same as in the search results
+    qs = Artwork.objects.search(q_param) if q_param else Artwork.objects.all()
+    return qs.filter(pk__in=subq.values('pk')).order_by(
+        *search_ordering(q_param, filters),
+    )
+
+
 @extend_schema(tags=['search'])
 class SearchViewSet(viewsets.GenericViewSet):
     @extend_schema(
@@ -240,37 +333,7 @@ class SearchViewSet(viewsets.GenericViewSet):
         q_param = serializer.validated_data.get('q')
         exclude = serializer.validated_data.get('exclude', [])
 
-        if q_param:
-            subq = Artwork.objects.search(q_param)
-            order_by = '"rank" DESC, "similarity_title" DESC, "similarity_title_english" DESC, "similarity_persons" DESC, "date_changed" DESC'
-        else:
-            subq = Artwork.objects.annotate(rank=Value(1.0, FloatField()))
-            # if user is using search, sort by title, else show the newest changes first
-            order_by = (
-                '"title", "date_changed" DESC'
-                if filters
-                else '"date_changed" DESC, "title"'
-            )
-
-        # only search for published artworks
-        subq = subq.filter(published=True)
-
-        if exclude:
-            subq = subq.exclude(id__in=exclude)
-
-        if filters:
-            for f in filters:
-                if f['id'] not in FILTERS_KEYS:
-                    raise ParseError(f'Invalid filter id {repr(f["id"])}')
-                filters_list, exclude_list = FILTERS_MAP[f['id']](f['filter_values'])
-                for filter_item in filters_list:
-                    subq = subq.filter(filter_item)
-                for exclude_item in exclude_list:
-                    subq = subq.exclude(exclude_item)
-
-        # we need to remove the previously set ordering to be able to use
-        # distinct only on id field
-        subq = subq.order_by().distinct('id')
+        subq, order_by = search_queryset(q_param, filters, exclude)
 
         subq_sql, subq_params = subq.query.sql_with_params()
 
@@ -349,6 +412,42 @@ class SearchViewSet(viewsets.GenericViewSet):
 
         return Response({'total': total, 'results': results})
 
+    @extend_schema(
+        request=SearchExportRequestSerializer,
+        responses={
+            200: OpenApiResponse(description='OK'),
+            400: ERROR_RESPONSES[400],
+            403: ERROR_RESPONSES[403],
+        },
+    )
+    @action(detail=False, methods=['POST'])
+    def export(self, request, *args, **kwargs):
+        """Export the metadata of all Artworks matching a search as CSV or
+        JSON Lines.
+
+        In contrast to the search itself, the results are not paginated
+        but streamed, in the order of the search results.
+        """
+
+        serializer = SearchExportRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        qs = search_results_queryset(
+            serializer.validated_data.get('q'),
+            serializer.validated_data.get('filters', []),
+            serializer.validated_data.get('exclude', []),
+        )
+
+        writer = get_metadata_writer(serializer.validated_data['export_format'])()
+
+        return StreamingHttpResponse(
+            writer.stream(metadata_rows(qs)),
+            content_type=writer.content_type,
+            headers={
+                'Content-Disposition': f'attachment; filename=artworks.{writer.extension}',
+            },
+        )
+
     @extend_schema(
         responses={
             200: inline_serializer(
@@ -360,6 +459,7 @@ class SearchViewSet(viewsets.GenericViewSet):
         },
     )
     @action(detail=False, methods=['GET'])
+    @conditional(static_validator(lambda: FILTERS))
     def filters(self, request, *args, **kwargs):
         """Get available search filters."""
 
@@ -7,10 +7,18 @@ from django.contrib.admin.widgets import get_select2_language
 from django.db import models
 from django.forms import Media, Textarea, TextInput
 from django.urls import path
-from django.utils.html import escape, format_html
+from django.utils.html import escape, format_html, format_html_join
 from django.utils.translation import gettext_lazy as _
 
-from ..models import Artwork, DiscriminatoryTerm, Keyword, Location, Material, Person
+from ..models import (
+    Album,
+    Artwork,
+    DiscriminatoryTerm,
+    Keyword,
+    Location,
+    Material,
+    Person,
+)
 from .filters import (
     ArtistFilter,
     AuthorFilter,
@@ -102,10 +110,11 @@ class ArtworkAdmin(admin.ModelAdmin):
         'credits',
         'credits_link',
         'link',
+        'albums',
         'date_created',
         'date_changed',
     )
-    readonly_fields = ('date_created', 'date_changed', 'thumbnail_image')
+    readonly_fields = ('date_created', 'date_changed', 'thumbnail_image', 'albums')
     autocomplete_fields = ('place_of_production', 'location')
     formfield_overrides = {
         models.CharField: {'widget': TextInput(attrs={'size': '80'})},
@@ -174,6 +183,20 @@ class ArtworkAdmin(admin.ModelAdmin):
     def get_artists(self, obj):
         return format_html('<br>'.join([escape(a.name) for a in obj.artists.all()]))
 
+    @admin.display(description=_('Albums'))
+    def albums(self, obj):
+        albums = (
+            Album.objects.filter(slide_items__artwork=obj)
+            .select_related('user')
+            .distinct()
+            .order_by('title', 'id')
+        )
+        return format_html_join(
+            format_html('<br>'),
+            '{} ({})',
+            ((album.title, album.user.get_full_name()) for album in albums),
+        ) or format_html('none')
+
     def thumbnail_image(self, obj):
         if obj.image_fullsize:
             return format_html(
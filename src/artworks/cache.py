@@ -0,0 +1,85 @@
+from django.core.cache import cache
+
+# cache versions of data, which API responses are derived from. they are
+# used as validators of conditional requests
+
+# changed with every change of persons, keywords, locations, discriminatory
+# terms and texts, which are shown in the metadata of artworks
+METADATA_VERSION = 'metadata'
+# prefix of the versions of single albums and of the folders of single
+# users, see album_version() and folders_version()
+ALBUMS_VERSION = 'albums'
+
+
+def _version_key(name):
+    return f'cache_version:{name}'
+
+
+def get_cache_version(name):
+    """Returns the current version of a named group of cached values.
+
+    Cache keys of derived data include this version, so that all of them
+    can be invalidated at once with bump_cache_version().
+    """
+
+    version = cache.get(_version_key(name))
+    if version is None:
+        # add() does not overwrite a version set concurrently
+        cache.add(_version_key(name), 1, timeout=None)
+        version = cache.get(_version_key(name), 1)
+    return version
+
+
+def bump_cache_version(name):
+    try:
+        return cache.incr(_version_key(name))
+    except ValueError:
+        # the key does not exist (yet)
+        cache.set(_version_key(name), 2, timeout=None)
+        return 2
+
+
+def album_version(album_id):
+    """Returns the name of the cache version of an album, which is changed
+    with every change of the album not incrementing its version, e.g. of
+    its permissions, preview or featured artworks."""
+
+    return f'{ALBUMS_VERSION}:{album_id}'
+
+
+def folders_version(user_id):
+    """Returns the name of the cache version of the folders of a user,
+    which is changed with every change of the folders, or of the albums in
+    them."""
+
+    return f'{ALBUMS_VERSION}:folders:{user_id}'
+
+
+def invalidate_albums(album_ids=(), user_ids=()):
+    """Changes the cache versions of albums and of the folders of users."""
+
+    for album_id in set(album_ids):
+        bump_cache_version(album_version(album_id))
+    for user_id in set(user_ids):
+        bump_cache_version(folders_version(user_id))
+
+
+def album_permission_key(album_id, user_id):
+    """Returns the cache key of the permission of a user for an album,
+    which is shared with them."""
+
+    return f'album_permission:{album_id}:{user_id}'
+
+
+def invalidate_album_permissions(album_id, user_ids):
+    cache.delete_many([album_permission_key(album_id, user_id) for user_id in user_ids])
+
+
+def root_folder_key(user_id):
+    """Returns the cache key of the id of the root folder of a user."""
+
+    return f'root_folder:{user_id}'
+
+
+def invalidate_root_folders(user_ids):
+    cache.delete_many([root_folder_key(user_id) for user_id in user_ids])
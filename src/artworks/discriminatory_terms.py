@@ -0,0 +1,179 @@
+"""Matching of discriminatory terms in texts.
+
+All terms of the DiscriminatoryTerm table are compiled into one Aho-
+Corasick automaton, which finds the non-overlapping, leftmost-longest
+occurrences of terms in a single pass over a text. The automaton is
+kept per process and rebuilt whenever the terms change, which is
+signalled through the 'discriminatory_terms' cache version. The version
+is checked at most every VERSION_CHECK_INTERVAL seconds, so that
+exports do not query the cache for every artwork.
+"""
+
+import time
+from collections import deque
+
+from .cache import get_cache_version
+from .models import DiscriminatoryTerm
+
+CACHE_VERSION_NAME = 'discriminatory_terms'
+# seconds, in which the matcher is used without checking the cache version.
+# matchers missing any of the terms to match are rebuilt immediately
+VERSION_CHECK_INTERVAL = 10
+
+_matcher = None
+
+
+def _normalize(text):
+    # lowercase character by character, so that the indexes of the
+    # normalized text still match the original text
+    return ''.join(lower if len(lower := char.lower()) == 1 else char for char in text)
+
+
+class TermMatcher:
+    """Aho-Corasick automaton matching a set of terms case-insensitively."""
+
+    def __init__(self, terms, version=None):
+        self.version = version
+        # the monotonic time the version was last checked at
+        self.checked = time.monotonic()
+        self.terms = set()
+        # every state is represented by its transitions, its failure link
+        # and the lengths of all terms ending in this state
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for term in terms:
+            if term:
+                self._add(_normalize(term))
+        self._link()
+
+    def _add(self, term):
+        self.terms.add(term)
+        state = 0
+        for char in term:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].append(len(term))
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                # terms ending in the fallback state also end here
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def find(self, text, terms=None):
+        """Returns the (start, end) spans of matched terms in text.
+
+        Overlapping matches are resolved in favour of the leftmost and
+        then the longest term. If terms is given, only occurrences of
+        those terms are matched.
+        """
+
+        if not text:
+            return []
+
+        normalized = _normalize(text)
+        allowed = None if terms is None else {_normalize(t) for t in terms if t}
+        if allowed is not None and not allowed:
+            return []
+
+        # longest match starting at each index
+        longest = {}
+        state = 0
+        for index, char in enumerate(normalized):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length in self._output[state]:
+                start = index - length + 1
+                if allowed is not None and normalized[start : index + 1] not in allowed:
+                    continue
+                if length > longest.get(start, 0):
+                    longest[start] = length
+
+        spans = []
+        end = 0
+        for start in sorted(longest):
+            if start >= end:
+                end = start + longest[start]
+                spans.append((start, end))
+        return spans
+
+    def split(self, text, terms=None):
+        """Splits a text into a list of (segment, is_term) tuples."""
+
+        segments = []
+        index = 0
+        for start, end in self.find(text, terms):
+            if index < start:
+                segments.append((text[index:start], False))
+            segments.append((text[start:end], True))
+            index = end
+        if index < len(text or ''):
+            segments.append((text[index:], False))
+        return segments
+
+
+def get_matcher(terms=None):
+    """Returns the matcher for all discriminatory terms.
+
+    The matcher is rebuilt if the terms changed since it was built, or if
+    any of the given terms is not part of it yet. As only the given terms
+    are matched, a matcher containing removed terms still finds the right
+    ones until it is rebuilt.
+    """
+
+    global _matcher
+
+    missing = _matcher is None or (
+        terms and not {_normalize(t) for t in terms if t} <= _matcher.terms
+    )
+    if not missing and time.monotonic() - _matcher.checked < VERSION_CHECK_INTERVAL:
+        return _matcher
+
+    version = get_cache_version(CACHE_VERSION_NAME)
+    if missing or _matcher.version != version:
+        _matcher = TermMatcher(
+            DiscriminatoryTerm.objects.values_list('term', flat=True),
+            version=version,
+        )
+    _matcher.checked = time.monotonic()
+    return _matcher
+
+
+def split_discriminatory_terms(text, terms):
+    """Splits a text into a list of (segment, is_term) tuples, marking the
+    occurrences of the given discriminatory terms.
+
+    Renderers decide how the matched segments are styled.
+    """
+
+    if not terms:
+        return [(text, False)] if text else []
+    return get_matcher(terms).split(text, terms)
+
+
+def strikethrough(text, terms):
+    """Strikes through all but the first character of each discriminatory
+    term in a plain text, using combining long stroke overlays."""
+
+    return ''.join(
+        segment[0] + ''.join(char + '\u0336' for char in segment[1:])
+        if is_term
+        else segment
+        for segment, is_term in split_discriminatory_terms(text, terms)
+    )
@@ -0,0 +1,37 @@
+"""Album exports.
+
+Every export format is implemented as an Exporter subclass, which is
+registered for its format identifier with the @register decorator. All
+formats render from the same pre-fetched AlbumExport. Bulk exports of
+artwork metadata are streamed by the writers of the metadata module.
+"""
+
+# import the format modules, so that the exporters get registered
+from . import archive, iiif, pdf, powerpoint, slideshow  # noqa: F401
+from .base import (
+    AlbumExport,
+    Exporter,
+    ExportError,
+    get_export_formats,
+    get_exporter,
+    register,
+)
+from .metadata import (
+    album_artworks,
+    get_metadata_formats,
+    get_metadata_writer,
+    metadata_rows,
+)
+
+__all__ = [
+    'AlbumExport',
+    'ExportError',
+    'Exporter',
+    'album_artworks',
+    'get_export_formats',
+    'get_exporter',
+    'get_metadata_formats',
+    'get_metadata_writer',
+    'metadata_rows',
+    'register',
+]
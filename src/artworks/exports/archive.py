@@ -0,0 +1,86 @@
+import csv
+import io
+import zipfile
+
+from django.template.defaultfilters import slugify
+from django.utils.translation import gettext_lazy as _, override
+
+from .base import Exporter, ExportError, register
+
+
+@register
+class ArchiveExporter(Exporter):
+    """Exports an album as zip file containing the full size images and a
+    CSV file with their metadata."""
+
+    format = 'zip'
+    label = _('Images and CSV')
+    content_type = 'application/zip'
+    extension = 'zip'
+
+    columns = (
+        'slide',
+        'position',
+        'file',
+        'id',
+        'title',
+        'title_english',
+        'artists',
+        'date',
+        'material_description',
+        'dimensions_display',
+        'credits',
+        'credits_link',
+        'link',
+        'discriminatory_terms',
+    )
+
+    def write(self, output):
+        metadata = io.StringIO()
+        writer = csv.writer(metadata)
+        writer.writerow(self.columns)
+
+        # zipfile also supports writing to unseekable streams
+        with (
+            override(self.export.language),
+            zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zip_file,
+        ):
+            for slide_number, artworks in enumerate(self.export.slides, start=1):
+                for position, artwork in enumerate(artworks, start=1):
+                    file_name = (
+                        f'{slide_number:03d}-{position}-{slugify(artwork.title)}.jpg'
+                    )
+                    try:
+                        # images are already compressed, so we just store them
+                        zip_file.write(
+                            artwork.image_fullsize.path,
+                            arcname=file_name,
+                            compress_type=zipfile.ZIP_STORED,
+                        )
+                    except (FileNotFoundError, ValueError) as err:
+                        raise ExportError(
+                            _('At least one image file can not be found'),
+                        ) from err
+                    writer.writerow(
+                        self.get_row(slide_number, position, file_name, artwork),
+                    )
+
+            zip_file.writestr('metadata.csv', metadata.getvalue())
+
+    def get_row(self, slide_number, position, file_name, artwork):
+        return (
+            slide_number,
+            position,
+            file_name,
+            artwork.pk,
+            artwork.title,
+            artwork.title_english,
+            ', '.join(artist.name for artist in artwork.artists.all()),
+            artwork.date,
+            artwork.material_description_localized,
+            artwork.dimensions_display,
+            artwork.credits,
+            artwork.credits_link,
+            artwork.link,
+            ', '.join(self.export.get_discriminatory_terms(artwork)),
+        )
@@ -0,0 +1,213 @@
+import logging
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import urljoin
+
+from sorl.thumbnail import get_thumbnail
+
+from django.conf import settings
+from django.template.defaultfilters import slugify
+from django.utils.translation import gettext_lazy as _
+
+from ..discriminatory_terms import split_discriminatory_terms
+from ..models import Album, Artwork
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class ExportError(Exception):
+    pass
+
+
+def register(exporter_class):
+    """Class decorator registering an Exporter for its format."""
+
+    _registry[exporter_class.format] = exporter_class
+    return exporter_class
+
+
+def get_exporter(export_format):
+    try:
+        return _registry[export_format]
+    except KeyError as ke:
+        raise ExportError(_('Invalid format')) from ke
+
+
+def get_export_formats():
+    return list(_registry)
+
+
+class AlbumExport:
+    """Pre-fetched representation of an album shared by all export formats.
+
+    All published artworks of the album are loaded in a single query
+    (with their relations prefetched), and thumbnails are memoized, so
+    that several formats can be rendered from one instance without
+    querying or thumbnailing again.
+    """
+
+    def __init__(self, album: Album, language='en', request=None):
+        self.album = album
+        self.language = language
+        self.request = request
+
+        artwork_ids = [
+            item.get('id') for slide in album.slides for item in slide['items']
+        ]
+        qs = (
+            Artwork.objects.filter(id__in=artwork_ids, published=True)
+            .select_related('location')
+            .prefetch_related(
+                'artists',
+                'photographers',
+                'authors',
+                'graphic_designers',
+                'discriminatory_terms',
+                'keywords',
+                'materials',
+                'place_of_production',
+            )
+        )
+        self.artworks = {artwork.pk: artwork for artwork in qs}
+
+        # TODO: for now we just drop artworks which do not exist any more from the slides
+        #   in a future feature we need to discuss whether there should be some information left, that there was
+        #   an artwork but got deleted, and whether we should retain some artwork title in that case, or just
+        #   display a blank). technically, we could add an Album.repair_slides() method which handles this
+        self.slides = []
+        for slide in album.slides:
+            artworks = [
+                self.artworks[item.get('id')]
+                for item in slide['items']
+                if item.get('id') in self.artworks
+            ]
+            if artworks:
+                self.slides.append(artworks)
+
+        self._thumbnails = {}
+
+    @classmethod
+    def from_album_id(cls, album_id, language='en', request=None):
+        try:
+            album = Album.objects.get(id=album_id)
+        except Album.DoesNotExist as dne:
+            logger.warning('Could not export album. Album missing.')
+            raise ExportError(_('Album does not exist')) from dne
+        return cls(album, language=language, request=request)
+
+    @property
+    def title(self):
+        return self.album.title
+
+    def absolute_url(self, url):
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return urljoin(settings.SITE_URL, url)
+
+    def get_discriminatory_terms(self, artwork):
+        # we iterate over discriminatory_terms directly instead of using
+        # artwork.get_discriminatory_terms_list() to ensure that we are
+        # using the results already fetched with prefetch_related()
+        return [dt.term for dt in artwork.discriminatory_terms.all()]
+
+    def get_description_segments(self, artwork):
+        return split_discriminatory_terms(
+            artwork.get_short_description(self.language),
+            self.get_discriminatory_terms(artwork),
+        )
+
+    def thumbnail(self, artwork, geometry):
+        """Returns the path of a (memoized) thumbnail of an artwork."""
+
+        key = (artwork.pk, geometry)
+        if key not in self._thumbnails:
+            try:
+                thumb = get_thumbnail(artwork.image_fullsize, geometry)
+            except FileNotFoundError as fnfe:
+                raise ExportError(
+                    _('At least one image file can not be found'),
+                ) from fnfe
+            self._thumbnails[key] = Path(settings.MEDIA_ROOT) / thumb.name
+        return self._thumbnails[key]
+
+
+class Exporter:
+    """Base class for album export formats.
+
+    Subclasses render an AlbumExport into a binary stream by
+    implementing write(). They should write incrementally, so that the
+    caller decides whether the output is kept in memory, spooled to disk
+    or streamed.
+    """
+
+    format = None
+    label = None
+    content_type = 'application/octet-stream'
+    extension = None
+
+    def __init__(self, export: AlbumExport):
+        self.export = export
+        self.stats = {}
+
+    @property
+    def filename(self):
+        return f'{slugify(self.export.title)}.{self.extension}'
+
+    def write(self, output):
+        raise NotImplementedError
+
+    def render(self):
+        """Renders the export into a temporary file and returns it.
+
+        The file is kept in memory up to EXPORT_SPOOL_MAX_SIZE bytes and
+        spooled to disk beyond that. The caller is responsible for closing
+        it. The duration, output size and (if EXPORT_TRACE_MEMORY is set,
+        or tracemalloc is already tracing) the peak memory allocated
+        during the export are logged and kept in self.stats.
+        """
+
+        # the file is returned open, therefore no context manager is used
+        output = tempfile.SpooledTemporaryFile(  # noqa: SIM115
+            max_size=settings.EXPORT_SPOOL_MAX_SIZE,
+        )
+
+        start_tracing = settings.EXPORT_TRACE_MEMORY and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        elif tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        try:
+            self.write(output)
+        except BaseException:
+            output.close()
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            peak_memory = (
+                tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+            )
+            if start_tracing:
+                tracemalloc.stop()
+
+        self.stats = {
+            'duration': duration,
+            'size': output.tell(),
+            'peak_memory': peak_memory,
+        }
+        logger.info(
+            'Exported album %s as %s: %d bytes in %.3fs, peak memory %s bytes',
+            self.export.album.pk,
+            self.format,
+            self.stats['size'],
+            duration,
+            peak_memory if peak_memory is not None else 'n/a',
+        )
+
+        output.seek(0)
+        return output
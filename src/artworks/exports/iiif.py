@@ -0,0 +1,140 @@
+import json
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _, override
+
+from .base import Exporter, ExportError, register
+
+IIIF_CONTEXT = 'http://iiif.io/api/presentation/3/context.json'
+
+
+@register
+class IIIFManifestExporter(Exporter):
+    """Exports an album as IIIF Presentation API 3.0 manifest, with one
+    canvas per artwork."""
+
+    format = 'iiif'
+    label = 'IIIF Manifest'
+    content_type = f'application/ld+json;profile="{IIIF_CONTEXT}"'
+    extension = 'json'
+
+    def write(self, output):
+        with override(self.export.language):
+            manifest = self.get_manifest()
+        output.write(json.dumps(manifest, ensure_ascii=False).encode())
+
+    def get_manifest(self):
+        # exports are also rendered in background jobs, without a request
+        download_url = self.export.absolute_url(
+            reverse(
+                'album-download',
+                kwargs={
+                    'pk': self.export.album.pk,
+                    'version': settings.REST_FRAMEWORK['DEFAULT_VERSION'],
+                },
+            ),
+        )
+        manifest_id = f'{download_url}?download_format={self.format}'
+        # the ids of canvases and ranges are paths below the download url,
+        # without its query string
+        base_url = download_url.rstrip('/')
+        manifest = {
+            '@context': IIIF_CONTEXT,
+            'id': manifest_id,
+            'type': 'Manifest',
+            'label': self.language_map(self.export.title),
+            'items': [],
+            'structures': [],
+        }
+
+        for slide_number, artworks in enumerate(self.export.slides, start=1):
+            canvas_ids = []
+            for artwork in artworks:
+                canvas = self.get_canvas(base_url, artwork)
+                canvas_ids.append({'id': canvas['id'], 'type': 'Canvas'})
+                manifest['items'].append(canvas)
+
+            # slides are represented as ranges, to preserve pairs of artworks
+            manifest['structures'].append(
+                {
+                    'id': f'{base_url}/range/{slide_number}',
+                    'type': 'Range',
+                    'label': self.language_map(str(slide_number)),
+                    'items': canvas_ids,
+                },
+            )
+
+        return manifest
+
+    def language_map(self, value):
+        return {self.export.language: [value]}
+
+    def get_canvas(self, base_url, artwork):
+        try:
+            width = artwork.image_fullsize.width
+            height = artwork.image_fullsize.height
+        except (FileNotFoundError, ValueError) as err:
+            raise ExportError(
+                _('At least one image file can not be found'),
+            ) from err
+
+        canvas_id = f'{base_url}/canvas/{artwork.pk}'
+        canvas = {
+            'id': canvas_id,
+            'type': 'Canvas',
+            'label': self.language_map(artwork.title),
+            'width': width,
+            'height': height,
+            'items': [
+                {
+                    'id': f'{canvas_id}/page',
+                    'type': 'AnnotationPage',
+                    'items': [
+                        {
+                            'id': f'{canvas_id}/page/image',
+                            'type': 'Annotation',
+                            'motivation': 'painting',
+                            'target': canvas_id,
+                            'body': {
+                                'id': self.export.absolute_url(
+                                    artwork.image_fullsize.url,
+                                ),
+                                'type': 'Image',
+                                'format': 'image/jpeg',
+                                'width': width,
+                                'height': height,
+                            },
+                        },
+                    ],
+                },
+            ],
+            'metadata': [
+                {
+                    'label': self.language_map(str(label)),
+                    'value': self.language_map(value),
+                }
+                for label, value in (
+                    (
+                        artwork._meta.get_field('artists').verbose_name,
+                        ', '.join(artist.name for artist in artwork.artists.all()),
+                    ),
+                    (artwork._meta.get_field('date').verbose_name, artwork.date),
+                    (
+                        artwork._meta.get_field('dimensions_display').verbose_name,
+                        artwork.dimensions_display,
+                    ),
+                )
+                if value
+            ],
+        }
+
+        if artwork.credits:
+            canvas['requiredStatement'] = {
+                'label': self.language_map(
+                    str(artwork._meta.get_field('credits').verbose_name),
+                ),
+                'value': self.language_map(artwork.credits),
+            }
+
+        return canvas
@@ -0,0 +1,73 @@
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+from .base import AlbumExport, get_exporter
+
+
+def export_storage():
+    """Returns the storage of exports created in background jobs.
+
+    The exports are stored outside of MEDIA_ROOT, as they are only served
+    to users who have access to the album.
+    """
+
+    return FileSystemStorage(location=settings.EXPORT_ROOT, base_url=None)
+
+
+def delete_old_exports():
+    """Deletes the exports older than EXPORT_FILE_TTL seconds, together
+    with their folders, and returns their number."""
+
+    limit = time.time() - settings.EXPORT_FILE_TTL
+    deleted = 0
+    # the exports are stored as <album id>/<random folder>/<filename>
+    for path in Path(settings.EXPORT_ROOT).glob('*/*/*'):
+        try:
+            if path.stat().st_mtime >= limit:
+                continue
+            path.unlink()
+        except FileNotFoundError:
+            # deleted concurrently
+            continue
+        deleted += 1
+        for folder in (path.parent, path.parent.parent):
+            try:
+                folder.rmdir()
+            except OSError:
+                # the folder is not empty
+                break
+    return deleted
+
+
+def export_album(album_id, export_format, language):
+    """Renders an album export in a background job and stores it.
+
+    Exports older than EXPORT_FILE_TTL seconds are deleted by every job,
+    and by the management command delete_old_exports.
+
+    :returns: a dict with the storage name, filename and content type of
+        the export
+    """
+
+    delete_old_exports()
+
+    exporter = get_exporter(export_format)(
+        AlbumExport.from_album_id(album_id, language=language),
+    )
+
+    with exporter.render() as output:
+        name = export_storage().save(
+            f'{album_id}/{uuid.uuid4().hex}/{exporter.filename}',
+            File(output),
+        )
+
+    return {
+        'name': name,
+        'filename': exporter.filename,
+        'content_type': exporter.content_type,
+    }
@@ -0,0 +1,191 @@
+"""Bulk export of artwork metadata.
+
+Artworks are read with a server-side cursor in chunks of
+METADATA_EXPORT_CHUNK_SIZE rows, and their relations are prefetched per
+chunk, so the memory used by an export does not grow with the number
+of exported artworks. The rows are encoded on the fly and yielded in
+buffers, which can be passed to a StreamingHttpResponse or written to a
+file.
+"""
+
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.db.models import Case, When
+from django.utils.translation import gettext_lazy as _
+
+from ..models import Artwork
+from .base import ExportError
+
+METADATA_FIELDS = (
+    'id',
+    'title',
+    'title_english',
+    'artists',
+    'photographers',
+    'authors',
+    'graphic_designers',
+    'date',
+    'date_year_from',
+    'date_year_to',
+    'material_description',
+    'dimensions_display',
+    'keywords',
+    'location',
+    'place_of_production',
+    'credits',
+    'credits_link',
+    'link',
+    'discriminatory_terms',
+)
+
+_writers = {}
+
+
+def album_artworks(album):
+    """Returns the published artworks of an album in the order of the
+    slides, each artwork only once."""
+
+    # dict.fromkeys() removes duplicates, but preserves the order
+    artwork_ids = list(
+        dict.fromkeys(item['id'] for slide in album.slides for item in slide['items']),
+    )
+    return Artwork.objects.filter(id__in=artwork_ids, published=True).order_by(
+        Case(
+            *[When(id=artwork_id, then=i) for i, artwork_id in enumerate(artwork_ids)],
+        ),
+    )
+
+
+def metadata_rows(queryset, chunk_size=None):
+    """Yields the metadata of all artworks of a queryset as dicts."""
+
+    queryset = queryset.select_related('location').prefetch_related(
+        'artists',
+        'photographers',
+        'authors',
+        'graphic_designers',
+        'discriminatory_terms',
+        'keywords',
+        'place_of_production',
+    )
+
+    # with a chunk size, iterator() applies the prefetches per chunk
+    for artwork in queryset.iterator(
+        chunk_size=chunk_size or settings.METADATA_EXPORT_CHUNK_SIZE,
+    ):
+        yield {
+            'id': artwork.pk,
+            'title': artwork.title,
+            'title_english': artwork.title_english,
+            'artists': [p.name for p in artwork.artists.all()],
+            'photographers': [p.name for p in artwork.photographers.all()],
+            'authors': [p.name for p in artwork.authors.all()],
+            'graphic_designers': [p.name for p in artwork.graphic_designers.all()],
+            'date': artwork.date,
+            'date_year_from': artwork.date_year_from,
+            'date_year_to': artwork.date_year_to,
+            'material_description': artwork.material_description_localized,
+            'dimensions_display': artwork.dimensions_display,
+            'keywords': [k.name_localized for k in artwork.keywords.all()],
+            'location': artwork.location.name_localized if artwork.location else None,
+            'place_of_production': [
+                p.name_localized for p in artwork.place_of_production.all()
+            ],
+            'credits': artwork.credits,
+            'credits_link': artwork.credits_link,
+            'link': artwork.link,
+            'discriminatory_terms': [
+                dt.term for dt in artwork.discriminatory_terms.all()
+            ],
+        }
+
+
+def register_metadata_writer(writer_class):
+    """Class decorator registering a MetadataWriter for its format."""
+
+    _writers[writer_class.format] = writer_class
+    return writer_class
+
+
+def get_metadata_writer(export_format):
+    try:
+        return _writers[export_format]
+    except KeyError as ke:
+        raise ExportError(_('Invalid format')) from ke
+
+
+def get_metadata_formats():
+    return list(_writers)
+
+
+class MetadataWriter:
+    """Base class for metadata export formats.
+
+    Subclasses encode single rows by implementing encode_row(). Encoded
+    rows are collected into buffers of about buffer_size bytes, to avoid
+    yielding tiny chunks to the response.
+    """
+
+    format = None
+    content_type = 'application/octet-stream'
+    extension = None
+    buffer_size = 64 * 1024
+
+    def header(self):
+        return ''
+
+    def encode_row(self, row):
+        raise NotImplementedError
+
+    def stream(self, rows):
+        buffer = [self.header()]
+        size = len(buffer[0])
+        for row in rows:
+            line = self.encode_row(row)
+            buffer.append(line)
+            size += len(line)
+            if size >= self.buffer_size:
+                yield ''.join(buffer).encode()
+                buffer = []
+                size = 0
+        if buffer:
+            yield ''.join(buffer).encode()
+
+
+@register_metadata_writer
+class CSVMetadataWriter(MetadataWriter):
+    format = 'csv'
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def __init__(self):
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line)
+
+    def _encode(self, values):
+        self._line.seek(0)
+        self._line.truncate()
+        self._writer.writerow(values)
+        return self._line.getvalue()
+
+    def header(self):
+        return self._encode(METADATA_FIELDS)
+
+    def encode_row(self, row):
+        return self._encode(
+            ', '.join(value) if isinstance(value, list) else value
+            for value in (row[field] for field in METADATA_FIELDS)
+        )
+
+
+@register_metadata_writer
+class JSONLinesMetadataWriter(MetadataWriter):
+    format = 'jsonl'
+    content_type = 'application/jsonl; charset=utf-8'
+    extension = 'jsonl'
+
+    def encode_row(self, row):
+        return json.dumps(row, ensure_ascii=False) + '\n'
@@ -0,0 +1,55 @@
+import tempfile
+
+import requests
+
+from django.conf import settings
+from django.template.defaultfilters import slugify
+from django.utils.translation import gettext_lazy as _
+
+from .base import ExportError, register
+from .powerpoint import PowerPointExporter
+
+
+@register
+class PdfExporter(PowerPointExporter):
+    """Exports an album as PDF by converting the PowerPoint export via
+    Gotenberg."""
+
+    format = 'pdf'
+    label = 'PDF'
+    content_type = 'application/pdf'
+    extension = 'pdf'
+
+    def write(self, output):
+        with tempfile.SpooledTemporaryFile(
+            max_size=settings.EXPORT_SPOOL_MAX_SIZE,
+        ) as pptx:
+            super().write(pptx)
+            pptx.seek(0)
+            self.convert(pptx, output)
+
+    def convert(self, pptx, output):
+        # convert pptx to pdf via Gotenberg
+        try:
+            r = requests.post(
+                settings.GOTENBERG_API_URL,
+                timeout=settings.REQUESTS_TIMEOUT,
+                files={
+                    (
+                        'files',
+                        (
+                            f'{slugify(self.export.title)}.{PowerPointExporter.extension}',
+                            pptx,
+                            PowerPointExporter.content_type,
+                        ),
+                    ),
+                },
+                stream=True,
+            )
+            r.raise_for_status()
+        except requests.RequestException as err:
+            raise ExportError(_('PDF conversion failed')) from err
+
+        with r:
+            for chunk in r.iter_content(chunk_size=64 * 1024):
+                output.write(chunk)
@@ -0,0 +1,202 @@
+from pathlib import Path
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_THEME_COLOR
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.enum.text import MSO_ANCHOR
+from pptx.util import Pt
+
+from django.utils.translation import gettext_lazy as _
+
+from .base import Exporter, ExportError, register
+
+
+@register
+class PowerPointExporter(Exporter):
+    """Exports an album as PowerPoint presentation with one or two artworks
+    per slide."""
+
+    format = 'pptx'
+    label = 'PowerPoint'
+    content_type = (
+        'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+    )
+    extension = 'pptx'
+
+    # taken from Keynote 16:9 pptx
+    slide_width = 24384000
+    slide_height = 13716000
+
+    thumbnail_size_single = '1880x933'  # 1920-20-20 = 1880
+    thumbnail_size_double = '920x933'  # (1920/2)-20-20 = 920
+
+    def __init__(self, export):
+        super().__init__(export)
+
+        self.padding = int(self.slide_width / 96)  # full HD: 1920px/96 = 20px
+        self.textbox_height = self.slide_height / 10
+        self.picture_max_height = int(
+            self.slide_height - (self.padding * 2) - self.textbox_height,
+        )
+        self.distance_between = self.padding * 2
+
+    def write(self, output):
+        for artworks in self.export.slides:
+            if len(artworks) > 2:
+                raise ExportError(
+                    _('Album contains slides with more than 2 artworks'),
+                )
+
+        # define the presentation dimensions
+        self.prs = Presentation()
+        self.prs.slide_width = self.slide_width
+        self.prs.slide_height = self.slide_height
+
+        for artworks in self.export.slides:
+            try:
+                self.add_slide(artworks)
+            except FileNotFoundError as fnfe:
+                raise ExportError(
+                    _('At least one image file can not be found'),
+                ) from fnfe
+
+        self.prs.save(output)
+
+    @staticmethod
+    def add_run_to_paragraph(paragraph, text, style=None):
+        run = paragraph.add_run()
+        run.text = text
+        font = run.font
+        font.size = Pt(36)
+        font.color.theme_color = MSO_THEME_COLOR.TEXT_1
+        if style == 'strikethrough':
+            font._element.attrib['strike'] = 'sngStrike'
+            font._element.attrib['baseline'] = '-25000'
+
+    def get_new_slide(self):
+        blank_slide_layout = self.prs.slide_layouts[6]
+        slide = self.prs.slides.add_slide(blank_slide_layout)
+        fill = slide.background.fill
+        fill.solid()
+        fill.fore_color.rgb = RGBColor(217, 217, 217)
+        return slide
+
+    def add_description(self, slide, artwork, width, left):
+        shapes = slide.shapes
+        top = self.slide_height - self.textbox_height - self.padding
+        shape = shapes.add_shape(
+            MSO_SHAPE.RECTANGLE,
+            left,
+            top,
+            width,
+            self.textbox_height,
+        )
+        shape.fill.background()
+        shape.line.fill.background()
+        text_frame = shape.text_frame
+        text_frame.vertical_anchor = MSO_ANCHOR.BOTTOM
+        text_frame.word_wrap = True
+        p = text_frame.paragraphs[0]
+
+        # apply discriminatory terms styling: while a regexp based approach could
+        # be desirable, we still need to build the whole paragraph with runs
+        for segment, is_term in self.export.get_description_segments(artwork):
+            if is_term:
+                # the first letter of the found term stays in normal style,
+                # 'strikethrough' is applied to the rest of the term
+                self.add_run_to_paragraph(p, segment[0])
+                self.add_run_to_paragraph(p, segment[1:], style='strikethrough')
+            else:
+                self.add_run_to_paragraph(p, segment)
+
+    def add_picture_to_slide(self, slide, img_path: Path, position):
+        padding = self.padding
+        picture_max_height = self.picture_max_height
+
+        pic = slide.shapes.add_picture(img_path.as_posix(), 0, padding)
+        image_width = pic.image.size[0]
+        image_height = pic.image.size[1]
+        aspect_ratio = image_width / image_height
+
+        # calculate width and height
+        if position == 'center':
+            picture_max_width = int(self.slide_width - (padding * 2))
+        else:
+            picture_max_width = int(
+                (self.slide_width - (padding * 2) - self.distance_between) / 2,
+            )
+        space_aspect_ratio = picture_max_width / picture_max_height
+
+        if aspect_ratio < space_aspect_ratio:
+            pic.height = picture_max_height
+            pic.width = int(picture_max_height * aspect_ratio)
+        else:
+            pic.width = picture_max_width
+            pic.height = int(picture_max_width / aspect_ratio)
+            pic.top = padding + int((picture_max_height - pic.height) / 2)
+
+        # position the image center/left/right
+        match position:
+            case 'center':
+                pic.left = int((self.slide_width - pic.width) / 2)
+            case 'left':
+                if image_height < image_width:
+                    pic.left = int(padding)
+                else:
+                    pic.left = padding + int((picture_max_width - pic.width) / 2)
+            case 'right':
+                if image_height < image_width:
+                    pic.left = padding + picture_max_width + self.distance_between
+                else:
+                    pic.left = (
+                        padding
+                        + picture_max_width
+                        + self.distance_between
+                        + int((picture_max_width - pic.width) / 2)
+                    )
+
+    def add_slide(self, artworks: list):
+        padding = self.padding
+
+        # slide with one image
+        if len(artworks) == 1:
+            artwork = artworks[0]
+            img_path = self.export.thumbnail(artwork, self.thumbnail_size_single)
+
+            slide = self.get_new_slide()
+
+            self.add_picture_to_slide(slide, img_path, 'center')
+
+            text_width = self.slide_width - (padding * 2)
+
+            self.add_description(slide, artwork, text_width, padding)
+
+        # slide with two images
+        elif len(artworks) == 2:
+            artwork_left = artworks[0]
+            artwork_right = artworks[1]
+
+            img_path_left = self.export.thumbnail(
+                artwork_left,
+                self.thumbnail_size_double,
+            )
+            img_path_right = self.export.thumbnail(
+                artwork_right,
+                self.thumbnail_size_double,
+            )
+
+            slide = self.get_new_slide()
+
+            self.add_picture_to_slide(slide, img_path_left, 'left')
+            self.add_picture_to_slide(slide, img_path_right, 'right')
+
+            text_width = int(
+                (self.slide_width - (padding * 2) - self.distance_between) / 2,
+            )
+
+            self.add_description(slide, artwork_left, text_width, padding)
+
+            left = padding + text_width + self.distance_between
+
+            self.add_description(slide, artwork_right, text_width, left)
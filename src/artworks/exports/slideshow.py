@@ -0,0 +1,90 @@
+import base64
+
+from django.utils.html import escape
+
+from .base import Exporter, register
+
+STYLE = """
+body { margin: 0; background: #d9d9d9; font-family: sans-serif; }
+.slide { display: none; box-sizing: border-box; height: 100vh; padding: 1vw;
+  flex-direction: column; }
+.slide.active { display: flex; }
+.images { flex: 1; display: flex; gap: 2vw; min-height: 0; }
+figure { flex: 1; display: flex; flex-direction: column; margin: 0; min-width: 0; }
+figure img { flex: 1; min-height: 0; object-fit: contain; width: 100%; }
+figcaption { font-size: 1.4vw; padding-top: 1vw; }
+.term span { text-decoration: line-through; }
+"""
+
+SCRIPT = """
+var slides = document.querySelectorAll('.slide'), current = 0;
+function show(index) {
+  slides[current].classList.remove('active');
+  current = Math.max(0, Math.min(slides.length - 1, index));
+  slides[current].classList.add('active');
+}
+document.addEventListener('keydown', function (e) {
+  if (['ArrowRight', 'PageDown', ' '].includes(e.key)) show(current + 1);
+  if (['ArrowLeft', 'PageUp'].includes(e.key)) show(current - 1);
+});
+document.addEventListener('click', function () { show(current + 1); });
+if (slides.length) slides[0].classList.add('active');
+"""
+
+
+@register
+class SlideshowExporter(Exporter):
+    """Exports an album as a self-contained HTML slideshow with embedded
+    images."""
+
+    format = 'html'
+    label = 'HTML'
+    content_type = 'text/html; charset=utf-8'
+    extension = 'html'
+
+    thumbnail_size = '1880x933'
+
+    def write(self, output):
+        title = escape(self.export.title)
+        output.write(
+            (
+                '<!DOCTYPE html>\n'
+                f'<html lang="{self.export.language}">\n<head>\n'
+                '<meta charset="utf-8">\n'
+                f'<title>{title}</title>\n'
+                f'<style>{STYLE}</style>\n'
+                '</head>\n<body>\n'
+            ).encode(),
+        )
+
+        for artworks in self.export.slides:
+            output.write(b'<section class="slide"><div class="images">')
+            for artwork in artworks:
+                self.write_figure(output, artwork)
+            output.write(b'</div></section>\n')
+
+        output.write(f'<script>{SCRIPT}</script>\n</body>\n</html>\n'.encode())
+
+    def write_figure(self, output, artwork):
+        img_path = self.export.thumbnail(artwork, self.thumbnail_size)
+        output.write(b'<figure><img alt="" src="data:image/jpeg;base64,')
+        with img_path.open('rb') as f:
+            # chunk size has to be a multiple of 3 to be encoded without padding
+            while chunk := f.read(3 * 64 * 1024):
+                output.write(base64.b64encode(chunk))
+        output.write(b'"><figcaption>')
+        output.write(self.render_description(artwork).encode())
+        output.write(b'</figcaption></figure>')
+
+    def render_description(self, artwork):
+        html = []
+        for segment, is_term in self.export.get_description_segments(artwork):
+            if is_term:
+                # the first letter of the found term stays in normal style
+                html.append(
+                    f'<span class="term">{escape(segment[0])}'
+                    f'<span>{escape(segment[1:])}</span></span>',
+                )
+            else:
+                html.append(escape(segment))
+        return ''.join(html)
@@ -0,0 +1,88 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from artworks.exports import (
+    AlbumExport,
+    ExportError,
+    get_export_formats,
+    get_exporter,
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure the duration and output size of album export formats.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('album_id', type=str)
+        parser.add_argument(
+            '-f',
+            '--format',
+            action='append',
+            dest='formats',
+            choices=get_export_formats(),
+            help='Export format to benchmark (can be used multiple times, defaults to all formats).',
+        )
+        parser.add_argument('-l', '--language', default='de', choices=['de', 'en'])
+        parser.add_argument(
+            '-r',
+            '--repeat',
+            type=int,
+            default=1,
+            help='Number of runs per format.',
+        )
+        parser.add_argument(
+            '-m',
+            '--trace-memory',
+            action='store_true',
+            help='Trace the peak memory allocated by each run (slows down the export).',
+        )
+
+    def handle(self, *args, **options):
+        formats = options['formats'] or get_export_formats()
+
+        if options['trace_memory']:
+            tracemalloc.start()
+
+        try:
+            start = time.perf_counter()
+            export = AlbumExport.from_album_id(
+                options['album_id'],
+                language=options['language'],
+            )
+            duration = time.perf_counter() - start
+        except ExportError as ee:
+            raise CommandError(str(ee)) from ee
+
+        self.stdout.write(
+            f'prefetch: {duration:.3f}s ({len(export.artworks)} artworks, {len(export.slides)} slides)',
+        )
+
+        for export_format in formats:
+            exporter = get_exporter(export_format)(export)
+            for run in range(1, options['repeat'] + 1):
+                try:
+                    output = exporter.render()
+                except ExportError as ee:
+                    self.stdout.write(
+                        self.style.ERROR(f'{export_format}: {ee}'),
+                    )
+                    break
+                output.close()
+
+                stats = exporter.stats
+                peak_memory = (
+                    f', peak memory {stats["peak_memory"]} bytes'
+                    if stats['peak_memory'] is not None
+                    else ''
+                )
+                self.stdout.write(
+                    f'{export_format} (run {run}): {stats["duration"]:.3f}s, '
+                    f'{stats["size"]} bytes{peak_memory}',
+                )
+
+        if options['trace_memory']:
+            tracemalloc.stop()
+
+        self.stdout.write(self.style.SUCCESS('DONE'))
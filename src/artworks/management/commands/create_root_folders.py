@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from artworks.models import Folder
+
+
+class Command(BaseCommand):
+    help = 'Create the root folders of all users who do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b',
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=1000,
+            help='Number of users whose root folders are created at once.',
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(
+            ~Exists(Folder.objects.filter(owner=OuterRef('pk'), parent=None)),
+        )
+
+        created = 0
+        while batch := list(users[: options['batch_size']]):
+            with transaction.atomic():
+                Folder.provision_root_folders(batch)
+            created += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Created {created} root folders'))
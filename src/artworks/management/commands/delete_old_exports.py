@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from artworks.exports.jobs import delete_old_exports
+
+
+class Command(BaseCommand):
+    help = 'Delete the album exports of background jobs older than EXPORT_FILE_TTL'
+
+    def handle(self, *args, **options):
+        deleted = delete_old_exports()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} exports'))
@@ -0,0 +1,552 @@
+import random
+import uuid
+from itertools import accumulate
+
+import shortuuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from artworks.cache import METADATA_VERSION, bump_cache_version, invalidate_albums
+from artworks.models import (
+    Album,
+    AlbumSlideItem,
+    Artwork,
+    Folder,
+    FolderAlbumRelation,
+    Keyword,
+    Location,
+    Material,
+    PermissionsRelation,
+    Person,
+)
+
+FIRST_NAMES = [
+    'Anna',
+    'Berta',
+    'Clara',
+    'Emil',
+    'Franz',
+    'Greta',
+    'Hans',
+    'Ida',
+    'Josef',
+    'Karl',
+    'Lotte',
+    'Max',
+    'Olga',
+    'Paul',
+    'Rosa',
+    'Viktor',
+]
+LAST_NAMES = [
+    'Adler',
+    'Berger',
+    'Fischer',
+    'Gruber',
+    'Hofer',
+    'Huber',
+    'Koller',
+    'Lang',
+    'Moser',
+    'Pichler',
+    'Steiner',
+    'Wagner',
+    'Weber',
+    'Winkler',
+]
+TITLE_WORDS = [
+    'Abend',
+    'Bildnis',
+    'Brücke',
+    'Entwurf',
+    'Fassade',
+    'Garten',
+    'Haus',
+    'Komposition',
+    'Landschaft',
+    'Modell',
+    'Plakat',
+    'Raum',
+    'Stadt',
+    'Stillleben',
+    'Studie',
+    'Turm',
+]
+KEYWORD_WORDS = [
+    'Architektur',
+    'Design',
+    'Fotografie',
+    'Grafik',
+    'Malerei',
+    'Mode',
+    'Skulptur',
+    'Typografie',
+]
+LOCATION_WORDS = [
+    'Berlin',
+    'Graz',
+    'Linz',
+    'München',
+    'Paris',
+    'Prag',
+    'Wien',
+    'Zürich',
+]
+MATERIALS = [
+    ('Aquarell', 'Watercolour'),
+    ('Bleistift', 'Pencil'),
+    ('Holz', 'Wood'),
+    ('Leinwand', 'Canvas'),
+    ('Öl', 'Oil'),
+    ('Papier', 'Paper'),
+    ('Silbergelatine', 'Gelatin silver'),
+    ('Stahl', 'Steel'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a deterministic synthetic collection of artworks, persons, '
+        'keywords, locations, users and albums for benchmarks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-a',
+            '--artworks',
+            type=int,
+            default=1000,
+            help='Number of artworks.',
+        )
+        parser.add_argument(
+            '-p',
+            '--persons',
+            type=int,
+            help='Number of persons (defaults to a tenth of the artworks).',
+        )
+        parser.add_argument(
+            '-u',
+            '--users',
+            type=int,
+            default=20,
+            help='Number of users owning and sharing the albums.',
+        )
+        parser.add_argument(
+            '--albums',
+            type=int,
+            help='Number of albums (defaults to a twentieth of the artworks).',
+        )
+        parser.add_argument(
+            '--slides',
+            type=int,
+            default=40,
+            help='Maximum number of slides per album.',
+        )
+        parser.add_argument(
+            '--depth',
+            type=int,
+            default=3,
+            help='Depth of the keyword and location trees.',
+        )
+        parser.add_argument(
+            '--branching',
+            type=int,
+            default=4,
+            help='Number of children of each keyword and location.',
+        )
+        parser.add_argument(
+            '--shared',
+            type=float,
+            default=0.3,
+            help='Share of the albums shared with other users.',
+        )
+        parser.add_argument(
+            '-s',
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the generated data.',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='synthetic',
+            help='Prefix of the names of the generated objects, used to clear them.',
+        )
+        parser.add_argument(
+            '-c',
+            '--clear',
+            action='store_true',
+            help='Delete previously generated objects with the same prefix first.',
+        )
+        parser.add_argument(
+            '-b',
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=1000,
+            help='Number of rows inserted at once.',
+        )
+
+    def handle(self, *args, **options):
+        if options['artworks'] < 1 or options['users'] < 1:
+            raise CommandError('At least one artwork and one user are required.')
+        if options['depth'] < 1 or options['branching'] < 1:
+            raise CommandError('The depth and branching of the trees must be positive.')
+
+        self.rng = random.Random(options['seed'])  # noqa: S311 - we don't use this for cryptographic purposes
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+
+        if options['clear']:
+            self.clear()
+        elif (
+            get_user_model()
+            .objects.filter(username__startswith=f'{self.prefix}-')
+            .exists()
+        ):
+            raise CommandError(
+                f'A collection with the prefix {self.prefix} exists already, use --clear to replace it.',
+            )
+
+        with transaction.atomic():
+            persons = self.create_persons(
+                options['persons'] or max(options['artworks'] // 10, 1),
+            )
+            keywords = self.create_tree(
+                Keyword,
+                KEYWORD_WORDS,
+                options['depth'],
+                options['branching'],
+            )
+            locations = self.create_tree(
+                Location,
+                LOCATION_WORDS,
+                options['depth'],
+                options['branching'],
+            )
+            materials = Material.objects.bulk_create(
+                [
+                    Material(name=f'{self.prefix} {name}', name_en=name_en)
+                    for name, name_en in MATERIALS
+                ],
+            )
+            artworks = self.create_artworks(
+                options['artworks'],
+                persons,
+                keywords,
+                locations,
+                materials,
+            )
+            users = self.create_users(options['users'])
+            albums = self.create_albums(
+                options['albums'] or max(options['artworks'] // 20, 1),
+                options['slides'],
+                users,
+                artworks,
+            )
+            shared = self.share_albums(albums, users, options['shared'])
+
+        bump_cache_version(METADATA_VERSION)
+        # the ids are deterministic, so replaced albums get the same ids
+        invalidate_albums(
+            [album.pk for album in albums],
+            [user.pk for user in users],
+        )
+
+        self.stdout.write(
+            f'{len(artworks)} artworks, {len(persons)} persons, '
+            f'{len(keywords)} keywords, {len(locations)} locations, '
+            f'{len(users)} users, {len(albums)} albums, {shared} shares',
+        )
+        self.stdout.write(self.style.SUCCESS('DONE'))
+
+    def uuid(self):
+        """Returns a short UUID derived from the seed."""
+
+        return shortuuid.encode(uuid.UUID(int=self.rng.getrandbits(128)))
+
+    def clear(self):
+        # the albums, folders and permissions are deleted with their users
+        get_user_model().objects.filter(username__startswith=f'{self.prefix}-').delete()
+        Artwork.objects.filter(title__startswith=f'{self.prefix} ').delete()
+        Person.objects.filter(name__startswith=f'{self.prefix} ').delete()
+        Material.objects.filter(name__startswith=f'{self.prefix} ').delete()
+        # the descendants are deleted with the root nodes
+        Keyword.objects.filter(
+            name__startswith=f'{self.prefix} ',
+            parent=None,
+        ).delete()
+        Location.objects.filter(
+            name__startswith=f'{self.prefix} ',
+            parent=None,
+        ).delete()
+
+    def create_persons(self, count):
+        return Person.objects.bulk_create(
+            [
+                Person(
+                    name=f'{self.prefix} {self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {i}',
+                )
+                for i in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def create_tree(self, model, words, depth, branching):
+        """Creates trees of model with a root for each of words, and returns
+        the leaves."""
+
+        nodes = [None]
+        for level in range(depth):
+            parents = nodes
+            nodes = []
+            for parent in parents:
+                children = words if parent is None else range(1, branching + 1)
+                for child in children:
+                    name = (
+                        f'{self.prefix} {child}'
+                        if parent is None
+                        else f'{parent.name}.{child}'
+                    )
+                    # the tree fields are set by rebuild() below
+                    nodes.append(
+                        model(
+                            name=name,
+                            name_en=name,
+                            parent=parent,
+                            lft=0,
+                            rght=0,
+                            tree_id=0,
+                            level=level,
+                        ),
+                    )
+            model.objects.bulk_create(nodes, batch_size=self.batch_size)
+
+        # bulk_create() does not maintain the tree
+        model.objects.rebuild()
+        return nodes
+
+    def create_artworks(self, count, persons, keywords, locations, materials):
+        # a few persons, keywords and locations are used much more often
+        # than the others, like in a real collection
+        persons_weights = list(accumulate(1 / (i + 1) for i in range(len(persons))))
+        keywords_weights = list(accumulate(1 / (i + 1) for i in range(len(keywords))))
+        locations_weights = list(
+            accumulate(1 / (i + 1) for i in range(len(locations))),
+        )
+
+        artworks = []
+        relations = {
+            'artists': [],
+            'photographers': [],
+            'keywords': [],
+            'materials': [],
+            'place_of_production': [],
+        }
+        for i in range(count):
+            year = self.rng.randint(1450, 2020)
+            year_to = year + self.rng.choice([0, 0, 0, 1, 5, 10])
+            width = self.rng.randint(10, 200)
+            height = self.rng.randint(10, 200)
+            artwork = Artwork(
+                id=self.uuid(),
+                title=f'{self.prefix} {self.rng.choice(TITLE_WORDS)} {self.rng.choice(TITLE_WORDS)} {i}',
+                date=str(year) if year == year_to else f'{year}-{year_to}',
+                date_year_from=year,
+                date_year_to=year_to,
+                width=width,
+                height=height,
+                dimensions_display=f'{height} x {width} cm',
+                published=self.rng.random() < 0.9,
+                location=(
+                    self.rng.choices(locations, cum_weights=locations_weights)[0]
+                    if self.rng.random() < 0.5
+                    else None
+                ),
+            )
+            artwork.checked = artwork.published
+
+            artwork_relations = {
+                'artists': set(
+                    self.rng.choices(
+                        persons,
+                        cum_weights=persons_weights,
+                        k=self.rng.randint(1, 2),
+                    ),
+                ),
+                'photographers': set(
+                    self.rng.choices(
+                        persons,
+                        cum_weights=persons_weights,
+                        k=self.rng.randint(0, 1),
+                    ),
+                ),
+                'keywords': set(
+                    self.rng.choices(
+                        keywords,
+                        cum_weights=keywords_weights,
+                        k=self.rng.randint(1, 4),
+                    ),
+                ),
+                'materials': set(
+                    self.rng.sample(materials, k=self.rng.randint(1, 2)),
+                ),
+                'place_of_production': set(
+                    self.rng.choices(
+                        locations,
+                        cum_weights=locations_weights,
+                        k=self.rng.randint(0, 1),
+                    ),
+                ),
+            }
+            for field, related in artwork_relations.items():
+                relations[field].extend((artwork, obj) for obj in related)
+
+            # the search fields of update_search_vector(), the keywords and
+            # locations are leaves without descendants
+            artwork.search_persons = ' '.join(
+                person.name
+                for person in artwork_relations['artists']
+                | artwork_relations['photographers']
+            )
+            artwork.search_keywords = ' '.join(
+                name
+                for keyword in artwork_relations['keywords']
+                for name in (keyword.name, keyword.name_en)
+            )
+            artwork.search_locations = ' '.join(
+                name
+                for location in artwork_relations['place_of_production']
+                | ({artwork.location} if artwork.location else set())
+                for name in (location.name, location.name_en)
+            )
+            artwork.search_materials = ' '.join(
+                name
+                for material in artwork_relations['materials']
+                for name in (material.name, material.name_en)
+            )
+            artworks.append(artwork)
+
+        Artwork.objects.bulk_create(artworks, batch_size=self.batch_size)
+        for field, pairs in relations.items():
+            m2m_field = Artwork._meta.get_field(field)
+            through = m2m_field.remote_field.through
+            source = m2m_field.m2m_column_name()
+            target = m2m_field.m2m_reverse_name()
+            through.objects.bulk_create(
+                [
+                    through(**{source: artwork.pk, target: obj.pk})
+                    for artwork, obj in pairs
+                ],
+                batch_size=self.batch_size,
+            )
+
+        Artwork.objects.filter(title__startswith=f'{self.prefix} ').update(
+            search_vector=Artwork.search_vector_expression(),
+        )
+        return artworks
+
+    def create_users(self, count):
+        users = []
+        for i in range(count):
+            user = get_user_model()(
+                username=f'{self.prefix}-{i:04d}',
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                email=f'{self.prefix}-{i:04d}@example.org',
+                tos_accepted=True,
+            )
+            user.set_unusable_password()
+            users.append(user)
+        return get_user_model().objects.bulk_create(users)
+
+    def create_albums(self, count, max_slides, users, artworks):
+        published_ids = {artwork.pk for artwork in artworks if artwork.published}
+
+        albums = []
+        slide_items = []
+        for i in range(count):
+            user = self.rng.choice(users)
+            slides = [
+                {
+                    'id': self.uuid(),
+                    'items': [
+                        {'id': self.rng.choice(artworks).pk}
+                        for _ in range(1 if self.rng.random() < 0.8 else 2)
+                    ],
+                }
+                for _ in range(self.rng.randint(1, max_slides))
+            ]
+            number_of_artworks, featured_artwork_ids = Album.slides_summary(
+                slides,
+                published_ids,
+            )
+            album = Album(
+                id=self.uuid(),
+                title=f'{self.prefix} {self.rng.choice(TITLE_WORDS)} {i}',
+                user=user,
+                last_changed_by=user,
+                slides=slides,
+                number_of_artworks=number_of_artworks,
+                featured_artwork_ids=featured_artwork_ids,
+            )
+            albums.append(album)
+            slide_items.extend(
+                AlbumSlideItem(
+                    album=album,
+                    artwork_id=item['id'],
+                    slide_position=slide_position,
+                    item_position=item_position,
+                )
+                for slide_position, slide in enumerate(slides)
+                for item_position, item in enumerate(slide['items'])
+            )
+
+        Album.objects.bulk_create(albums, batch_size=self.batch_size)
+        AlbumSlideItem.objects.bulk_create(slide_items, batch_size=self.batch_size)
+        # adds the albums to the root folders of their owners
+        Folder.provision_root_folders(users)
+        return albums
+
+    def share_albums(self, albums, users, share):
+        if len(users) < 2:
+            return 0
+
+        root_folders = Folder.provision_root_folders(users)
+        permissions = []
+        for album in albums:
+            if self.rng.random() >= share:
+                continue
+            others = [user for user in users if user.pk != album.user_id]
+            permissions.extend(
+                PermissionsRelation(
+                    album=album,
+                    user=user,
+                    permissions=self.rng.choice(settings.PERMISSIONS),
+                )
+                for user in self.rng.sample(
+                    others,
+                    k=self.rng.randint(1, min(3, len(others))),
+                )
+            )
+
+        PermissionsRelation.objects.bulk_create(
+            permissions,
+            batch_size=self.batch_size,
+        )
+        # albums shared with users are added to their root folders
+        FolderAlbumRelation.objects.bulk_create(
+            [
+                FolderAlbumRelation(
+                    album=permission.album,
+                    user=permission.user,
+                    folder_id=root_folders[permission.user.pk],
+                )
+                for permission in permissions
+            ],
+            batch_size=self.batch_size,
+        )
+        return len(permissions)
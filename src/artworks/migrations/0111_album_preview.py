@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:12
+
+import artworks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0110_alter_discriminatoryterm_term'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='preview',
+            field=models.ImageField(blank=True, editable=False, max_length=255, upload_to=artworks.models.get_path_to_album_preview, verbose_name='Preview'),
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='preview_key',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_slide_items(apps, schema_editor):
+    Album = apps.get_model('artworks', 'Album')
+    AlbumSlideItem = apps.get_model('artworks', 'AlbumSlideItem')
+    Artwork = apps.get_model('artworks', 'Artwork')
+
+    artwork_ids = set(Artwork.objects.values_list('id', flat=True))
+
+    for album in Album.objects.only('id', 'slides').iterator():
+        AlbumSlideItem.objects.bulk_create(
+            [
+                AlbumSlideItem(
+                    album_id=album.id,
+                    artwork_id=item.get('id'),
+                    slide_position=slide_position,
+                    item_position=item_position,
+                )
+                for slide_position, slide in enumerate(album.slides)
+                for item_position, item in enumerate(slide['items'])
+                if item.get('id') in artwork_ids
+            ],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0111_album_preview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlbumSlideItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slide_position', models.PositiveIntegerField()),
+                ('item_position', models.PositiveIntegerField()),
+                ('album', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slide_items', to='artworks.album')),
+                ('artwork', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='album_slide_items', to='artworks.artwork')),
+            ],
+            options={
+                'ordering': ['album', 'slide_position', 'item_position'],
+                'indexes': [models.Index(fields=['album', 'slide_position', 'item_position'], name='artworks_al_album_i_270b0c_idx')],
+            },
+        ),
+        migrations.RunPython(
+            code=create_slide_items,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def update_slides_summaries(apps, schema_editor):
+    Album = apps.get_model('artworks', 'Album')
+    Artwork = apps.get_model('artworks', 'Artwork')
+
+    published_ids = set(
+        Artwork.objects.filter(published=True).values_list('id', flat=True),
+    )
+
+    albums = []
+    for album in Album.objects.only('id', 'slides').iterator():
+        artwork_ids = dict.fromkeys(
+            item.get('id') for slide in album.slides for item in slide['items']
+        )
+        album.number_of_artworks = sum(len(slide['items']) for slide in album.slides)
+        album.featured_artwork_ids = [pk for pk in artwork_ids if pk in published_ids][
+            : settings.ALBUM_FEATURED_ARTWORKS
+        ]
+        albums.append(album)
+
+    Album.objects.bulk_update(
+        albums,
+        ['number_of_artworks', 'featured_artwork_ids'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0112_albumslideitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='featured_artwork_ids',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='album',
+            name='number_of_artworks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(update_slides_summaries, migrations.RunPython.noop),
+    ]
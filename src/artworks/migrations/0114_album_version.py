@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0113_album_number_of_artworks_album_featured_artwork_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='album',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
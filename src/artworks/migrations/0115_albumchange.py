@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('artworks', '0114_album_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlbumChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('date', models.DateTimeField(auto_now_add=True)),
+                ('operations', models.JSONField(default=list)),
+                ('album', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='artworks.album')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='album_changes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['album', 'version'],
+                'unique_together': {('album', 'version')},
+            },
+        ),
+    ]
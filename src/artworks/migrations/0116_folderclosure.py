@@ -0,0 +1,58 @@
+# Generated by Django 4.2.16 on 2026-10-18 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_folder_closure(apps, schema_editor):
+    Folder = apps.get_model('artworks', 'Folder')
+    FolderClosure = apps.get_model('artworks', 'FolderClosure')
+
+    parents = dict(Folder.objects.values_list('id', 'parent_id'))
+
+    links = []
+    for folder_id in parents:
+        ancestor_id = folder_id
+        depth = 0
+        # protect against cycles in existing data
+        visited = set()
+        while ancestor_id is not None and ancestor_id not in visited:
+            visited.add(ancestor_id)
+            links.append(
+                FolderClosure(
+                    ancestor_id=ancestor_id,
+                    descendant_id=folder_id,
+                    depth=depth,
+                ),
+            )
+            ancestor_id = parents.get(ancestor_id)
+            depth += 1
+
+    FolderClosure.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0115_albumchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FolderClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='artworks.folder')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='artworks.folder')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='artworks_fo_descend_221a7f_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunPython(
+            code=create_folder_closure,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
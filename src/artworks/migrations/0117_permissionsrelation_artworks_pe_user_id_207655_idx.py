@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0116_folderclosure'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='permissionsrelation',
+            index=models.Index(fields=['user', 'permissions', 'album'], name='artworks_pe_user_id_207655_idx'),
+        ),
+    ]
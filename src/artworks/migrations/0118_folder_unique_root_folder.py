@@ -0,0 +1,54 @@
+# Generated by Django 4.2.16 on 2026-10-19 10:40
+
+from django.db import migrations, models
+
+
+def merge_root_folders(apps, schema_editor):
+    """Merges additional root folders of users into their first one, as
+    every user may only have one root folder."""
+
+    Folder = apps.get_model('artworks', 'Folder')
+    FolderAlbumRelation = apps.get_model('artworks', 'FolderAlbumRelation')
+    FolderClosure = apps.get_model('artworks', 'FolderClosure')
+
+    # the cached ids of the merged root folders are removed after the
+    # migrations, see artworks.signals.invalidate_deleted_root_folders()
+    root_folders = {}
+    for folder in Folder.objects.filter(parent=None).order_by('date_created', 'id'):
+        root_folder_id = root_folders.setdefault(folder.owner_id, folder.id)
+        if root_folder_id == folder.id:
+            continue
+
+        # albums already in the first root folder are not added twice
+        relations = FolderAlbumRelation.objects.filter(folder_id=folder.id)
+        relations.filter(
+            album_id__in=FolderAlbumRelation.objects.filter(
+                folder_id=root_folder_id,
+            ).values('album_id'),
+        ).delete()
+        relations.update(folder_id=root_folder_id)
+
+        # the subfolders keep their depths, as both folders are roots
+        Folder.objects.filter(parent_id=folder.id).update(parent_id=root_folder_id)
+        FolderClosure.objects.filter(ancestor_id=folder.id, depth__gt=0).update(
+            ancestor_id=root_folder_id,
+        )
+        Folder.objects.filter(id=folder.id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0117_permissionsrelation_artworks_pe_user_id_207655_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=merge_root_folders,
+            reverse_code=migrations.RunPython.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='folder',
+            constraint=models.UniqueConstraint(condition=models.Q(('parent', None)), fields=('owner',), name='unique_root_folder'),
+        ),
+    ]
@@ -1,27 +1,33 @@
 import hashlib
 import logging
+import operator
 import re
+from collections import defaultdict
+from functools import reduce
 from pathlib import Path
 
+import shortuuid
 from base_common.fields import ShortUUIDField
 from base_common.models import AbstractBaseModel
 from django_jsonform.models.fields import ArrayField
 from mptt.models import MPTTModel, TreeForeignKey
-from sorl.thumbnail import delete
+from sorl.thumbnail import delete, get_thumbnail
 from wand.color import Color
 from wand.image import Image
 
 from django.conf import settings
 from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
-from django.db import models
+from django.db import models, transaction
 from django.db.models import JSONField
 from django.db.models.functions import Length, Upper
 from django.urls import reverse
 from django.utils.http import urlsafe_base64_encode
 from django.utils.translation import gettext_lazy as _
 
+from .cache import invalidate_albums, root_folder_key
 from .fetch import fetch_getty_data, fetch_wikidata
 from .fetch.exceptions import DataNotFoundError, HTTPError, RequestError
 from .gnd import (
@@ -689,6 +695,28 @@ class Artwork(AbstractBaseModel, LocalizationMixin):
             for location in self.place_of_production.all()
         ]
 
+    @staticmethod
+    def search_vector_expression():
+        """Returns the expression of the search vector, computed from the
+        fields of the artwork and the search fields filled by
+        update_search_vector()."""
+
+        return (
+            SearchVector('title', weight='A')
+            + SearchVector('title_english', weight='A')
+            + SearchVector('search_persons', weight='A')
+            + SearchVector('comments_de', weight='B', config='german')
+            + SearchVector('comments_en', weight='B', config='english')
+            + SearchVector('search_keywords', weight='B')
+            + SearchVector('search_locations', weight='B')
+            + SearchVector('credits', weight='C')
+            + SearchVector('credits_link', weight='C')
+            + SearchVector('search_materials', weight='C')
+            + SearchVector('dimensions_display', weight='C')
+            + SearchVector('link', weight='C')
+            + SearchVector('date', weight='C')
+        )
+
     def update_search_vector(self):
         # Update search fields
         # persons
@@ -751,28 +779,12 @@ class Artwork(AbstractBaseModel, LocalizationMixin):
         if self.material_description_en:
             materials.append(self.material_description_en)
 
-        search_vector = (
-            SearchVector('title', weight='A')
-            + SearchVector('title_english', weight='A')
-            + SearchVector('search_persons', weight='A')
-            + SearchVector('comments_de', weight='B', config='german')
-            + SearchVector('comments_en', weight='B', config='english')
-            + SearchVector('search_keywords', weight='B')
-            + SearchVector('search_locations', weight='B')
-            + SearchVector('credits', weight='C')
-            + SearchVector('credits_link', weight='C')
-            + SearchVector('search_materials', weight='C')
-            + SearchVector('dimensions_display', weight='C')
-            + SearchVector('link', weight='C')
-            + SearchVector('date', weight='C')
-        )
-
         Artwork.objects.filter(pk=self.pk).update(
             search_persons=' '.join(persons),
             search_locations=' '.join(locations),
             search_keywords=' '.join(keywords),
             search_materials=' '.join(materials),
-            search_vector=search_vector,
+            search_vector=Artwork.search_vector_expression(),
         )
 
     def create_image_fullsize(self, save=True):
@@ -838,6 +850,10 @@ class Artwork(AbstractBaseModel, LocalizationMixin):
                 self.save(update_fields=['image_original'])
 
 
+def get_path_to_album_preview(instance, filename):
+    return f'albums/preview/{instance.pk}/{filename}'
+
+
 class Album(AbstractBaseModel):
     """Specific users can create their own collections of artworks."""
 
@@ -864,18 +880,457 @@ class Album(AbstractBaseModel):
         on_delete=models.CASCADE,
         null=True,
     )
+    preview = models.ImageField(
+        verbose_name=_('Preview'),
+        max_length=255,
+        null=False,
+        blank=True,
+        upload_to=get_path_to_album_preview,
+        editable=False,
+    )
+    # identifies the artworks and images the current preview was rendered from
+    preview_key = models.CharField(max_length=32, blank=True, editable=False)
+    # denormalized from the slides by update_slides_summary(), so that
+    # listings do not need to load and walk the slides of every album
+    number_of_artworks = models.PositiveIntegerField(default=0, editable=False)
+    featured_artwork_ids = JSONField(default=list, editable=False)
+    # incremented with every change of the album
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f'{self.title} by {self.user.get_full_name()}'
 
     def size(self):
-        return sum([len(slide['items']) for slide in self.slides])
+        return self.number_of_artworks
+
+    @staticmethod
+    def slides_artwork_ids(slides):
+        """Returns the ids of the artworks in slides without duplicates, in
+        the order of the slides."""
+
+        # dict.fromkeys() removes duplicates, but preserves the order
+        return list(
+            dict.fromkeys(
+                item.get('id') for slide in slides for item in slide['items']
+            ),
+        )
+
+    @staticmethod
+    def slides_summary(slides, published_ids):
+        """Returns the number of artworks and the ids of the featured
+        artworks of slides, given the ids of the published artworks."""
+
+        return (
+            sum(len(slide['items']) for slide in slides),
+            [pk for pk in Album.slides_artwork_ids(slides) if pk in published_ids][
+                : settings.ALBUM_FEATURED_ARTWORKS
+            ],
+        )
+
+    def update_slides_summary(self):
+        """Updates the number of artworks and the ids of the featured
+        artworks, i.e. the first published artworks in the order of the
+        slides."""
+
+        published_ids = set(
+            Artwork.objects.filter(
+                id__in=self.slides_artwork_ids(self.slides),
+                published=True,
+            ).values_list('id', flat=True),
+        )
+
+        summary = (self.number_of_artworks, self.featured_artwork_ids)
+        self.number_of_artworks, self.featured_artwork_ids = self.slides_summary(
+            self.slides,
+            published_ids,
+        )
+        if summary == (self.number_of_artworks, self.featured_artwork_ids):
+            return
+
+        # we do not use save() here, to neither change date_changed nor
+        # trigger the post_save signals of the album again
+        Album.objects.filter(pk=self.pk).update(
+            number_of_artworks=self.number_of_artworks,
+            featured_artwork_ids=self.featured_artwork_ids,
+        )
+        Album.invalidate_versions([self.pk])
+
+    @staticmethod
+    def invalidate_versions(album_ids):
+        """Changes the cache versions of albums and of the folders of all
+        users who have them in their folders, after changes which do not
+        increment the versions of the albums."""
+
+        invalidate_albums(
+            album_ids,
+            FolderAlbumRelation.objects.filter(album__in=album_ids).values_list(
+                'user_id',
+                flat=True,
+            ),
+        )
+
+    def sync_slide_items(self, old_slides=None):
+        """Updates the AlbumSlideItem rows of the album from its slides.
+
+        The rows of the slides are matched by the ids of the slides in
+        old_slides, i.e. the slides the rows were created from, so that
+        inserting, removing or moving slides only writes the rows of the
+        changed slides, and shifts the positions of the other rows with a
+        single UPDATE. Without old_slides, the rows are matched by their
+        positions.
+        """
+
+        artwork_ids = {
+            item.get('id') for slide in self.slides for item in slide['items']
+        }
+        existing_ids = set(
+            Artwork.objects.filter(id__in=artwork_ids).values_list('id', flat=True),
+        )
+        old_positions = {
+            slide.get('id'): slide_position
+            for slide_position, slide in enumerate(old_slides or [])
+        }
+
+        rows = defaultdict(dict)
+        for slide_item in AlbumSlideItem.objects.filter(album=self).order_by():
+            rows[slide_item.slide_position][slide_item.item_position] = slide_item
+
+        # [first old position, last old position, shift] of consecutive
+        # slides, whose rows are kept and shifted by the same number
+        shifts = []
+        to_delete = []
+        to_update = []
+        to_create = []
+        for slide_position, slide in enumerate(self.slides):
+            if old_slides is None:
+                old_position = slide_position
+            else:
+                old_position = old_positions.get(slide.get('id'))
+            items = rows.pop(old_position, {})
+
+            kept = False
+            for item_position, item in enumerate(slide['items']):
+                artwork_id = item.get('id')
+                if artwork_id not in existing_ids:
+                    continue
+                slide_item = items.pop(item_position, None)
+                if slide_item is None:
+                    to_create.append(
+                        AlbumSlideItem(
+                            album=self,
+                            artwork_id=artwork_id,
+                            slide_position=slide_position,
+                            item_position=item_position,
+                        ),
+                    )
+                elif artwork_id != slide_item.artwork_id:
+                    slide_item.artwork_id = artwork_id
+                    slide_item.slide_position = slide_position
+                    to_update.append(slide_item)
+                else:
+                    kept = True
+
+            # the remaining rows of the slide are of removed items
+            to_delete.extend(slide_item.pk for slide_item in items.values())
+
+            if kept and slide_position != old_position:
+                shift = slide_position - old_position
+                if shifts and shifts[-1][1:] == [old_position - 1, shift]:
+                    shifts[-1][1] = old_position
+                else:
+                    shifts.append([old_position, old_position, shift])
+
+        # the rows of removed slides
+        to_delete.extend(
+            slide_item.pk for items in rows.values() for slide_item in items.values()
+        )
+
+        with transaction.atomic():
+            if to_delete:
+                AlbumSlideItem.objects.filter(pk__in=to_delete).delete()
+            if shifts:
+                # the rows of all shifted slides are updated at once, as the
+                # ranges of the shifts may overlap with their results
+                AlbumSlideItem.objects.filter(
+                    reduce(
+                        operator.or_,
+                        (
+                            models.Q(slide_position__range=(first, last))
+                            for first, last, _shift in shifts
+                        ),
+                    ),
+                    album=self,
+                ).update(
+                    slide_position=models.Case(
+                        *(
+                            models.When(
+                                slide_position__range=(first, last),
+                                then=models.F('slide_position') + shift,
+                            )
+                            for first, last, shift in shifts
+                        ),
+                        default=models.F('slide_position'),
+                    ),
+                )
+            if to_update:
+                AlbumSlideItem.objects.bulk_update(
+                    to_update,
+                    ['artwork', 'slide_position'],
+                )
+            if to_create:
+                AlbumSlideItem.objects.bulk_create(to_create)
+
+    @staticmethod
+    def create_from_albums(user, copies):
+        """Creates albums of a user from the slides of other albums, with a
+        fixed number of queries, independent of the number of albums.
+
+        The albums are created with bulk_create(), so neither save() is
+        called nor are signals sent. The version, summary and slide items
+        are therefore set here directly, previews are not created.
+
+        :param user: the owner of the new albums
+        :param copies: a list of (title, albums) tuples, one per new album.
+            the slides of the albums are concatenated in the given order
+        :returns: the created albums
+        """
+
+        albums = [
+            Album(
+                title=title,
+                user=user,
+                last_changed_by=user,
+                # slide ids have to be unique within an album, which would
+                # not be the case when merging copies of the same album
+                slides=[
+                    {'id': shortuuid.uuid(), 'items': slide['items']}
+                    for source in sources
+                    for slide in source.slides
+                ],
+                version=1,
+            )
+            for title, sources in copies
+        ]
+
+        published_ids = set(
+            Artwork.objects.filter(
+                id__in={
+                    pk
+                    for album in albums
+                    for pk in Album.slides_artwork_ids(album.slides)
+                },
+                published=True,
+            ).values_list('id', flat=True),
+        )
+        for album in albums:
+            album.number_of_artworks, album.featured_artwork_ids = Album.slides_summary(
+                album.slides,
+                published_ids,
+            )
+
+        slide_items = defaultdict(list)
+        for slide_item in AlbumSlideItem.objects.filter(
+            album__in={source.pk for _title, sources in copies for source in sources},
+        ).order_by():
+            slide_items[slide_item.album_id].append(slide_item)
+
+        with transaction.atomic():
+            Album.objects.bulk_create(albums)
+
+            new_slide_items = []
+            for album, (_title, sources) in zip(albums, copies, strict=True):
+                # the positions of the slides of later albums are shifted by
+                # the number of slides before them
+                offset = 0
+                for source in sources:
+                    new_slide_items.extend(
+                        AlbumSlideItem(
+                            album=album,
+                            artwork_id=slide_item.artwork_id,
+                            slide_position=offset + slide_item.slide_position,
+                            item_position=slide_item.item_position,
+                        )
+                        for slide_item in slide_items[source.pk]
+                    )
+                    offset += len(source.slides)
+            AlbumSlideItem.objects.bulk_create(new_slide_items)
+
+        return albums
+
+    def record_change(self, user, operations):
+        """Stores a change of the album with its current version."""
+
+        AlbumChange.objects.create(
+            album=self,
+            version=self.version,
+            user=user,
+            operations=operations,
+        )
+        AlbumChange.objects.filter(
+            album=self,
+            version__lte=self.version - settings.ALBUM_CHANGES_MAX,
+        ).delete()
+
+    def get_preview_artworks(self):
+        """Returns the first published artworks with an image, in the order
+        of the slides."""
+
+        artwork_ids = self.slides_artwork_ids(self.slides)
+
+        artworks = (
+            Artwork.objects.filter(id__in=artwork_ids, published=True)
+            .exclude(image_fullsize='')
+            .in_bulk()
+        )
+        return [artworks[pk] for pk in artwork_ids if pk in artworks][
+            : settings.ALBUM_PREVIEW_ARTWORKS
+        ]
+
+    @staticmethod
+    def get_preview_key(artworks):
+        if not artworks:
+            return ''
+        return hashlib.blake2s(
+            ' '.join(f'{a.pk}:{a.image_fullsize.name}' for a in artworks).encode(),
+            digest_size=16,
+        ).hexdigest()
+
+    @staticmethod
+    def render_preview(artworks):
+        """Renders a contact sheet of the given artworks as JPEG.
+
+        The artworks are arranged in a square grid with up to two columns
+        and rows, each one cropped to fill its cell. The (cached)
+        thumbnails are used instead of the full size images.
+        """
+
+        size = settings.ALBUM_PREVIEW_SIZE
+        columns = 1 if len(artworks) == 1 else 2
+        rows = 1 if len(artworks) <= 2 else 2
+        width = size // columns
+        height = size // rows
+
+        with Image(width=size, height=size, background=Color('white')) as canvas:
+            for index, artwork in enumerate(artworks):
+                thumbnail = get_thumbnail(
+                    artwork.image_fullsize,
+                    f'{width}x{height}',
+                    crop='center',
+                )
+                with Image(blob=thumbnail.read()) as img:
+                    # thumbnails of small images are not upscaled
+                    if img.width < width or img.height < height:
+                        img.transform(resize=f'{width}x{height}^')
+                        img.crop(width=width, height=height, gravity='center')
+                    canvas.composite(
+                        img,
+                        left=(index % columns) * width,
+                        top=(index // columns) * height,
+                    )
+
+            canvas.format = 'jpeg'
+            canvas.compression_quality = settings.IM_COMPRESSION_QUALITY
+            return canvas.make_blob()
+
+    def update_preview(self, force=False):
+        """(Re)creates the preview, if the artworks or images it is rendered
+        from changed.
+
+        :returns: whether the preview has been updated
+        """
+
+        artworks = self.get_preview_artworks()
+        preview_key = self.get_preview_key(artworks)
+
+        if preview_key == self.preview_key and not force:
+            return False
+
+        if self.preview:
+            self.preview.delete(save=False)
+
+        if artworks:
+            self.preview.save(
+                f'{preview_key}.jpg',
+                ContentFile(self.render_preview(artworks)),
+                save=False,
+            )
+        self.preview_key = preview_key
+
+        # we do not use save() here, to neither change date_changed nor
+        # trigger the post_save signals of the album again
+        Album.objects.filter(pk=self.pk).update(
+            preview=self.preview.name or '',
+            preview_key=self.preview_key,
+        )
+        Album.invalidate_versions([self.pk])
+        return True
 
     class Meta:
         verbose_name = _('Album')
         verbose_name_plural = _('Albums')
 
 
+class AlbumSlideItem(models.Model):
+    """Normalized representation of the items in Album.slides.
+
+    The rows are updated from the slides whenever an album is saved, and
+    allow indexed lookups of the albums containing an artwork. Items of
+    artworks which do not exist (any more) are not represented here.
+    """
+
+    album = models.ForeignKey(
+        Album,
+        related_name='slide_items',
+        on_delete=models.CASCADE,
+    )
+    artwork = models.ForeignKey(
+        Artwork,
+        related_name='album_slide_items',
+        on_delete=models.CASCADE,
+    )
+    slide_position = models.PositiveIntegerField()
+    item_position = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['album', 'slide_position', 'item_position']
+        indexes = [
+            models.Index(fields=['album', 'slide_position', 'item_position']),
+        ]
+
+    def __str__(self):
+        return f'{self.album_id} [{self.slide_position}, {self.item_position}]: {self.artwork_id}'
+
+
+class AlbumChange(models.Model):
+    """A change of an album, stored so that clients can fetch the changes
+    since the version they know instead of the whole album.
+
+    Only the latest ALBUM_CHANGES_MAX changes of each album are kept.
+    """
+
+    album = models.ForeignKey(
+        Album,
+        related_name='changes',
+        on_delete=models.CASCADE,
+    )
+    version = models.PositiveIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='album_changes',
+        on_delete=models.SET_NULL,
+        null=True,
+    )
+    date = models.DateTimeField(auto_now_add=True)
+    operations = JSONField(default=list)
+
+    class Meta:
+        ordering = ['album', 'version']
+        unique_together = ['album', 'version']
+
+    def __str__(self):
+        return f'{self.album_id} v{self.version}'
+
+
 def get_default_permissions():
     return settings.DEFAULT_PERMISSIONS[0]
 
@@ -897,6 +1352,10 @@ class PermissionsRelation(models.Model):
 
     class Meta:
         unique_together = ['album', 'user']
+        indexes = [
+            # the albums shared with a user, see filter_albums_for_user()
+            models.Index(fields=['user', 'permissions', 'album']),
+        ]
 
     def __str__(self):
         return f'{self.user.get_full_name()} <-- {self.get_permissions_display()} --> {self.album.title}'
@@ -932,6 +1391,17 @@ class Folder(AbstractBaseModel):
         null=True,
     )
 
+    class Meta(AbstractBaseModel.Meta):
+        constraints = [
+            # every user has at most one root folder, also if it is
+            # provisioned by concurrent requests
+            models.UniqueConstraint(
+                fields=['owner'],
+                condition=models.Q(parent=None),
+                name='unique_root_folder',
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -939,18 +1409,184 @@ class Folder(AbstractBaseModel):
     def is_root(self):
         return self.parent is None
 
+    def subtree(self):
+        """Returns the ids of the folder and all its descendants."""
+
+        return FolderClosure.objects.filter(ancestor=self).values('descendant')
+
+    def is_ancestor_of(self, folder):
+        return FolderClosure.objects.filter(ancestor=self, descendant=folder).exists()
+
+    def ancestors(self):
+        """Returns the ancestors of the folder, starting with the root."""
+
+        return Folder.objects.filter(
+            descendant_links__descendant=self,
+            descendant_links__depth__gt=0,
+        ).order_by('-descendant_links__depth')
+
+    def insert_closure(self):
+        """Creates the FolderClosure rows of a new folder."""
+
+        links = [FolderClosure(ancestor=self, descendant=self, depth=0)]
+        if self.parent_id:
+            links.extend(
+                FolderClosure(
+                    ancestor_id=link.ancestor_id,
+                    descendant=self,
+                    depth=link.depth + 1,
+                )
+                for link in FolderClosure.objects.filter(descendant_id=self.parent_id)
+            )
+        FolderClosure.objects.bulk_create(links)
+
+    def move_closure(self):
+        """Updates the FolderClosure rows after the parent of the folder
+        changed, for the folder and all its descendants."""
+
+        with transaction.atomic():
+            subtree = list(FolderClosure.objects.filter(ancestor=self))
+            # remove the links of the subtree to the former ancestors
+            FolderClosure.objects.filter(
+                descendant__in=[link.descendant_id for link in subtree],
+            ).exclude(ancestor__in=[link.descendant_id for link in subtree]).delete()
+            if self.parent_id:
+                FolderClosure.objects.bulk_create(
+                    [
+                        FolderClosure(
+                            ancestor_id=ancestor.ancestor_id,
+                            descendant_id=link.descendant_id,
+                            depth=ancestor.depth + link.depth + 1,
+                        )
+                        for ancestor in FolderClosure.objects.filter(
+                            descendant_id=self.parent_id,
+                        )
+                        for link in subtree
+                    ],
+                )
+
+    @staticmethod
+    def provision_root_folders(users):
+        """Creates the root folders of users who do not have one yet, and
+        adds all albums of those users to them.
+
+        Returns the ids of the root folders of all users by the ids of
+        their owners.
+        """
+
+        users = list(users)
+        root_folders = Folder.objects.filter(owner__in=users, parent=None)
+        folder_ids = dict(root_folders.values_list('owner_id', 'id'))
+        if all(user.pk in folder_ids for user in users):
+            return folder_ids
+
+        # the root folders of the same users might be created concurrently,
+        # in which case the unique constraint only keeps the first one. the
+        # ids are therefore selected again, and only the folders actually
+        # created here are linked to the albums of their owners
+        folders = Folder.objects.bulk_create(
+            [
+                Folder(title=f'{user.username}-root', owner=user)
+                for user in users
+                if user.pk not in folder_ids
+            ],
+            ignore_conflicts=True,
+        )
+        folder_ids = dict(root_folders.values_list('owner_id', 'id'))
+        folders = [
+            folder for folder in folders if folder_ids.get(folder.owner_id) == folder.pk
+        ]
+        if not folders:
+            return folder_ids
+
+        # bulk_create() does not send the signals maintaining the closure
+        FolderClosure.objects.bulk_create(
+            [
+                FolderClosure(ancestor=folder, descendant=folder, depth=0)
+                for folder in folders
+            ],
+        )
+        FolderAlbumRelation.objects.bulk_create(
+            [
+                FolderAlbumRelation(
+                    album_id=album_id,
+                    user_id=user_id,
+                    folder_id=folder_ids[user_id],
+                )
+                for album_id, user_id in Album.objects.filter(
+                    user__in=[folder.owner_id for folder in folders],
+                ).values_list('id', 'user_id')
+            ],
+        )
+        invalidate_albums(user_ids=[folder.owner_id for folder in folders])
+        return folder_ids
+
+    @staticmethod
+    def root_folder_ids_for_users(users):
+        """Returns the ids of the root folders of users by the ids of their
+        owners.
+
+        Root folders are provisioned at login and their ids are cached, as
+        a root folder is never moved or replaced. They are only created
+        here for users who have not logged in since.
+        """
+
+        users = list(users)
+        keys = {root_folder_key(user.pk): user.pk for user in users}
+        folder_ids = {
+            keys[key]: folder_id for key, folder_id in cache.get_many(keys).items()
+        }
+        missing = [user for user in users if user.pk not in folder_ids]
+        if missing:
+            provisioned = Folder.provision_root_folders(missing)
+            cache.set_many(
+                {
+                    root_folder_key(owner_id): folder_id
+                    for owner_id, folder_id in provisioned.items()
+                },
+                timeout=None,
+            )
+            folder_ids.update(provisioned)
+        return folder_ids
+
+    @staticmethod
+    def root_folder_id_for_user(user):
+        return Folder.root_folder_ids_for_users([user])[user.pk]
+
     @staticmethod
     def root_folder_for_user(user):
-        # All albums should be related to it. If no album exists, then folder is empty
-        folder, created = Folder.objects.get_or_create(owner=user, parent=None)
-        if created:
-            user_albums = user.album_set.all()
-            folder.title = f'{user.username}-root'
-            folder.save()
-            for a in user_albums:
-                # Add relation to albums
-                FolderAlbumRelation(album=a, user=user, folder=folder).save()
-        return folder
+        return Folder.objects.get(pk=Folder.root_folder_id_for_user(user))
+
+
+class FolderClosure(models.Model):
+    """Closure table of the folder hierarchy.
+
+    Every folder is linked to itself and to all of its ancestors, with
+    the distance between them as depth. This allows to query subtrees,
+    ancestors and recursive counts without walking the parents. The rows
+    are maintained by signals, whenever folders are created or moved.
+    """
+
+    ancestor = models.ForeignKey(
+        Folder,
+        related_name='descendant_links',
+        on_delete=models.CASCADE,
+    )
+    descendant = models.ForeignKey(
+        Folder,
+        related_name='ancestor_links',
+        on_delete=models.CASCADE,
+    )
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ['ancestor', 'descendant']
+        indexes = [
+            models.Index(fields=['descendant', 'depth']),
+        ]
+
+    def __str__(self):
+        return f'{self.ancestor_id} -> {self.descendant_id} ({self.depth})'
 
 
 class FolderAlbumRelation(models.Model):
@@ -1,21 +1,42 @@
+import functools
 from datetime import timedelta
 
 import django_rq
+from django_cas_ng.signals import cas_user_authenticated
 from django_rq.queues import get_queue
 from sorl.thumbnail import delete
 
 from django.conf import settings
-from django.db import connections
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
 from django.db.migrations.loader import MigrationLoader
 from django.db.models import Q
-from django.db.models.signals import post_delete, post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
+from texts.models import Text
+
+from . import discriminatory_terms
+from .cache import (
+    METADATA_VERSION,
+    bump_cache_version,
+    invalidate_album_permissions,
+    invalidate_albums,
+    invalidate_root_folders,
+    root_folder_key,
+)
 from .models import (
+    Album,
+    AlbumSlideItem,
     Artwork,
+    DiscriminatoryTerm,
+    Folder,
+    FolderAlbumRelation,
     Keyword,
     Location,
     Material,
+    PermissionsRelation,
     Person,
 )
 from .utils import remove_non_printable_characters
@@ -64,6 +85,20 @@ def update_images_pre_save(sender, instance, *args, **kwargs):
         if image_original_created or image_original_changed:
             instance.create_image_fullsize(save=False)
 
+        # the previews of albums containing the artwork need to be updated, if
+        # its image or visibility changed. we only set the flag here, as the
+        # artwork might be saved again in post_save, before it is handled
+        if (
+            image_original_changed
+            or image_original_deleted
+            or old_instance.published != instance.published
+        ):
+            instance._update_album_previews = True
+
+        # the featured artworks of albums only contain published artworks
+        if old_instance.published != instance.published:
+            instance._update_album_summaries = True
+
 
 @receiver(post_save, sender=Artwork)
 def update_images_post_save(sender, instance, created, **kwargs):
@@ -91,6 +126,116 @@ def update_search_vector(sender, instance, created, *args, **kwargs):
     instance.update_search_vector()
 
 
+def enqueue_album_preview_updates(albums):
+    # the previews are rendered in background jobs, which must only run once
+    # the changes are committed, and not at all, if they are rolled back
+    transaction.on_commit(functools.partial(enqueue_previews, list(albums)))
+
+
+def enqueue_previews(albums):
+    for album in albums:
+        django_rq.enqueue(
+            album.update_preview,
+            result_ttl=settings.RQ_RESULT_TTL,
+        )
+
+
+@receiver(post_save, sender=Artwork)
+def update_album_previews(sender, instance, created, **kwargs):
+    if instance.__dict__.pop('_update_album_previews', False):
+        enqueue_album_preview_updates(
+            Album.objects.filter(slide_items__artwork=instance).distinct(),
+        )
+
+
+@receiver(post_save, sender=Artwork)
+def invalidate_featuring_albums(sender, instance, created, **kwargs):
+    # the featured artworks are part of the albums in album and folder
+    # responses. changes of the featured artworks themselves, e.g. if an
+    # artwork is deleted or unpublished, are handled by update_slides_summary()
+    if created:
+        return
+    album_ids = list(
+        Album.objects.filter(
+            slide_items__artwork=instance,
+            featured_artwork_ids__contains=[instance.pk],
+        )
+        .order_by()
+        .values_list('pk', flat=True)
+        .distinct(),
+    )
+    if album_ids:
+        Album.invalidate_versions(album_ids)
+
+
+@receiver(post_save, sender=Artwork)
+def update_album_summaries(sender, instance, created, **kwargs):
+    if instance.__dict__.pop('_update_album_summaries', False):
+        for album in Album.objects.filter(slide_items__artwork=instance).distinct():
+            album.update_slides_summary()
+
+
+@receiver(pre_save, sender=Album)
+def increment_album_version(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'version' in update_fields:
+        instance.version += 1
+
+
+@receiver(pre_save, sender=Album)
+def collect_album_slides(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'slides' not in update_fields:
+        return
+
+    old_slides = []
+    if not instance._state.adding:
+        old_slides = (
+            Album.objects.filter(pk=instance.pk)
+            .values_list('slides', flat=True)
+            .first()
+        ) or []
+
+    instance._old_slides = old_slides
+    # the preview is only affected by changes of the artworks in the slides
+    old_artwork_ids = Album.slides_artwork_ids(old_slides)
+    instance._update_preview = old_artwork_ids != Album.slides_artwork_ids(
+        instance.slides,
+    )
+
+
+@receiver(post_save, sender=Album)
+def sync_album_slide_items(sender, instance, created, **kwargs):
+    old_slides = instance.__dict__.pop('_old_slides', None)
+    if old_slides is not None and old_slides != instance.slides:
+        instance.sync_slide_items(old_slides)
+        instance.update_slides_summary()
+
+
+@receiver(post_save, sender=Album)
+def update_album_preview(sender, instance, created, **kwargs):
+    # update_preview() itself checks whether the first artworks of the album
+    # actually changed
+    if instance.__dict__.pop('_update_preview', False):
+        enqueue_album_preview_updates([instance])
+
+
+@receiver(pre_save, sender=Folder)
+def collect_folder_parent(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._moved = (
+            Folder.objects.filter(pk=instance.pk)
+            .exclude(parent_id=instance.parent_id)
+            .exists()
+        )
+
+
+@receiver(post_save, sender=Folder)
+def update_folder_closure(sender, instance, created, **kwargs):
+    if created:
+        instance.insert_closure()
+    elif instance.__dict__.pop('_moved', False):
+        instance.move_closure()
+
+
 @receiver(post_save, sender=Keyword)
 def update_search_vector_keyword(sender, instance, created, *args, **kwargs):
     keyword_ids = (
@@ -163,7 +308,129 @@ def delete_artwork_images(sender, instance, **kwargs):
         delete(instance.image_fullsize)
 
 
+@receiver(pre_delete, sender=Artwork)
+def collect_albums_pre_delete(sender, instance, **kwargs):
+    # the slide items of the artwork are already deleted (by cascade), when
+    # post_delete is sent
+    instance._album_ids = list(
+        AlbumSlideItem.objects.filter(artwork=instance)
+        .order_by()
+        .values_list('album_id', flat=True)
+        .distinct(),
+    )
+
+
+@receiver(post_delete, sender=Artwork)
+def update_albums_post_delete(sender, instance, **kwargs):
+    albums = Album.objects.filter(pk__in=instance.__dict__.pop('_album_ids', []))
+    if instance.published:
+        for album in albums:
+            album.update_slides_summary()
+    enqueue_album_preview_updates(albums)
+
+
+@receiver(post_save, sender=DiscriminatoryTerm)
+@receiver(post_delete, sender=DiscriminatoryTerm)
+def invalidate_discriminatory_terms_matcher(sender, instance, **kwargs):
+    bump_cache_version(discriminatory_terms.CACHE_VERSION_NAME)
+    # other processes notice the new version within VERSION_CHECK_INTERVAL
+    discriminatory_terms._matcher = None
+
+
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Person)
+@receiver(post_save, sender=Keyword)
+@receiver(post_delete, sender=Keyword)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=DiscriminatoryTerm)
+@receiver(post_delete, sender=DiscriminatoryTerm)
+@receiver(post_save, sender=Text)
+@receiver(post_delete, sender=Text)
+def invalidate_metadata(sender, instance, **kwargs):
+    bump_cache_version(METADATA_VERSION)
+
+
+@receiver(post_save, sender=Album)
+def invalidate_album_folders(sender, instance, created, **kwargs):
+    # the version of the album itself is part of its ETags, but the folders
+    # containing it change as well
+    Album.invalidate_versions([instance.pk])
+
+
+@receiver(post_save, sender=PermissionsRelation)
+@receiver(post_delete, sender=PermissionsRelation)
+def invalidate_album_permission_versions(sender, instance, **kwargs):
+    Album.invalidate_versions([instance.album_id])
+
+
+@receiver(post_save, sender=Folder)
+@receiver(post_delete, sender=Folder)
+def invalidate_folders(sender, instance, **kwargs):
+    invalidate_albums(user_ids=[instance.owner_id])
+
+
+@receiver(post_save, sender=FolderAlbumRelation)
+@receiver(post_delete, sender=FolderAlbumRelation)
+def invalidate_folder_albums(sender, instance, **kwargs):
+    invalidate_albums(user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender=PermissionsRelation)
+@receiver(post_delete, sender=PermissionsRelation)
+def invalidate_album_permission(sender, instance, **kwargs):
+    invalidate_album_permissions(instance.album_id, [instance.user_id])
+
+
+@receiver(cas_user_authenticated, dispatch_uid='provision_root_folder')
+def provision_root_folder(sender, user, *args, **kwargs):
+    # albums are added to the root folder of a user, which is therefore
+    # created, and its id cached, before the first request
+    if user:
+        Folder.root_folder_ids_for_users([user])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_root_folder_new_user(sender, instance, created, **kwargs):
+    # a new user must not get a root folder cached for a former user with
+    # the same id, e.g. in a recreated database
+    if created:
+        invalidate_root_folders([instance.pk])
+
+
+@receiver(post_delete, sender=Folder)
+def invalidate_root_folder(sender, instance, **kwargs):
+    if instance.parent_id is None:
+        invalidate_root_folders([instance.owner_id])
+
+
+def invalidate_deleted_root_folders(batch_size=1000):
+    """Removes the cached ids of root folders which do not exist anymore,
+    e.g. after duplicate root folders were merged by a migration."""
+
+    user_ids = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+    for offset in range(0, user_ids.count(), batch_size):
+        keys = {
+            root_folder_key(user_id): user_id
+            for user_id in user_ids[offset : offset + batch_size]
+        }
+        cached = {keys[key]: pk for key, pk in cache.get_many(keys).items()}
+        existing = set(
+            Folder.objects.filter(pk__in=cached.values(), parent=None).values_list(
+                'pk',
+                flat=True,
+            ),
+        )
+        deleted = [user_id for user_id, pk in cached.items() if pk not in existing]
+        if deleted:
+            invalidate_root_folders(deleted)
+            invalidate_albums(user_ids=deleted)
+
+
 def post_migrate_updates():
+    # the migrations only use the database, the cache is updated here
+    invalidate_deleted_root_folders()
+
     for artwork in Artwork.objects.iterator():
         # update search vector if there have been changes to the model
         django_rq.enqueue(
@@ -178,6 +445,13 @@ def post_migrate_updates():
                 result_ttl=settings.RQ_RESULT_TTL,
             )
 
+    # create previews of albums, which don't have one yet
+    for album in Album.objects.filter(preview_key='').iterator():
+        django_rq.enqueue(
+            album.update_preview,
+            result_ttl=settings.RQ_RESULT_TTL,
+        )
+
 
 def post_migrate_signal(sender, **kwargs):
     plan = kwargs.get('plan')
@@ -13,3 +13,11 @@ worker_tmp_dir = '/dev/shm'  # noqa: S108
 loglevel = 'info'
 accesslog = '/logs/gunicorn.access.log'
 errorlog = '/logs/gunicorn.error.log'
+
+
+def child_exit(server, worker):
+    # remove the metrics of live gauges of exited workers, see image/metrics.py
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
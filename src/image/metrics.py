@@ -0,0 +1,212 @@
+"""Prometheus metrics of the API, the thumbnails and the RQ queues.
+
+The metrics are exported on /metrics for internal scraping, protected by
+the bearer token METRICS_TOKEN. With several gunicorn workers, the
+environment variable PROMETHEUS_MULTIPROC_DIR has to point to a
+directory shared by the workers, so that the metrics of all workers are
+aggregated. The RQ metrics are read from Redis when scraped, so the
+workers of the queues don't need to be instrumented.
+"""
+
+import hmac
+import os
+import time
+from collections import defaultdict
+
+import django_rq
+from django_rq.contrib.prometheus import RQCollector
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from rq.job import Job
+from sorl.thumbnail import base
+
+from django.conf import settings
+from django.db import connection
+from django.http import Http404, HttpResponse
+
+from .profiling import current_profile
+
+REQUESTS = Counter(
+    'image_http_requests_total',
+    'Number of requests by view, method and status code',
+    ['view', 'method', 'status'],
+)
+REQUEST_DURATION = Histogram(
+    'image_http_request_duration_seconds',
+    'Duration of requests by view',
+    ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+DB_QUERIES = Histogram(
+    'image_db_queries_per_request',
+    'Number of database queries of requests by view',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+DB_QUERY_DURATION = Counter(
+    'image_db_query_seconds',
+    'Time spent in database queries by view',
+    ['view'],
+)
+THUMBNAIL_REQUESTS = Counter(
+    'image_thumbnail_requests',
+    'Number of requested thumbnails',
+)
+THUMBNAIL_MISSES = Counter(
+    'image_thumbnail_misses',
+    'Number of requested thumbnails, which were not cached and had to be created',
+)
+
+
+class QueryStats:
+    """Database execute wrapper counting the queries and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """Records the duration and the database queries of every request.
+
+    Requests are labelled with the name of their view, e.g. search-list or
+    album-download, so the number of label values is bounded. The duration
+    of streaming responses only includes the time until the response is
+    returned, not the time of streaming its content.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryStats()
+        start = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        REQUESTS.labels(view, request.method, response.status_code).inc()
+        REQUEST_DURATION.labels(view, request.method).observe(duration)
+        DB_QUERIES.labels(view).observe(queries.count)
+        DB_QUERY_DURATION.labels(view).inc(queries.duration)
+        return response
+
+
+class ThumbnailBackend(base.ThumbnailBackend):
+    """The thumbnail backend of sorl-thumbnail, which counts the requested
+    and the created thumbnails, so that the hit ratio of the thumbnail
+    cache can be monitored. They are also recorded in the profiles of
+    requests, see image/profiling.py."""
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        THUMBNAIL_REQUESTS.inc()
+        profile = current_profile()
+        if profile is None:
+            return super().get_thumbnail(file_, geometry_string, **options)
+
+        start = time.perf_counter()
+        try:
+            return super().get_thumbnail(file_, geometry_string, **options)
+        finally:
+            profile.record('thumbnails', time.perf_counter() - start)
+
+    def _create_thumbnail(self, *args, **kwargs):
+        THUMBNAIL_MISSES.inc()
+        if profile := current_profile():
+            profile.record('thumbnail_misses')
+        return super()._create_thumbnail(*args, **kwargs)
+
+
+class RQJobsCollector:
+    """Collects the durations of the recently finished jobs of all queues,
+    e.g. of updating search vectors or creating images, by function.
+
+    Only the latest METRICS_RQ_JOBS finished jobs of every queue are read,
+    which RQ keeps for RQ_RESULT_TTL seconds.
+    """
+
+    def collect(self):
+        jobs = GaugeMetricFamily(
+            'image_rq_recent_jobs',
+            'Number of recently finished RQ jobs',
+            labels=['queue', 'func'],
+        )
+        average = GaugeMetricFamily(
+            'image_rq_recent_job_duration_seconds',
+            'Average duration of recently finished RQ jobs',
+            labels=['queue', 'func'],
+        )
+        maximum = GaugeMetricFamily(
+            'image_rq_recent_job_duration_max_seconds',
+            'Maximum duration of recently finished RQ jobs',
+            labels=['queue', 'func'],
+        )
+
+        for name in settings.RQ_QUEUES:
+            queue = django_rq.get_queue(name)
+            job_ids = queue.finished_job_registry.get_job_ids(
+                0,
+                settings.METRICS_RQ_JOBS - 1,
+            )
+            durations = defaultdict(list)
+            for job in Job.fetch_many(job_ids, connection=queue.connection):
+                if job and job.started_at and job.ended_at:
+                    durations[job.func_name].append(
+                        (job.ended_at - job.started_at).total_seconds(),
+                    )
+
+            for func, values in durations.items():
+                jobs.add_metric([name, func], len(values))
+                average.add_metric([name, func], sum(values) / len(values))
+                maximum.add_metric([name, func], max(values))
+
+        yield jobs
+        yield average
+        yield maximum
+
+
+rq_registry = CollectorRegistry(auto_describe=False)
+rq_registry.register(RQCollector())
+rq_registry.register(RQJobsCollector())
+
+
+def metrics(request):
+    """Exports the metrics in the text format of Prometheus."""
+
+    if not settings.METRICS_TOKEN:
+        raise Http404
+
+    if not hmac.compare_digest(
+        request.headers.get('Authorization', '').encode(),
+        f'Bearer {settings.METRICS_TOKEN}'.encode(),
+    ):
+        return HttpResponse(status=401)
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return HttpResponse(
+        generate_latest(registry) + generate_latest(rq_registry),
+        content_type=CONTENT_TYPE_LATEST,
+    )
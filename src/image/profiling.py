@@ -0,0 +1,257 @@
+"""Profiling of single requests in production.
+
+A request is profiled, if a staff user sends the header X-Profile, or if
+it is sampled with the rate PROFILING_SAMPLE_RATE. The profile contains
+the SQL statements with their durations, the time of rendering the
+response, the cache hits and misses and the requested thumbnails. It is
+stored in Redis for PROFILING_TIMEOUT seconds, the latest
+PROFILING_MAX_PROFILES profiles are listed in the admin.
+
+The parameters of the SQL statements are not stored, as they may contain
+personal data.
+"""
+
+import contextvars
+import json
+import random
+import time
+from collections import Counter, defaultdict
+
+import shortuuid
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache as BaseRedisCache
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .queries import repeated_queries
+
+# the summaries of the latest profiles, the profiles themselves are stored
+# under profile_key()
+PROFILES_KEY = 'profiles'
+
+_profile = contextvars.ContextVar('profile', default=None)
+_missing = object()
+
+
+def profile_key(profile_id):
+    return f'profile:{profile_id}'
+
+
+def current_profile():
+    """Returns the profile of the current request, or None if the request
+    is not profiled."""
+
+    return _profile.get()
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+class Profile:
+    """Collects the queries, timings and counts of a request.
+
+    It is also a database execute wrapper recording the queries.
+    """
+
+    def __init__(self, trigger):
+        self.id = shortuuid.uuid()
+        self.trigger = trigger
+        self.queries = []
+        self.timings = defaultdict(float)
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries.append((sql, duration))
+            self.record('sql', duration)
+
+    def record(self, name, duration=None, n=1):
+        self.counts[name] += n
+        if duration is not None:
+            self.timings[name] += duration
+
+    def as_dict(self, request, response, duration):
+        match = request.resolver_match
+        return {
+            'id': self.id,
+            'date': timezone.now().isoformat(),
+            'trigger': self.trigger,
+            'method': request.method,
+            # without the query string, which might contain personal data
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'user': request.user.username if request.user.is_authenticated else None,
+            'status': response.status_code,
+            'duration': milliseconds(duration),
+            'timings': {
+                # the timings of authentication, see accounts.middleware
+                **{
+                    name: round(value, 2)
+                    for name, value in getattr(request, 'server_timing', {}).items()
+                },
+                **{name: milliseconds(value) for name, value in self.timings.items()},
+            },
+            'counts': dict(self.counts),
+            'queries': [
+                {'sql': sql, 'duration': milliseconds(duration)}
+                for sql, duration in self.queries
+            ],
+            'repeated': [
+                {'sql': shape, 'count': n}
+                for shape, n in repeated_queries(sql for sql, _d in self.queries)
+            ],
+        }
+
+
+def store_profile(data):
+    cache.set(profile_key(data['id']), data, timeout=settings.PROFILING_TIMEOUT)
+
+    summary = {k: v for k, v in data.items() if k not in ('queries', 'repeated')}
+    key = cache.make_key(PROFILES_KEY)
+    with get_redis_connection('default').pipeline() as pipe:
+        pipe.lpush(key, json.dumps(summary))
+        pipe.ltrim(key, 0, settings.PROFILING_MAX_PROFILES - 1)
+        pipe.expire(key, settings.PROFILING_TIMEOUT)
+        pipe.execute()
+
+
+def latest_profiles():
+    """Returns the summaries of the latest profiles, newest first."""
+
+    return [
+        json.loads(summary)
+        for summary in get_redis_connection('default').lrange(
+            cache.make_key(PROFILES_KEY),
+            0,
+            -1,
+        )
+    ]
+
+
+def get_profile(profile_id):
+    return cache.get(profile_key(profile_id))
+
+
+class ProfilingMiddleware:
+    """Profiles requests of staff users sending the header X-Profile, and
+    samples other requests with the rate PROFILING_SAMPLE_RATE.
+
+    The id of the profile is returned in the header X-Profile-Id. The
+    middleware has to come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def get_trigger(self, request):
+        if 'X-Profile' in request.headers and request.user.is_staff:
+            return 'header'
+        if random.random() < settings.PROFILING_SAMPLE_RATE:  # noqa: S311 - we don't use this for cryptographic purposes
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        trigger = self.get_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        profile = Profile(trigger)
+        token = _profile.set(profile)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(profile):
+                response = self.get_response(request)
+        finally:
+            _profile.reset(token)
+        duration = time.perf_counter() - start
+
+        store_profile(profile.as_dict(request, response, duration))
+        response['X-Profile-Id'] = profile.id
+        return response
+
+    def process_template_response(self, request, response):
+        # responses of DRF are rendered after the view returned them, which
+        # is where the data is serialized
+        profile = current_profile()
+        if profile is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda r: profile.record('render', time.perf_counter() - start),
+            )
+        return response
+
+
+class RedisCache(BaseRedisCache):
+    """The Redis cache backend of django-redis, which records the cache hits
+    and misses of profiled requests."""
+
+    def get(self, key, default=None, version=None, client=None):
+        profile = current_profile()
+        if profile is None:
+            return super().get(key, default=default, version=version, client=client)
+
+        start = time.perf_counter()
+        value = super().get(key, default=_missing, version=version, client=client)
+        profile.record('cache', time.perf_counter() - start)
+        if value is _missing:
+            profile.record('cache_misses')
+            return default
+        profile.record('cache_hits')
+        return value
+
+    def get_many(self, keys, *args, **kwargs):
+        profile = current_profile()
+        if profile is None:
+            return super().get_many(keys, *args, **kwargs)
+
+        keys = list(keys)
+        start = time.perf_counter()
+        values = super().get_many(keys, *args, **kwargs)
+        profile.record('cache', time.perf_counter() - start)
+        profile.record('cache_hits', n=len(values))
+        profile.record('cache_misses', n=len(keys) - len(values))
+        return values
+
+
+def profiles(request):
+    """Admin view listing the latest profiles."""
+
+    return TemplateResponse(
+        request,
+        'admin/profiles/profiles.html',
+        {
+            **admin.site.each_context(request),
+            'title': _('Request profiles'),
+            'profiles': latest_profiles(),
+        },
+    )
+
+
+def profile(request, profile_id):
+    """Admin view showing a single profile."""
+
+    data = get_profile(profile_id)
+    if data is None:
+        raise Http404
+
+    return TemplateResponse(
+        request,
+        'admin/profiles/profile.html',
+        {
+            **admin.site.each_context(request),
+            'title': f'{data["method"]} {data["path"]}',
+            'profile': data,
+        },
+    )
@@ -0,0 +1,79 @@
+"""Detection of repeated queries, which usually indicate N+1 problems.
+
+Queries have the same shape, if they only differ in their parameters,
+e.g. when the artworks of slides are fetched one by one. The shapes are
+used by NPlusOneMiddleware at runtime, and by the query assertions of
+the tests in api.tests.
+"""
+
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_LIST = re.compile(r'\((?:\s*\?\s*,)*\s*\?\s*\)')
+
+
+def query_shape(sql):
+    """Returns the SQL of a query without its parameters.
+
+    Works with both, SQL containing placeholders and SQL with the
+    parameters already interpolated, like the captured queries of tests.
+    Lists of parameters, e.g. of IN lookups, are collapsed, so that their
+    length does not change the shape.
+    """
+
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    return _LIST.sub('(...)', sql)
+
+
+def repeated_queries(queries, threshold=2):
+    """Returns the shapes of queries, which occur at least threshold times,
+    with their numbers, most frequent first."""
+
+    shapes = Counter(query_shape(sql) for sql in queries)
+    return [(shape, n) for shape, n in shapes.most_common() if n >= threshold]
+
+
+class NPlusOneMiddleware:
+    """Logs a warning for every query shape, which is executed at least
+    QUERY_REPEAT_THRESHOLD times during a request.
+
+    This is meant for development and staging, as every query is
+    recorded. It is enabled by setting QUERY_REPEAT_THRESHOLD.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = self.get_response(request)
+
+        for shape, n in repeated_queries(
+            queries,
+            threshold=settings.QUERY_REPEAT_THRESHOLD,
+        ):
+            logger.warning(
+                '%s %s executed %d queries of the same shape: %s',
+                request.method,
+                request.path,
+                n,
+                shape,
+            )
+        return response
@@ -0,0 +1 @@
+SECRET_KEY = 'udkfi29w+#3+70c%v%5t*!e^9ttma!s(^2yg^qf=(34vmf9_s7'
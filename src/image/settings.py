@@ -129,8 +129,8 @@ INSTALLED_APPS = [
 ]
 
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
-    'django_cas_ng.backends.CASBackend',
+    'accounts.backends.ModelBackend',
+    'accounts.backends.CASBackend',
 ]
 
 AUTH_USER_MODEL = 'accounts.User'
@@ -191,11 +191,50 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# add a Server-Timing header with the time of authentication and the total
+# time to every response
+SERVER_TIMING = env.bool('SERVER_TIMING', default=DEBUG)
+
+if SERVER_TIMING:
+    MIDDLEWARE.insert(0, 'accounts.middleware.ServerTimingMiddleware')
+
+# bearer token of the Prometheus metrics on /metrics, which are disabled
+# without a token, see image/metrics.py
+METRICS_TOKEN = env.str('METRICS_TOKEN', default=None)
+# number of the latest finished jobs per queue, the RQ job metrics are
+# computed from
+METRICS_RQ_JOBS = env.int('METRICS_RQ_JOBS', default=1000)
+
+if METRICS_TOKEN:
+    MIDDLEWARE.insert(0, 'image.metrics.MetricsMiddleware')
+
+# log a warning for queries executed at least this many times with the same
+# shape during a request, which usually indicates an N+1 problem. 0 disables
+# the detection, see image/queries.py
+QUERY_REPEAT_THRESHOLD = env.int('QUERY_REPEAT_THRESHOLD', default=0)
+
+if QUERY_REPEAT_THRESHOLD:
+    MIDDLEWARE.append('image.queries.NPlusOneMiddleware')
+
+# profile single requests, which are stored in Redis, see
+# image/profiling.py
+PROFILING_ENABLED = env.bool('PROFILING_ENABLED', default=False)
+# requests of staff users with the header X-Profile are profiled, other
+# requests are sampled with this rate (between 0 and 1)
+PROFILING_SAMPLE_RATE = env.float('PROFILING_SAMPLE_RATE', default=0.0)
+# number of the latest profiles listed in the admin
+PROFILING_MAX_PROFILES = env.int('PROFILING_MAX_PROFILES', default=100)
+# time (in seconds) to keep profiles
+PROFILING_TIMEOUT = env.int('PROFILING_TIMEOUT', default=60 * 60 * 24)
+
+if PROFILING_ENABLED:
+    MIDDLEWARE.append('image.profiling.ProfilingMiddleware')
+
 if BEHIND_PROXY:
     MIDDLEWARE += [
         'base_common.middleware.SetRemoteAddrFromForwardedFor',
@@ -403,7 +442,10 @@ LOGGING = {
 # Cache settings
 CACHES = {
     'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
+        # records cache hits of profiled requests, see image/profiling.py
+        'BACKEND': 'image.profiling.RedisCache'
+        if PROFILING_ENABLED
+        else 'django_redis.cache.RedisCache',
         'LOCATION': 'redis://{}:{}/0'.format(
             f'{PROJECT_NAME}-redis' if DOCKER else 'localhost',
             env.int('REDIS_PORT', default=6379),
@@ -432,12 +474,28 @@ IM_ALLOWED_MIME_TYPES = {
 IM_COMPRESSION_QUALITY = env.int('IM_COMPRESSION_QUALITY', default=90)
 CROP_RESIZE_MAX = env.int('CROP_RESIZE_MAX', default=7680)
 
+THUMBNAIL_BACKEND = 'image.metrics.ThumbnailBackend'
 THUMBNAIL_ENGINE = 'sorl.thumbnail.engines.wand_engine.Engine'
 THUMBNAIL_REDIS_TIMEOUT = 60 * 60 * 24 * 365
 THUMBNAIL_CACHE_TIMEOUT = THUMBNAIL_REDIS_TIMEOUT
 THUMBNAIL_UPSCALE = False
 THUMBNAIL_QUALITY = IM_COMPRESSION_QUALITY
 
+# album previews (contact sheets) are squares of ALBUM_PREVIEW_SIZE pixels,
+# showing the first ALBUM_PREVIEW_ARTWORKS artworks of an album
+ALBUM_PREVIEW_SIZE = env.int('ALBUM_PREVIEW_SIZE', default=600)
+ALBUM_PREVIEW_ARTWORKS = 4
+
+# number of artworks shown as featured artworks of albums in listings
+ALBUM_FEATURED_ARTWORKS = 4
+
+# number of changes per album, which can be fetched by clients
+ALBUM_CHANGES_MAX = 100
+
+# seconds the permission of a user for an album is cached. the cache is
+# invalidated whenever the permissions of an album change
+ALBUM_PERMISSION_CACHE_TIMEOUT = env.int('ALBUM_PERMISSION_CACHE_TIMEOUT', default=60)
+
 # Session settings
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'sessions'
@@ -552,9 +610,18 @@ for permission in DEFAULT_PERMISSIONS:
         )
 
 EDITOR_GROUP = 'editor'
+# seconds the editor group membership of users is cached. the cache is
+# invalidated whenever the groups of a user change
+EDITOR_CACHE_TIMEOUT = env.int('EDITOR_CACHE_TIMEOUT', default=60 * 60)
+# seconds the users of sessions are cached. the cache is invalidated
+# whenever a user or their groups change
+USER_CACHE_TIMEOUT = env.int('USER_CACHE_TIMEOUT', default=60 * 60)
 
 SEARCH_LIMIT = 30
 
+# number of artworks fetched (and prefetched) at once in metadata exports
+METADATA_EXPORT_CHUNK_SIZE = env.int('METADATA_EXPORT_CHUNK_SIZE', default=2000)
+
 LOCATION_SEARCH_LEVELS = env.int('LOCATION_SEARCH_LEVELS', default=1)
 
 # Sentry
@@ -605,6 +672,18 @@ GOTENBERG_API_URL = (
     f'http://{GOTENBERG_SERVER_NAME}:{GOTENBERG_PORT}/forms/libreoffice/convert'
 )
 
+# album exports are kept in memory up to this size (in bytes), and spooled to disk beyond
+EXPORT_SPOOL_MAX_SIZE = env.int('EXPORT_SPOOL_MAX_SIZE', default=10 * 1024 * 1024)
+# albums with more artworks are exported in a background job
+EXPORT_SYNC_MAX_ARTWORKS = env.int('EXPORT_SYNC_MAX_ARTWORKS', default=100)
+# time (in seconds) to keep exports created in background jobs
+EXPORT_FILE_TTL = env.int('EXPORT_FILE_TTL', default=60 * 60)
+# exports created in background jobs are stored outside of MEDIA_ROOT, as
+# they are only served to users with access to the album
+EXPORT_ROOT = BASE_DIR / 'assets' / 'exports'
+# whether to trace the peak memory of exports (adds considerable overhead)
+EXPORT_TRACE_MEMORY = env.bool('EXPORT_TRACE_MEMORY', default=False)
+
 TINYMCE_DEFAULT_CONFIG = {
     'theme': 'silver',
     'height': 500,
@@ -22,6 +22,9 @@ from django.contrib.auth.decorators import login_required
 from django.urls import include, path, reverse_lazy
 from django.views.generic import RedirectView
 
+from .metrics import metrics
+from .profiling import profile, profiles
+
 admin.site.login = login_required(admin.site.login)
 admin.site.index_title = settings.DJANGO_ADMIN_TITLE
 admin.site.site_header = settings.DJANGO_ADMIN_TITLE
@@ -38,6 +41,16 @@ urlpatterns = [
     # api
     path(f'{settings.API_PREFIX}', include('api.urls')),
     # django admin
+    path(
+        f'{settings.DJANGO_ADMIN_PATH}/profiles/',
+        admin.site.admin_view(profiles),
+        name='profiles',
+    ),
+    path(
+        f'{settings.DJANGO_ADMIN_PATH}/profiles/<str:profile_id>/',
+        admin.site.admin_view(profile),
+        name='profile',
+    ),
     path(f'{settings.DJANGO_ADMIN_PATH}/', include('massadmin.urls')),
     path(f'{settings.DJANGO_ADMIN_PATH}/', admin.site.urls),
     # django cas ng
@@ -62,6 +75,8 @@ urlpatterns = [
     path('tinymce/', include('tinymce.urls')),
     # django-rq
     path('django-rq/', include('django_rq.urls')),
+    # prometheus
+    path('metrics', metrics, name='metrics'),
 ]
 
 # adding this, so static and media files can be served during development